@@ -0,0 +1,163 @@
+"""
+Avalon Core
+
+Shared building blocks for the Avalon Miner tools: the TCP transport (sync
+and async clients), the response parser, typed response models and the
+display formatters. The CLI, the Fleet Monitor and the Home Assistant
+integration are all built on this package.
+
+Copyright (c) 2025
+SPDX-License-Identifier: Apache-2.0
+"""
+
+from .exceptions import AvalonMinerApiError, AvalonMinerApiCommunicationError, AvalonConfigError
+from .transport import (
+    DEFAULT_PORT,
+    DEFAULT_TIMEOUT,
+    RESPONSE_LIMIT,
+    build_request,
+    decode_response,
+    send_command,
+    async_send_command,
+    async_exchange,
+    async_probe,
+)
+from .config import load_config_file, validate_ip, parse_ip_range
+from .breaker import CircuitBreaker
+from .latency import LatencyEstimator
+from .timing import PHASES, ERROR_CLASSES, RequestTimer, Histogram, LatencyStats
+from .scheduler import RollingScheduler
+from .tiers import EVERY_POLL, ONCE_PER_SESSION, SectionCache, default_tiers
+from .client import STATUS_COMMANDS, BatchSupport, AvalonMinerClient, AsyncAvalonMinerClient
+from .proxy import MinerProxy
+from .parser import (
+    first_entry,
+    split_batch_response,
+    batch_sections,
+    is_invalid_command,
+    get_mm_id0,
+    parse_mm_id0,
+    parse_estats_field,
+    parse_custom_data,
+    convert_value,
+)
+from .models import MinerVersion, MinerSummary, MinerEstats, MinerLcd
+from .snapshot import UNITS, MinerSnapshot
+from .store import STATUSES, FleetStore
+from .history import TREND_WINDOWS, RingHistory
+from .rates import COUNTERS, RateEngine
+from .render import FrameRenderer, KeyReader
+from .view import SORT_KEYS, FleetView
+from .recorder import MetricsRecorder
+from .prometheus import PrometheusExporter, MetricsServer
+from .export import (
+    OUTPUT_FORMATS,
+    RecordWriter,
+    NdjsonWriter,
+    CsvWriter,
+    snapshot_record,
+    open_writer,
+)
+from .telemetry import (
+    ChipStats,
+    ChipTelemetry,
+    parse_int_array,
+    chip_stats,
+    fleet_chip_stats,
+    outlier_miners,
+)
+from .formatting import (
+    WORK_MODE_NAMES,
+    get_work_mode_name,
+    to_ths,
+    format_hashrate,
+    format_difficulty,
+    format_uptime,
+    format_timestamp,
+    format_sparkline,
+    format_trend,
+)
+
+__all__ = [
+    "AvalonMinerApiError",
+    "AvalonMinerApiCommunicationError",
+    "DEFAULT_PORT",
+    "DEFAULT_TIMEOUT",
+    "RESPONSE_LIMIT",
+    "build_request",
+    "decode_response",
+    "send_command",
+    "async_send_command",
+    "async_exchange",
+    "async_probe",
+    "AvalonConfigError",
+    "load_config_file",
+    "validate_ip",
+    "parse_ip_range",
+    "CircuitBreaker",
+    "LatencyEstimator",
+    "PHASES",
+    "ERROR_CLASSES",
+    "RequestTimer",
+    "Histogram",
+    "LatencyStats",
+    "RollingScheduler",
+    "EVERY_POLL",
+    "ONCE_PER_SESSION",
+    "SectionCache",
+    "default_tiers",
+    "STATUS_COMMANDS",
+    "BatchSupport",
+    "AvalonMinerClient",
+    "AsyncAvalonMinerClient",
+    "MinerProxy",
+    "first_entry",
+    "split_batch_response",
+    "batch_sections",
+    "is_invalid_command",
+    "get_mm_id0",
+    "parse_mm_id0",
+    "parse_estats_field",
+    "parse_custom_data",
+    "convert_value",
+    "MinerVersion",
+    "MinerSummary",
+    "MinerEstats",
+    "MinerLcd",
+    "UNITS",
+    "MinerSnapshot",
+    "STATUSES",
+    "FleetStore",
+    "TREND_WINDOWS",
+    "RingHistory",
+    "COUNTERS",
+    "RateEngine",
+    "FrameRenderer",
+    "KeyReader",
+    "SORT_KEYS",
+    "FleetView",
+    "MetricsRecorder",
+    "PrometheusExporter",
+    "MetricsServer",
+    "OUTPUT_FORMATS",
+    "RecordWriter",
+    "NdjsonWriter",
+    "CsvWriter",
+    "snapshot_record",
+    "open_writer",
+    "ChipStats",
+    "ChipTelemetry",
+    "parse_int_array",
+    "chip_stats",
+    "fleet_chip_stats",
+    "outlier_miners",
+    "WORK_MODE_NAMES",
+    "get_work_mode_name",
+    "to_ths",
+    "format_hashrate",
+    "format_difficulty",
+    "format_uptime",
+    "format_timestamp",
+    "format_sparkline",
+    "format_trend",
+]
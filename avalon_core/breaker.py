@@ -0,0 +1,87 @@
+"""
+Per-miner circuit breaker for pollers.
+
+A miner that fails ``failure_threshold`` polls in a row is considered
+offline: the breaker opens and the poller stops sending full requests to
+it. Once the backoff delay has passed the breaker goes half-open and the
+poller sends one cheap probe (a bare TCP connect). A successful probe
+lets the next full poll through; a failed one reopens the breaker with
+the delay doubled, up to ``max_backoff``.
+"""
+
+import random
+import time
+from typing import Optional
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker:
+    """Track consecutive failures of one miner and gate requests to it"""
+
+    def __init__(self, failure_threshold: int = 3, base_backoff: float = 10.0,
+                 max_backoff: float = 600.0, jitter: float = 0.1):
+        """
+        Args:
+            failure_threshold: Consecutive failures before the breaker opens
+            base_backoff: Delay before the first probe, in seconds
+            max_backoff: Upper bound for the probe delay, in seconds
+            jitter: Random fraction added to each delay so probes of miners
+                that went down together do not stay synchronised
+        """
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+
+        self.state = CLOSED
+        self.failures = 0
+        self.backoff = base_backoff
+        self.offline_since: Optional[float] = None
+        self.next_probe_at = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        """True while the miner is treated as offline (open or probing)"""
+        return self.state != CLOSED
+
+    def allow_request(self, now: Optional[float] = None) -> bool:
+        """
+        Return True if the miner should be contacted now
+
+        When an open breaker's backoff has elapsed it moves to half-open and
+        this returns True; the caller should then send a probe first.
+        """
+        if self.state == CLOSED:
+            return True
+        now = time.time() if now is None else now
+        if now >= self.next_probe_at:
+            self.state = HALF_OPEN
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Close the breaker and reset the failure count and backoff"""
+        self.state = CLOSED
+        self.failures = 0
+        self.backoff = self.base_backoff
+        self.offline_since = None
+
+    def record_failure(self, now: Optional[float] = None) -> None:
+        """Count a failed poll or probe, opening the breaker if needed"""
+        now = time.time() if now is None else now
+        self.failures += 1
+
+        if self.state == HALF_OPEN:
+            # Probe failed: back off further
+            self.backoff = min(self.backoff * 2, self.max_backoff)
+        elif self.state == CLOSED and self.failures >= self.failure_threshold:
+            self.offline_since = now
+        else:
+            return
+
+        self.state = OPEN
+        self.next_probe_at = now + self.backoff * (1 + random.uniform(0, self.jitter))
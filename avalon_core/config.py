@@ -0,0 +1,63 @@
+"""
+Configuration and address helpers shared by the command-line tools.
+
+The fleet monitor and the API proxy read the same JSON config files and
+accept the same miner address syntax: a single IP or a last-octet range
+such as ``192.168.1.100-110``.
+"""
+
+import re
+import json
+import ipaddress
+from typing import Any, Dict, List
+
+from .exceptions import AvalonConfigError
+
+
+def load_config_file(config_path: str) -> Dict[str, Any]:
+    """
+    Load configuration from JSON file
+
+    Raises:
+        AvalonConfigError: If the file is missing, unreadable or not valid JSON
+    """
+    try:
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+        return config
+    except FileNotFoundError as e:
+        raise AvalonConfigError(f"Configuration file '{config_path}' not found") from e
+    except json.JSONDecodeError as e:
+        raise AvalonConfigError(f"Invalid JSON in configuration file: {e}") from e
+    except Exception as e:
+        raise AvalonConfigError(f"Failed to load configuration file: {e}") from e
+
+
+def validate_ip(ip: str) -> bool:
+    """Validate IP address"""
+    try:
+        ipaddress.ip_address(ip)
+        return True
+    except ValueError:
+        return False
+
+
+def parse_ip_range(ip_range: str) -> List[str]:
+    """Parse IP range like 192.168.1.100-110 into list of IPs"""
+    ips = []
+
+    # Check if it's a range
+    match = re.match(r'^(\d+\.\d+\.\d+\.)(\d+)-(\d+)$', ip_range)
+    if match:
+        prefix = match.group(1)
+        start = int(match.group(2))
+        end = int(match.group(3))
+
+        for i in range(start, end + 1):
+            ips.append(f"{prefix}{i}")
+    else:
+        # Single IP
+        if validate_ip(ip_range):
+            ips.append(ip_range)
+
+    return ips
@@ -0,0 +1,132 @@
+"""
+Buffered record writers for headless fleet output.
+
+Every completed poll becomes one record: the numeric fields of a
+:class:`.snapshot.MinerSnapshot` (units in :data:`.snapshot.UNITS`) plus an
+ISO 8601 UTC ``time``. Records are serialized as they arrive but written
+to the stream in one call per flush, so tens of thousands of records a
+minute cost a handful of system calls instead of one write (and, on a
+pipe, one flush) per miner.
+"""
+
+import io
+import csv
+import sys
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, TextIO
+
+from .snapshot import MinerSnapshot
+
+
+OUTPUT_FORMATS = ('ndjson', 'csv')
+
+# Column order of a record
+FIELDS = ('time',) + MinerSnapshot.__slots__
+
+
+def snapshot_record(snapshot: MinerSnapshot) -> Dict[str, Any]:
+    """Return a snapshot as an output record (numbers stay numbers)"""
+    record = {'time': datetime.fromtimestamp(snapshot.last_attempt, timezone.utc)
+              .isoformat(timespec='milliseconds').replace('+00:00', 'Z')}
+    record.update(snapshot.as_dict())
+    return record
+
+
+class RecordWriter(ABC):
+    """Base writer: buffers serialized records and writes them on flush"""
+
+    def __init__(self, stream: TextIO, max_buffered: int = 10000):
+        """
+        Args:
+            stream: Output stream (left open by :meth:`close` if it is stdout)
+            max_buffered: Records held before a flush is forced regardless of
+                the flush interval
+        """
+        self.stream = stream
+        self.max_buffered = max_buffered
+        self.records_written = 0
+        self._buffer: List[str] = []
+        # Written ahead of the first record (e.g. a CSV header)
+        self._preamble = ''
+
+    @abstractmethod
+    def _serialize(self, record: Dict[str, Any]) -> str:
+        """Return one record as a line of output (newline included)"""
+
+    def write(self, snapshot: MinerSnapshot) -> None:
+        """Buffer one poll result"""
+        self._buffer.append(self._serialize(snapshot_record(snapshot)))
+        if len(self._buffer) >= self.max_buffered:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write every buffered record in one call"""
+        if not self._buffer:
+            return
+        count = len(self._buffer)
+        data = self._preamble + ''.join(self._buffer)
+        self._buffer = []
+        self._preamble = ''
+        self.stream.write(data)
+        self.stream.flush()
+        self.records_written += count
+
+    def close(self) -> None:
+        """Flush, then close the stream unless it is stdout"""
+        self.flush()
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+class NdjsonWriter(RecordWriter):
+    """One JSON object per line"""
+
+    def _serialize(self, record: Dict[str, Any]) -> str:
+        return json.dumps(record, separators=(',', ':')) + '\n'
+
+
+class CsvWriter(RecordWriter):
+    """CSV with a header row (omitted when appending to a non-empty file)"""
+
+    def __init__(self, stream: TextIO, max_buffered: int = 10000, header: bool = True):
+        super().__init__(stream, max_buffered)
+        self._line = io.StringIO()
+        self._csv = csv.DictWriter(self._line, fieldnames=FIELDS, lineterminator='\n')
+        if header:
+            self._csv.writeheader()
+            self._preamble = self._take()
+
+    def _take(self) -> str:
+        text = self._line.getvalue()
+        self._line.seek(0)
+        self._line.truncate()
+        return text
+
+    def _serialize(self, record: Dict[str, Any]) -> str:
+        self._csv.writerow(record)
+        return self._take()
+
+
+def open_writer(output_format: str, path: Optional[str] = None,
+                max_buffered: int = 10000) -> RecordWriter:
+    """
+    Create a writer for ``output_format`` ('ndjson' or 'csv')
+
+    Writes to stdout when ``path`` is None, otherwise appends to the file.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{output_format}' "
+                         f"(expected one of {', '.join(OUTPUT_FORMATS)})")
+
+    if path is None:
+        stream = sys.stdout
+        empty = True
+    else:
+        stream = open(path, 'a', newline='', encoding='utf-8')
+        empty = stream.tell() == 0
+
+    if output_format == 'csv':
+        return CsvWriter(stream, max_buffered, header=empty)
+    return NdjsonWriter(stream, max_buffered)
@@ -0,0 +1,135 @@
+"""
+Fixed-size per-miner sample history with sliding-window means.
+
+:class:`RingHistory` keeps the last ``capacity`` samples of one metric for
+every miner in a single preallocated ``array('d')`` (plus one for the
+sample times), indexed by the miner's slot in the fleet store. Nothing is
+allocated per sample, so memory is fixed at creation:
+``miners x capacity x 16`` bytes per metric.
+
+Each miner also has a running sum and count per trend window (by default
+1, 5 and 15 minutes). A new sample is added to every window, and samples
+that fell out of a window are subtracted as its tail pointer moves past
+them. Each sample enters and leaves each window once, so a push is O(1)
+amortized and reading a trend is O(1). Sums are rebuilt from the ring
+every time it wraps, which stops float drift from building up over long
+runs at the same amortized cost.
+"""
+
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+NAN = float('nan')
+
+# Trend windows in seconds
+TREND_WINDOWS = (60, 300, 900)
+
+
+class RingHistory:
+    """Last ``capacity`` samples of one metric for ``size`` miners"""
+
+    def __init__(self, size: int, capacity: int, windows: Sequence[float] = TREND_WINDOWS):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.size = size
+        self.capacity = capacity
+        self.windows: Tuple[float, ...] = tuple(windows)
+
+        self.values = array('d', [NAN]) * (size * capacity)
+        self.times = array('d', [0.0]) * (size * capacity)
+        # Next write position and number of samples held, per miner
+        self.heads = array('l', [0]) * size
+        self.counts = array('l', [0]) * size
+
+        # Per miner and window: ring position of the oldest sample in the
+        # window, samples in it and their sum
+        count = size * len(self.windows)
+        self.tails = array('l', [0]) * count
+        self.window_counts = array('l', [0]) * count
+        self.sums = array('d', [0.0]) * count
+
+    def push(self, slot: int, t: float, value: float) -> None:
+        """Append one sample of a miner taken at time ``t`` (seconds)"""
+        capacity = self.capacity
+        base = slot * capacity
+        head = self.heads[slot]
+        values = self.values
+        times = self.times
+        tails = self.tails
+        window_counts = self.window_counts
+        sums = self.sums
+        first = slot * len(self.windows)
+
+        if self.counts[slot] == capacity:
+            # Overwriting the oldest sample: windows that still hold it
+            # lose it first
+            old = values[base + head]
+            for i in range(first, first + len(self.windows)):
+                if window_counts[i] and tails[i] == head:
+                    sums[i] -= old
+                    window_counts[i] -= 1
+                    tails[i] = (head + 1) % capacity
+        else:
+            self.counts[slot] += 1
+
+        values[base + head] = value
+        times[base + head] = t
+
+        for w, span in enumerate(self.windows):
+            i = first + w
+            if not window_counts[i]:
+                tails[i] = head
+            sums[i] += value
+            window_counts[i] += 1
+
+            # Drop samples that are now older than the window (always
+            # keeping the newest one)
+            tail = tails[i]
+            limit = t - span
+            while window_counts[i] > 1 and times[base + tail] <= limit:
+                sums[i] -= values[base + tail]
+                window_counts[i] -= 1
+                tail = (tail + 1) % capacity
+            tails[i] = tail
+
+        head = (head + 1) % capacity
+        self.heads[slot] = head
+        if head == 0:
+            self._resum(slot)
+
+    def _resum(self, slot: int) -> None:
+        """Recompute a miner's window sums exactly from the ring"""
+        capacity = self.capacity
+        base = slot * capacity
+        first = slot * len(self.windows)
+        for w in range(len(self.windows)):
+            i = first + w
+            total = 0.0
+            position = self.tails[i]
+            for _ in range(self.window_counts[i]):
+                total += self.values[base + position]
+                position = (position + 1) % capacity
+            self.sums[i] = total
+
+    def mean(self, slot: int, window: int = 0) -> Optional[float]:
+        """Mean over ``windows[window]`` seconds up to the latest sample"""
+        i = slot * len(self.windows) + window
+        count = self.window_counts[i]
+        return self.sums[i] / count if count else None
+
+    def trends(self, slot: int) -> List[Optional[float]]:
+        """Means over every trend window (e.g. 1m, 5m, 15m)"""
+        return [self.mean(slot, w) for w in range(len(self.windows))]
+
+    def latest(self, slot: int) -> Optional[float]:
+        if not self.counts[slot]:
+            return None
+        return self.values[slot * self.capacity + (self.heads[slot] - 1) % self.capacity]
+
+    def recent(self, slot: int, n: int) -> List[float]:
+        """Up to ``n`` newest samples of a miner, oldest first"""
+        capacity = self.capacity
+        n = min(n, self.counts[slot])
+        base = slot * capacity
+        start = self.heads[slot] - n
+        return [self.values[base + (start + k) % capacity] for k in range(n)]
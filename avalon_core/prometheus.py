@@ -0,0 +1,358 @@
+"""
+Prometheus exposition of the fleet's latest poll results.
+
+:class:`PrometheusExporter` keeps the text of every sample line
+pre-rendered, one string per metric family and miner. A poll result
+re-renders only that miner's lines, so the monitor does the formatting
+work as results arrive, not when Prometheus scrapes. A scrape joins the
+strings that are already there, and the joined body is cached until the
+next result lands. Scraping never triggers a request to a miner. With
+request timing on, fleet-wide histograms of the request phases and
+request/error counters per command follow the miner metrics.
+
+Every series carries the labels ``ip``, ``model``, ``dna``, ``pool`` and
+``work_mode``. The identity labels keep their last known value while a
+miner is unreachable, so its series do not break in two. Both the
+Prometheus text format (0.0.4) and OpenMetrics 1.0 are served, chosen by
+the scraper's ``Accept`` header. :class:`MetricsServer` is a minimal
+asyncio HTTP server for ``/metrics`` that runs on the monitor's own event
+loop.
+"""
+
+import os
+import gzip
+import socket
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .formatting import WORK_MODE_NAMES
+from .snapshot import MinerSnapshot
+from .timing import BUCKETS, LatencyStats
+
+
+# Metric families: name, type, help and the snapshot values of its samples
+# as (field, extra labels, scale). Hash rates are converted from MH/s to
+# H/s and percentages to ratios, following Prometheus base units.
+FAMILIES = (
+    ('avalon_up', 'gauge', 'Whether the last poll of the miner succeeded',
+     (('up', '', 1),)),
+    ('avalon_stale', 'gauge', 'Whether the values are carried forward from an earlier poll',
+     (('stale', '', 1),)),
+    ('avalon_standby', 'gauge', 'Whether the miner is in standby (soft off)',
+     (('standby', '', 1),)),
+    ('avalon_hashrate_hashes_per_second', 'gauge', 'Hash rate over the last 5 seconds',
+     (('hashrate_current', '', 1e6),)),
+    ('avalon_hashrate_average_hashes_per_second', 'gauge', 'Average hash rate since the miner started',
+     (('hashrate_average', '', 1e6),)),
+    ('avalon_accepted_hashrate_hashes_per_second', 'gauge',
+     'Hash rate implied by recently accepted share difficulty',
+     (('accepted_hashrate', '', 1e6),)),
+    ('avalon_temperature_max_celsius', 'gauge', 'Highest ASIC temperature',
+     (('temp', '', 1),)),
+    ('avalon_temperature_average_celsius', 'gauge', 'Average ASIC temperature',
+     (('temp_avg', '', 1),)),
+    ('avalon_fan_speed_rpm', 'gauge', 'Fan speed',
+     (('fan1', ',fan="1"', 1), ('fan2', ',fan="2"', 1),
+      ('fan3', ',fan="3"', 1), ('fan4', ',fan="4"', 1))),
+    ('avalon_power_watts', 'gauge', 'Power draw',
+     (('power', '', 1),)),
+    ('avalon_shares_accepted', 'counter', 'Accepted shares since the miner started',
+     (('accepted', '', 1),)),
+    ('avalon_shares_rejected', 'counter', 'Rejected shares since the miner started',
+     (('rejected', '', 1),)),
+    ('avalon_hardware_errors', 'counter', 'Hardware errors since the miner started',
+     (('hardware_errors', '', 1),)),
+    ('avalon_difficulty_accepted', 'counter', 'Difficulty of accepted shares since the miner started',
+     (('difficulty_accepted', '', 1),)),
+    ('avalon_difficulty_rejected', 'counter', 'Difficulty of rejected shares since the miner started',
+     (('difficulty_rejected', '', 1),)),
+    ('avalon_rejected_ratio', 'gauge', 'Rejected share of the difficulty over the last few minutes',
+     (('current_rejected_pct', '', 0.01),)),
+    ('avalon_pool_rejected_ratio', 'gauge', 'Rejected share ratio reported by the firmware since the miner started',
+     (('rejected_pct', '', 0.01),)),
+    ('avalon_last_share_difficulty', 'gauge', 'Difficulty of the last share',
+     (('last_share_diff', '', 1),)),
+    ('avalon_best_share_difficulty', 'gauge', 'Best share difficulty since the miner started',
+     (('best_share', '', 1),)),
+    ('avalon_uptime_seconds', 'gauge', 'Seconds since the miner started',
+     (('uptime', '', 1),)),
+    ('avalon_last_update_timestamp_seconds', 'gauge', 'Unix time of the last successful poll',
+     (('last_update', '', 1),)),
+    ('avalon_section_age_seconds', 'gauge',
+     'Age at poll time of the cached section the values came from (0: fetched by that poll)',
+     (('estats_age', ',section="estats"', 1), ('lcd_age', ',section="lcd"', 1))),
+)
+
+# Identity labels of every series, in order
+LABELS = ('ip', 'model', 'dna', 'pool', 'work_mode')
+
+TEXT_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+
+def escape_label(value: str) -> str:
+    """Escape a label value for the exposition formats"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_value(value: float) -> str:
+    """Sample value as text: integers without a fraction, floats to 15 digits"""
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    # 15 significant digits hide the noise of unit conversions (0.000875,
+    # not 0.0008749999999999999)
+    return f'{value:.15g}'
+
+
+def _header(name: str, kind: str, help_text: str, openmetrics: bool) -> str:
+    # The text format names counters with their _total suffix;
+    # OpenMetrics names the family without it
+    family = name if openmetrics or kind != 'counter' else name + '_total'
+    return f'# HELP {family} {help_text}\n# TYPE {family} {kind}\n'
+
+
+class PrometheusExporter:
+    """Pre-rendered exposition text of every miner's latest snapshot"""
+
+    def __init__(self, ips: Iterable[str], latency_stats: Optional[LatencyStats] = None):
+        """
+        Args:
+            ips: Miner IPs in store slot order
+            latency_stats: Request phase histograms and error counts to
+                expose next to the miner metrics (request timing on)
+        """
+        self.ips: List[str] = list(ips)
+        size = len(self.ips)
+        # Last known model, DNA, pool URL and work mode of each miner, and
+        # the label text rendered from them
+        self._info: List[Tuple[Optional[str], ...]] = [(None,) * 4] * size
+        self._labels = [self._render_labels(ip, (None,) * 4) for ip in self.ips]
+        # Per family, the sample lines of each miner ('' when it has none)
+        self._samples: List[List[str]] = [[''] * size for _ in FAMILIES]
+        self._headers = {
+            openmetrics: [_header(name, kind, help_text, openmetrics)
+                          for name, kind, help_text, _ in FAMILIES]
+            for openmetrics in (False, True)
+        }
+        self.latency_stats = latency_stats
+        # Bumped on every update; the joined body is cached per version
+        self._updates = 0
+        self._cache: Dict[bool, Tuple[int, bytes]] = {}
+
+    @property
+    def version(self) -> int:
+        """Changes whenever the exposition body would change"""
+        if self.latency_stats is None:
+            return self._updates
+        return self._updates + self.latency_stats.version
+
+    @staticmethod
+    def _render_labels(ip: str, info: Tuple[Optional[str], ...]) -> str:
+        values = (ip,) + tuple('' if value is None else value for value in info)
+        return ','.join(f'{name}="{escape_label(value)}"' for name, value in zip(LABELS, values))
+
+    def update(self, slot: int, snapshot: MinerSnapshot) -> None:
+        """Re-render the sample lines of one miner from its latest snapshot"""
+        work_mode = None
+        if snapshot.work_mode is not None:
+            mode = str(int(snapshot.work_mode))
+            work_mode = WORK_MODE_NAMES.get(mode, mode)
+        info = tuple(new if new is not None else old for new, old in zip(
+            (snapshot.model, snapshot.dna, snapshot.pool_url, work_mode), self._info[slot]))
+        if info != self._info[slot]:
+            self._info[slot] = info
+            self._labels[slot] = self._render_labels(snapshot.ip, info)
+        labels = self._labels[slot]
+
+        values = snapshot.as_dict()
+        values['up'] = 1 if snapshot.status in ('Active', 'StandBy') else 0
+        values['standby'] = 1 if snapshot.status == 'StandBy' else 0
+
+        for family, samples in zip(FAMILIES, self._samples):
+            name, kind, _, fields = family
+            if kind == 'counter':
+                name += '_total'
+            lines = []
+            for field, extra, scale in fields:
+                value = values[field]
+                if value is None or value != value:
+                    continue
+                lines.append(f'{name}{{{labels}{extra}}} {format_value(value * scale)}\n')
+            samples[slot] = ''.join(lines)
+        self._updates += 1
+
+    def render(self, openmetrics: bool = False) -> bytes:
+        """The full exposition body (cached until the next update)"""
+        version = self.version
+        cached = self._cache.get(openmetrics)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        parts: List[str] = []
+        for header, samples in zip(self._headers[openmetrics], self._samples):
+            parts.append(header)
+            parts.extend(samples)
+        if self.latency_stats is not None:
+            parts.extend(self._render_latency(openmetrics))
+        if openmetrics:
+            parts.append('# EOF\n')
+        body = ''.join(parts).encode('utf-8')
+        self._cache[openmetrics] = (version, body)
+        return body
+
+    def _render_latency(self, openmetrics: bool) -> List[str]:
+        """Request phase histograms and request/error counters, fleet-wide per command"""
+        stats = self.latency_stats
+        name = 'avalon_api_request_phase_seconds'
+        lines = [_header(name, 'histogram', 'Time spent in each phase of an API request', openmetrics)]
+        for (command, phase), histogram in sorted(stats.histograms.items()):
+            labels = f'command="{escape_label(command)}",phase="{phase}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float('inf'),), histogram.counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}\n')
+            lines.append(f'{name}_sum{{{labels}}} {format_value(histogram.sum)}\n')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}\n')
+
+        name = 'avalon_api_requests'
+        lines.append(_header(name, 'counter', 'API requests sent', openmetrics))
+        for command, count in sorted(stats.requests.items()):
+            lines.append(f'{name}_total{{command="{escape_label(command)}"}} {count}\n')
+
+        name = 'avalon_api_errors'
+        lines.append(_header(name, 'counter', 'Failed API requests by error class', openmetrics))
+        for (command, error_class), count in sorted(stats.errors.items()):
+            lines.append(f'{name}_total{{command="{escape_label(command)}",class="{error_class}"}} {count}\n')
+
+        name = 'avalon_api_batch_requests'
+        lines.append(_header(name, 'counter', 'Joined API requests by the commands they carried', openmetrics))
+        for sections, count in sorted(stats.batches.items()):
+            lines.append(f'{name}_total{{sections="{escape_label(sections)}"}} {count}\n')
+        return lines
+
+
+class MetricsServer:
+    """HTTP endpoint serving ``/metrics`` from a :class:`PrometheusExporter`"""
+
+    def __init__(self, exporter: PrometheusExporter, host: str = '0.0.0.0', port: int = 9864,
+                 request_timeout: float = 10):
+        """
+        The listening socket is bound here, so a port that is taken fails
+        at startup rather than in the background.
+
+        Args:
+            exporter: Source of the exposition text
+            host: Address to listen on ('0.0.0.0' for every interface)
+            port: TCP port to listen on
+            request_timeout: Seconds a client may take to send its request
+        """
+        self.exporter = exporter
+        self.host = host
+        self.port = port
+        self.request_timeout = request_timeout
+        self.scrapes = 0
+        # Compressed body of the last scrape, keyed by (format, version)
+        self._gzip_key: Optional[Tuple[bool, int]] = None
+        self._gzip_body = b''
+
+        family = socket.AF_INET6 if ':' in host else socket.AF_INET
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            if os.name != 'nt':
+                self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.sock.bind((host, port))
+            self.sock.listen(128)
+            self.sock.setblocking(False)
+        except OSError:
+            self.sock.close()
+            raise
+
+    @property
+    def url(self) -> str:
+        host = f'[{self.host}]' if ':' in self.host else self.host
+        return f'http://{host}:{self.port}/metrics'
+
+    async def serve(self) -> None:
+        """Accept scrapes on the running event loop until cancelled"""
+        server = await asyncio.start_server(self._handle, sock=self.sock)
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await asyncio.wait_for(self._read_request(reader), self.request_timeout)
+        except (asyncio.TimeoutError, ConnectionError, ValueError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+
+        try:
+            method, path, headers = request
+            if method not in ('GET', 'HEAD'):
+                await self._respond(writer, 405, b'Method not allowed\n', allow='GET, HEAD')
+            elif path == '/metrics':
+                await self._respond_metrics(writer, method, headers)
+            elif path == '/':
+                await self._respond(writer, 200, b'<html><body><a href="/metrics">Metrics</a>'
+                                    b'</body></html>\n', content_type='text/html; charset=utf-8')
+            else:
+                await self._respond(writer, 404, b'Not found\n')
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str]]:
+        line = (await reader.readline()).decode('latin-1').split()
+        if len(line) < 2:
+            raise ValueError('malformed request line')
+        headers: Dict[str, str] = {}
+        for _ in range(100):
+            header = (await reader.readline()).decode('latin-1').strip()
+            if not header:
+                break
+            name, _, value = header.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return line[0].upper(), line[1].split('?', 1)[0], headers
+
+    async def _respond_metrics(self, writer: asyncio.StreamWriter, method: str,
+                               headers: Dict[str, str]) -> None:
+        openmetrics = 'application/openmetrics-text' in headers.get('accept', '')
+        content_type = OPENMETRICS_CONTENT_TYPE if openmetrics else TEXT_CONTENT_TYPE
+        key = (openmetrics, self.exporter.version)
+        body = self.exporter.render(openmetrics)
+        self.scrapes += 1
+
+        encoding = None
+        if 'gzip' in headers.get('accept-encoding', ''):
+            encoding = 'gzip'
+            if key != self._gzip_key:
+                # Compress off the event loop; zlib releases the GIL
+                loop = asyncio.get_running_loop()
+                self._gzip_body = await loop.run_in_executor(None, gzip.compress, body, 1)
+                self._gzip_key = key
+            body = self._gzip_body
+
+        await self._respond(writer, 200, body, content_type=content_type,
+                            encoding=encoding, head=method == 'HEAD')
+
+    async def _respond(self, writer: asyncio.StreamWriter, code: int, body: bytes,
+                       content_type: str = 'text/plain; charset=utf-8',
+                       encoding: Optional[str] = None, allow: Optional[str] = None,
+                       head: bool = False) -> None:
+        reason = {200: 'OK', 404: 'Not Found', 405: 'Method Not Allowed'}[code]
+        lines = [f'HTTP/1.1 {code} {reason}',
+                 f'Content-Type: {content_type}',
+                 f'Content-Length: {len(body)}',
+                 'Connection: close']
+        if encoding:
+            lines.append(f'Content-Encoding: {encoding}')
+        if allow:
+            lines.append(f'Allow: {allow}')
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if not head:
+            writer.write(body)
+        await writer.drain()
+
+    def close(self) -> None:
+        self.sock.close()
@@ -0,0 +1,270 @@
+"""
+Caching, coalescing proxy in front of one miner's API.
+
+Several tools polling the same miner (the Home Assistant integration, the
+fleet monitor, scripts) each open their own connections to port 4028, and
+the small controllers of the Nano 3S and Q slow down when requests pile
+up. :class:`MinerProxy` speaks the same JSON API and sits in between:
+
+- The read-only sections (``version``, ``summary``, ``estats``, ``lcd``,
+  ``pools``) are answered from a short-TTL cache, alone or ``+``-joined
+- A section that is already being fetched for another client is not
+  requested again: every client waiting for it gets the same reply
+- Sections that are missing are fetched in one joined request (one at a
+  time on firmware without batch support)
+- Everything else (``ascset``, pool commands, plain-text requests) is
+  forwarded unchanged, and drops the cache so the next read sees the
+  change
+
+Only one request at a time is sent to the miner. Cached replies are kept
+as the bytes the miner sent, so a hit is a memory copy.
+"""
+
+import json
+import time
+import asyncio
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .exceptions import AvalonMinerApiError, AvalonMinerApiCommunicationError
+from .client import BatchSupport
+from .transport import (
+    DEFAULT_PORT,
+    DEFAULT_TIMEOUT,
+    TERMINATOR,
+    async_exchange,
+    build_request,
+    decode_response,
+)
+
+
+# Read-only commands served from the cache, with their default TTL in
+# seconds (version only changes with a firmware update)
+DEFAULT_TTLS = {
+    'version': 60.0,
+    'summary': 2.0,
+    'estats': 5.0,
+    'lcd': 5.0,
+    'pools': 5.0,
+}
+
+# Largest request accepted from a client
+REQUEST_LIMIT = 64 * 1024
+
+# Cached section: reply bytes (without terminator), decoded reply, fetch time
+Entry = Tuple[bytes, Dict[str, Any], float]
+
+
+class MinerProxy:
+    """API proxy for a single miner: cache, request coalescing and passthrough"""
+
+    def __init__(self, host: str, port: int = DEFAULT_PORT,
+                 ttls: Optional[Mapping[str, float]] = None,
+                 timeout: float = DEFAULT_TIMEOUT, upstream_concurrency: int = 1):
+        """
+        Args:
+            host: Miner IP address
+            port: Miner API port
+            ttls: Read-only command to cache lifetime in seconds
+                (default: :data:`DEFAULT_TTLS`)
+            timeout: Timeout of a request to the miner, and for a client
+                to send its request
+            upstream_concurrency: Requests sent to the miner at the same time
+        """
+        self.host = host
+        self.port = port
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.timeout = timeout
+        self.upstream_concurrency = upstream_concurrency
+        # Whether the firmware accepts "cmd1+cmd2" batches
+        self.batch = BatchSupport()
+
+        # Counters for the periodic stats line
+        self.requests = 0
+        self.hits = 0
+        self.coalesced = 0
+        self.upstream_requests = 0
+        self.passthrough = 0
+        self.errors = 0
+
+        self._cache: Dict[str, Entry] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Bumped by every forwarded write: a read that was sent before it
+        # is not cached
+        self._generation = 0
+        # Created on first use, on the running loop
+        self._upstream: Optional[asyncio.Semaphore] = None
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one client connection (an ``asyncio.start_server`` callback)"""
+        try:
+            try:
+                data, request = await asyncio.wait_for(self._read_request(reader), self.timeout)
+            except (asyncio.TimeoutError, ConnectionError):
+                return
+            if not data:
+                return
+
+            self.requests += 1
+            try:
+                response = await self.respond(data, request)
+            except AvalonMinerApiError:
+                # Close without a reply, as the miner itself would look
+                self.errors += 1
+                return
+            writer.write(response)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[bytes, Any]:
+        """Read until the request is complete JSON (or is plain text)"""
+        data = b''
+        while len(data) < REQUEST_LIMIT:
+            chunk = await reader.read(4096)
+            if not chunk:
+                break
+            data += chunk
+            if not data.lstrip().startswith(b'{'):
+                # Plain-text API request: forwarded as is
+                return data, None
+            try:
+                return data, json.loads(data.decode('utf-8').rstrip('\x00').strip())
+            except (ValueError, UnicodeDecodeError):
+                continue
+        return data, None
+
+    async def respond(self, data: bytes, request: Any = None) -> bytes:
+        """Return the reply to one raw request (``request`` is its decoded JSON)"""
+        if isinstance(request, dict) and not request.get('parameter'):
+            command = request.get('command')
+            if isinstance(command, str):
+                commands = command.split('+')
+                if all(c in self.ttls for c in commands):
+                    return await self.read(commands)
+        return await self.forward(data)
+
+    async def read(self, commands: Sequence[str]) -> bytes:
+        """Reply to read-only commands from the cache, fetching what is missing"""
+        now = time.monotonic()
+        entries: Dict[str, Entry] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        missing: List[str] = []
+        for command in commands:
+            entry = self._cache.get(command)
+            if entry is not None and now - entry[2] < self.ttls[command]:
+                entries[command] = entry
+            elif command in self._inflight:
+                waiting[command] = self._inflight[command]
+            else:
+                missing.append(command)
+
+        if missing:
+            entries.update(await self._fetch_shared(missing))
+        elif waiting:
+            self.coalesced += 1
+        else:
+            self.hits += 1
+
+        for command, future in waiting.items():
+            entries[command] = await future
+
+        if len(commands) == 1:
+            return entries[commands[0]][0] + TERMINATOR
+        # Reassemble the joined reply from the cached bytes
+        parts = [b'"%s":[%s]' % (command.encode(), entries[command][0]) for command in commands]
+        return b'{' + b','.join(parts) + b',"id":1}' + TERMINATOR
+
+    async def _fetch_shared(self, commands: List[str]) -> Dict[str, Entry]:
+        """Fetch sections, letting other clients wait on the same result"""
+        loop = asyncio.get_running_loop()
+        futures = {command: loop.create_future() for command in commands}
+        self._inflight.update(futures)
+        try:
+            entries = await self._fetch(commands)
+        except AvalonMinerApiError as exc:
+            self._settle(futures, {}, exc)
+            raise
+        except BaseException:
+            for future in futures.values():
+                future.cancel()
+            raise
+        finally:
+            for command in commands:
+                self._inflight.pop(command, None)
+
+        error = AvalonMinerApiCommunicationError(f"Incomplete reply from {self.host}:{self.port}")
+        self._settle(futures, entries, error)
+        if len(entries) < len(commands):
+            raise error
+        return entries
+
+    @staticmethod
+    def _settle(futures: Dict[str, asyncio.Future], entries: Dict[str, Entry],
+                error: AvalonMinerApiError) -> None:
+        for command, future in futures.items():
+            if command in entries:
+                future.set_result(entries[command])
+            else:
+                future.set_exception(error)
+                future.exception()  # Fine if nobody else was waiting
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._upstream is None:
+            self._upstream = asyncio.Semaphore(self.upstream_concurrency)
+        return self._upstream
+
+    async def _exchange(self, payload: bytes) -> bytes:
+        self.upstream_requests += 1
+        return await async_exchange(self.host, self.port, payload, self.timeout)
+
+    def _decode(self, raw: bytes) -> Dict[str, Any]:
+        try:
+            return decode_response(raw)
+        except (ValueError, UnicodeDecodeError) as exc:
+            msg = f"Invalid JSON response from {self.host}:{self.port} - {exc}"
+            raise AvalonMinerApiCommunicationError(msg) from exc
+
+    async def _fetch(self, commands: List[str]) -> Dict[str, Entry]:
+        """Request sections from the miner, joined where supported, and cache them"""
+        generation = self._generation
+        entries: Dict[str, Entry] = {}
+        async with self._semaphore():
+            if len(commands) > 1 and self.batch.usable:
+                response = self._decode(await self._exchange(build_request('+'.join(commands))))
+                now = time.monotonic()
+                for command, section in self.batch.split(response, commands).items():
+                    raw = json.dumps(section, separators=(',', ':')).encode('utf-8')
+                    entries[command] = (raw, section, now)
+
+            # The rest one command at a time; a command that fails is left out
+            error = None
+            for command in commands:
+                if command in entries:
+                    continue
+                try:
+                    raw = (await self._exchange(build_request(command))).rstrip(TERMINATOR).strip()
+                    entries[command] = (raw, self._decode(raw), time.monotonic())
+                except AvalonMinerApiError as exc:
+                    error = exc
+            if not entries and error is not None:
+                raise error
+
+        if generation == self._generation:
+            self._cache.update(entries)
+        return entries
+
+    async def forward(self, data: bytes) -> bytes:
+        """Send a request to the miner unchanged and drop the cache afterwards"""
+        self.passthrough += 1
+        async with self._semaphore():
+            try:
+                return await self._exchange(data)
+            finally:
+                self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drop every cached section (and any read still in flight)"""
+        self._generation += 1
+        self._cache.clear()
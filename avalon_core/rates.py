@@ -0,0 +1,118 @@
+"""
+Counter-reset-aware rates of the cumulative summary counters.
+
+``summary`` reports counters that only grow until the miner restarts
+(``Accepted``, ``Rejected``, ``Hardware Errors``, ``Difficulty Accepted``,
+``Difficulty Rejected``), and the firmware's own percentages cover the
+whole uptime. :class:`RateEngine` turns successive readings into current
+rates instead.
+
+Between two polls the delta of each counter is added to an exponentially
+decaying sum, and the elapsed time to a matching decaying duration. Their
+ratio is a time-weighted rate over roughly the last ``tau`` seconds, which
+smooths the few shares that land in a single poll. A restart is detected
+when ``Elapsed`` goes backwards or a counter decreases. The new reading
+then counts from zero over the time since the restart, so a reboot never
+shows up as a negative or huge rate. State lives in preallocated arrays
+indexed by store slot, and every update is O(1).
+"""
+
+import math
+from array import array
+from typing import List, Optional, Sequence
+
+NAN = float('nan')
+
+# Counters tracked, in the order update() expects them
+COUNTERS = ('accepted', 'rejected', 'hardware_errors', 'difficulty_accepted', 'difficulty_rejected')
+
+# Hashes per unit of share difficulty
+HASHES_PER_DIFF1 = 2 ** 32
+
+
+class RateEngine:
+    """Per-miner smoothed rates (per second) of the summary counters"""
+
+    def __init__(self, size: int, tau: float = 300.0):
+        """
+        Args:
+            size: Number of miners (store slots)
+            tau: Time constant of the smoothing, in seconds
+        """
+        self.size = size
+        self.tau = tau
+        n = len(COUNTERS)
+        self.previous = array('d', [NAN]) * (size * n)
+        self.weighted = array('d', [0.0]) * (size * n)
+        self.durations = array('d', [0.0]) * size
+        self.last_time = array('d', [NAN]) * size
+        self.last_elapsed = array('d', [NAN]) * size
+        # Restarts detected per miner
+        self.resets = array('l', [0]) * size
+
+    def update(self, slot: int, t: float, elapsed: Optional[float],
+               values: Sequence[Optional[float]]) -> Optional[List[Optional[float]]]:
+        """
+        Feed one reading of a miner's counters (in :data:`COUNTERS` order)
+
+        Returns the smoothed rate of every counter per second, or None when
+        there is no earlier reading to compare with yet. A counter that has
+        never been reported has a rate of None.
+        """
+        n = len(COUNTERS)
+        base = slot * n
+        previous = self.previous
+        weighted = self.weighted
+
+        last_time = self.last_time[slot]
+        last_elapsed = self.last_elapsed[slot]
+        dt = t - last_time if last_time == last_time else NAN
+        if not dt > 0:
+            # First reading (or a clock step back): just remember it
+            self._remember(slot, t, elapsed, values)
+            return None
+
+        restarted = elapsed is not None and last_elapsed == last_elapsed and elapsed < last_elapsed
+        if not restarted:
+            restarted = any(v is not None and previous[base + i] == previous[base + i]
+                            and v < previous[base + i] for i, v in enumerate(values))
+        if restarted:
+            self.resets[slot] += 1
+            # Counters restarted from zero; they cover the time since boot
+            if elapsed is not None and 0 < elapsed < dt:
+                dt = elapsed
+
+        decay = math.exp(-dt / self.tau)
+        self.durations[slot] = self.durations[slot] * decay + dt
+        duration = self.durations[slot]
+
+        rates: List[Optional[float]] = []
+        for i, value in enumerate(values):
+            j = base + i
+            old = previous[j]
+            if value is None:
+                weighted[j] *= decay
+            elif old != old and not restarted:
+                # First reading of this counter: nothing to compare with
+                previous[j] = value
+                rates.append(None)
+                continue
+            else:
+                weighted[j] = weighted[j] * decay + (value if restarted else value - old)
+                previous[j] = value
+            rates.append(weighted[j] / duration if previous[j] == previous[j] else None)
+
+        self.last_time[slot] = t
+        if elapsed is not None:
+            self.last_elapsed[slot] = elapsed
+        return rates
+
+    def _remember(self, slot: int, t: float, elapsed: Optional[float],
+                  values: Sequence[Optional[float]]) -> None:
+        base = slot * len(COUNTERS)
+        for i, value in enumerate(values):
+            if value is not None:
+                self.previous[base + i] = value
+        self.last_time[slot] = t
+        if elapsed is not None:
+            self.last_elapsed[slot] = elapsed
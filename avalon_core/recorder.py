@@ -0,0 +1,291 @@
+"""
+Local time-series recorder for fleet metrics.
+
+The numeric metrics of every poll are appended to a SQLite database in WAL
+mode. Rows are buffered in memory and inserted in one transaction per
+flush. Raw samples are rolled up into 1-minute buckets, and those into
+1-hour buckets, as each bucket completes. Every tier is pruned to its own
+retention, and SQLite reuses the freed pages, so the file stops growing
+once the retention windows are full. At roughly
+
+    miners x (raw_retention / interval + minute_retention / 60 + hour_retention / 3600)
+
+rows, months of hourly history for thousands of miners stay small next to
+the raw tier.
+
+SQLite ships with Python, so this needs no extra dependency.
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .snapshot import MinerSnapshot
+from .store import STATUSES
+
+
+# Snapshot field -> column of a raw sample
+GAUGES = (
+    ('hashrate_current', 'hashrate_5s'),
+    ('hashrate_average', 'hashrate_avg'),
+    ('temp', 'temp_max'),
+    ('temp_avg', 'temp_avg'),
+    ('power', 'power'),
+    ('fan1', 'fan1'),
+    ('fan2', 'fan2'),
+    ('fan3', 'fan3'),
+    ('fan4', 'fan4'),
+    ('estats_age', 'estats_age'),
+    ('lcd_age', 'lcd_age'),
+)
+COUNTERS = (
+    ('accepted', 'accepted'),
+    ('rejected', 'rejected'),
+    ('hardware_errors', 'hw_errors'),
+)
+
+# Rollup table, bucket width in seconds, source table
+ROLLUPS = (
+    ('samples_1m', 60, 'samples'),
+    ('samples_1h', 3600, 'samples_1m'),
+)
+
+RESOLUTIONS = {'raw': 'samples', '1m': 'samples_1m', '1h': 'samples_1h'}
+
+DAY = 86400
+_ACTIVE = STATUSES.index('Active')
+
+
+def _gauge_names() -> List[str]:
+    return [column for _, column in GAUGES]
+
+
+def _counter_names() -> List[str]:
+    return [column for _, column in COUNTERS]
+
+
+def _schema() -> str:
+    gauges = _gauge_names()
+    counters = _counter_names()
+    raw = ', '.join([f'{c} REAL' for c in gauges] + [f'{c} INTEGER' for c in counters])
+    rollup = ', '.join(
+        ['n INTEGER NOT NULL', 'active INTEGER NOT NULL']
+        + [f'{c} REAL' for c in gauges]
+        + ['hashrate_5s_min REAL', 'temp_max_peak REAL']
+        + [f'{c} INTEGER' for c in counters])
+    return f"""
+        CREATE TABLE IF NOT EXISTS miners (
+            id INTEGER PRIMARY KEY,
+            ip TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS samples (
+            ts INTEGER NOT NULL, miner INTEGER NOT NULL, status INTEGER NOT NULL, {raw},
+            PRIMARY KEY (ts, miner)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS samples_1m (
+            ts INTEGER NOT NULL, miner INTEGER NOT NULL, {rollup},
+            PRIMARY KEY (ts, miner)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS samples_1h (
+            ts INTEGER NOT NULL, miner INTEGER NOT NULL, {rollup},
+            PRIMARY KEY (ts, miner)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS rollup_state (
+            name TEXT PRIMARY KEY,
+            done_until INTEGER NOT NULL
+        );
+    """
+
+
+def _rollup_sql(table: str, width: int, source: str) -> str:
+    """INSERT ... SELECT aggregating ``source`` rows in [?, ?) into ``table``"""
+    gauges = _gauge_names()
+    counters = _counter_names()
+    bucket = f'ts / {width} * {width}'
+    if source == 'samples':
+        values = (['COUNT(*)', f'SUM(status = {_ACTIVE})']
+                  + [f'AVG({c})' for c in gauges]
+                  + ['MIN(hashrate_5s)', 'MAX(temp_max)'])
+    else:
+        # Re-aggregate a rollup: averages weighted by their sample count
+        values = (['SUM(n)', 'SUM(active)']
+                  + [f'SUM({c} * n) / SUM(CASE WHEN {c} IS NOT NULL THEN n END)' for c in gauges]
+                  + ['MIN(hashrate_5s_min)', 'MAX(temp_max_peak)'])
+    # Counters are cumulative: keep the highest value seen in the bucket
+    values += [f'MAX({c})' for c in counters]
+    columns = ['ts', 'miner', 'n', 'active'] + gauges + ['hashrate_5s_min', 'temp_max_peak'] + counters
+    return (f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+            f"SELECT {bucket}, miner, {', '.join(values)} FROM {source} "
+            f"WHERE ts >= ? AND ts < ? GROUP BY {bucket}, miner")
+
+
+class MetricsRecorder:
+    """Append fleet poll results to SQLite with rollups and retention"""
+
+    def __init__(self, path: str, raw_retention: float = 2 * DAY,
+                 minute_retention: float = 30 * DAY,
+                 hour_retention: Optional[float] = 730 * DAY,
+                 flush_interval: float = 5, maintenance_interval: float = 60,
+                 grace: float = 120):
+        """
+        Args:
+            path: Database file (created if missing)
+            raw_retention: Seconds of raw samples to keep
+            minute_retention: Seconds of 1-minute rollups to keep
+            hour_retention: Seconds of 1-hour rollups to keep (None: forever)
+            flush_interval: Seconds between batched inserts
+            maintenance_interval: Seconds between rollup and pruning passes
+            grace: Seconds a bucket stays open after it ends, for polls
+                that complete late
+        """
+        self.path = path
+        self.raw_retention = raw_retention
+        self.minute_retention = minute_retention
+        self.hour_retention = hour_retention
+        self.flush_interval = flush_interval
+        self.maintenance_interval = maintenance_interval
+        self.grace = grace
+        self.rows_written = 0
+
+        self._pending: List[Tuple] = []
+        self._miner_ids: Dict[str, int] = {}
+        self._next_maintenance = 0.0
+        self._lock = threading.Lock()
+        # Guards only the swap of _pending, so record() never waits on a write
+        self._pending_lock = threading.Lock()
+        self._rollup_sql = {table: _rollup_sql(table, width, source)
+                            for table, width, source in ROLLUPS}
+
+        columns = ['ts', 'miner', 'status'] + _gauge_names() + _counter_names()
+        self._insert_sql = (f"INSERT OR REPLACE INTO samples ({', '.join(columns)}) "
+                            f"VALUES ({', '.join('?' * len(columns))})")
+
+        # Flushes run in a worker thread; the lock serialises them
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(_schema())
+        self._add_missing_columns()
+        for miner_id, ip in self.conn.execute('SELECT id, ip FROM miners'):
+            self._miner_ids[ip] = miner_id
+
+    def _add_missing_columns(self) -> None:
+        """Add gauge columns that are newer than the database file"""
+        for table in ['samples'] + [table for table, _, _ in ROLLUPS]:
+            existing = {row[1] for row in self.conn.execute(f'PRAGMA table_info({table})')}
+            for column in _gauge_names():
+                if column not in existing:
+                    self.conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} REAL')
+        self.conn.commit()
+
+    def record(self, snapshot: MinerSnapshot) -> None:
+        """Buffer the metrics of one poll (written on the next flush)"""
+        status = STATUSES.index(snapshot.status) if snapshot.status in STATUSES else 0
+        row = ((int(snapshot.last_attempt), snapshot.ip, status)
+               + tuple(getattr(snapshot, name) for name, _ in GAUGES)
+               + tuple(getattr(snapshot, name) for name, _ in COUNTERS))
+        with self._pending_lock:
+            self._pending.append(row)
+
+    def _miner_id(self, ip: str) -> int:
+        miner_id = self._miner_ids.get(ip)
+        if miner_id is None:
+            self.conn.execute('INSERT OR IGNORE INTO miners (ip) VALUES (?)', (ip,))
+            miner_id = self.conn.execute('SELECT id FROM miners WHERE ip = ?', (ip,)).fetchone()[0]
+            self._miner_ids[ip] = miner_id
+        return miner_id
+
+    def flush(self) -> int:
+        """Insert every buffered sample in one transaction; returns the row count"""
+        with self._lock:
+            with self._pending_lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+            with self.conn:
+                self.conn.executemany(
+                    self._insert_sql,
+                    [(row[0], self._miner_id(row[1])) + row[2:] for row in rows])
+            self.rows_written += len(rows)
+            return len(rows)
+
+    def sync(self, now: Optional[float] = None) -> None:
+        """Flush, and run :meth:`maintain` when it is due"""
+        self.flush()
+        now = time.time() if now is None else now
+        if now >= self._next_maintenance:
+            self.maintain(now)
+            self._next_maintenance = now + self.maintenance_interval
+
+    def _done_until(self, table: str) -> Optional[int]:
+        row = self.conn.execute(
+            'SELECT done_until FROM rollup_state WHERE name = ?', (table,)).fetchone()
+        return row[0] if row else None
+
+    def maintain(self, now: Optional[float] = None) -> None:
+        """Roll completed buckets up and drop data past its retention"""
+        now = time.time() if now is None else now
+        with self._lock, self.conn:
+            for table, width, source in ROLLUPS:
+                done = self._done_until(table)
+                if done is None:
+                    first = self.conn.execute(f'SELECT MIN(ts) FROM {source}').fetchone()[0]
+                    if first is None:
+                        continue
+                    done = first // width * width
+
+                end = int((now - self.grace) // width * width)
+                if source != 'samples':
+                    # Only buckets whose source rows are all rolled up
+                    source_done = self._done_until(source) or 0
+                    end = min(end, source_done // width * width)
+                if end <= done:
+                    continue
+
+                self.conn.execute(self._rollup_sql[table], (done, end))
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO rollup_state (name, done_until) VALUES (?, ?)',
+                    (table, end))
+
+            # Never drop rows that have not been rolled up yet
+            raw_done = self._done_until('samples_1m')
+            if raw_done is not None:
+                self._prune('samples', min(now - self.raw_retention, raw_done))
+            minute_done = self._done_until('samples_1h')
+            if minute_done is not None:
+                self._prune('samples_1m', min(now - self.minute_retention, minute_done))
+            if self.hour_retention is not None:
+                self._prune('samples_1h', now - self.hour_retention)
+
+    def _prune(self, table: str, cutoff: float) -> None:
+        self.conn.execute(f'DELETE FROM {table} WHERE ts < ?', (int(cutoff),))
+
+    def history(self, ip: str, start: float, end: Optional[float] = None,
+                resolution: str = 'raw') -> List[Dict[str, Any]]:
+        """
+        Samples of one miner between ``start`` and ``end`` (Unix times)
+
+        ``resolution`` is 'raw', '1m' or '1h'. Rollup rows carry the sample
+        count ``n``, the number of those with status Active, averages of the
+        gauges, the lowest 5s hash rate, the peak temperature and the
+        highest value of each counter.
+        """
+        table = RESOLUTIONS[resolution]
+        end = time.time() if end is None else end
+        with self._lock:
+            miner_id = self._miner_ids.get(ip)
+            if miner_id is None:
+                return []
+            cursor = self.conn.execute(
+                f'SELECT * FROM {table} WHERE ts >= ? AND ts <= ? AND miner = ? ORDER BY ts',
+                (int(start), int(end), miner_id))
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, row)) for row in cursor]
+
+    def close(self) -> None:
+        """Write what is buffered, bring the rollups up to date and close"""
+        self.flush()
+        self.maintain()
+        with self._lock:
+            self.conn.close()
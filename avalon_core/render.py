@@ -0,0 +1,212 @@
+"""
+Differential terminal renderer.
+
+Keeps the previous frame and, on each refresh, rewrites only the rows
+that changed using ANSI cursor addressing, all in a single write. Nothing
+is cleared between frames, so there is no flicker, and a refresh where
+only the clock and a few miners changed costs a few hundred bytes
+instead of the whole table. That matters over SSH to a remote site.
+
+:class:`KeyReader` delivers single keypresses for the interactive
+controls without blocking the event loop.
+"""
+
+import os
+import sys
+import shutil
+import asyncio
+from typing import Callable, List, Optional, TextIO
+
+try:
+    import termios
+    import tty
+except ImportError:  # Windows
+    termios = tty = None
+
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
+
+CSI = '\033['
+HIDE_CURSOR = CSI + '?25l'
+SHOW_CURSOR = CSI + '?25h'
+CLEAR_SCREEN = CSI + 'H' + CSI + '2J'
+CLEAR_TO_EOL = CSI + 'K'
+CLEAR_TO_END = CSI + 'J'
+
+
+# Escape sequences of the navigation keys, by name
+ESCAPE_KEYS = {
+    CSI + 'A': 'up', CSI + 'B': 'down',
+    CSI + '5~': 'pgup', CSI + '6~': 'pgdn',
+    CSI + 'H': 'home', CSI + 'F': 'end',
+    CSI + '1~': 'home', CSI + '4~': 'end',
+    '\033OA': 'up', '\033OB': 'down', '\033OH': 'home', '\033OF': 'end',
+}
+
+# Second code of the Windows console's two-code navigation keys
+WINDOWS_KEYS = {'H': 'up', 'P': 'down', 'I': 'pgup', 'Q': 'pgdn', 'G': 'home', 'O': 'end'}
+
+# SetConsoleMode flag that makes the Windows console interpret ANSI sequences
+ENABLE_VIRTUAL_TERMINAL_PROCESSING = 0x0004
+
+
+def _enable_vt_mode(stream: TextIO) -> bool:
+    """
+    Turn on ANSI escape processing for a Windows console stream
+
+    Returns False if the console cannot do it (Windows before 10 1511), in
+    which case cursor addressing would print as garbage.
+    """
+    import ctypes
+    from ctypes import wintypes
+
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    try:
+        handle = msvcrt.get_osfhandle(stream.fileno())
+    except (AttributeError, OSError, ValueError):
+        return False
+    mode = wintypes.DWORD()
+    if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+        return False
+    if mode.value & ENABLE_VIRTUAL_TERMINAL_PROCESSING:
+        return True
+    return bool(kernel32.SetConsoleMode(handle, mode.value | ENABLE_VIRTUAL_TERMINAL_PROCESSING))
+
+
+def _move(row: int) -> str:
+    """Cursor to the start of a 0-based row"""
+    return f"{CSI}{row + 1};1H"
+
+
+class FrameRenderer:
+    """Draw successive frames (lists of lines), emitting only changed rows"""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream or sys.stdout
+        self.interactive = self.stream.isatty()
+        self._previous: List[str] = []
+        self._size = None
+        self.bytes_written = 0
+
+        if self.interactive and os.name == 'nt' and not _enable_vt_mode(self.stream):
+            # No ANSI support: fall back to plain full frames
+            self.interactive = False
+
+    def invalidate(self) -> None:
+        """Force the next frame to be drawn in full"""
+        self._previous = []
+
+    def render(self, lines: List[str]) -> None:
+        """Draw a frame"""
+        if not self.interactive:
+            # Redirected output: plain full frames, no cursor addressing
+            self._write('\n'.join(lines) + '\n')
+            return
+
+        size = shutil.get_terminal_size()
+        if size != self._size or len(lines) >= size.lines:
+            # Resized, or taller than the screen so rows scroll and cursor
+            # addressing no longer matches: redraw in full
+            self._size = size
+            self._previous = []
+
+        previous = self._previous
+        if not previous:
+            parts = [HIDE_CURSOR, CLEAR_SCREEN]
+            parts.extend(line + CLEAR_TO_EOL + '\n' for line in lines)
+        else:
+            parts = []
+            for row, line in enumerate(lines):
+                if row >= len(previous) or previous[row] != line:
+                    parts.append(_move(row) + line + CLEAR_TO_EOL)
+            if len(lines) < len(previous):
+                parts.append(_move(len(lines)) + CLEAR_TO_END)
+            parts.append(_move(len(lines)))
+
+        self._previous = list(lines)
+        if parts:
+            self._write(''.join(parts))
+
+    def close(self) -> None:
+        """Restore the cursor"""
+        if self.interactive:
+            self._write(SHOW_CURSOR)
+
+    def _write(self, text: str) -> None:
+        self.stream.write(text)
+        self.stream.flush()
+        self.bytes_written += len(text)
+
+
+def split_keys(data: str) -> List[str]:
+    """Split raw terminal input into key names (``'up'``, ``'pgdn'``, ...) and characters"""
+    keys = []
+    i = 0
+    while i < len(data):
+        if data[i] == '\033':
+            for sequence, name in ESCAPE_KEYS.items():
+                if data.startswith(sequence, i):
+                    keys.append(name)
+                    i += len(sequence)
+                    break
+            else:
+                keys.append('esc')
+                i += 1
+        else:
+            keys.append(data[i])
+            i += 1
+    return keys
+
+
+class KeyReader:
+    """Single keypresses from the terminal, delivered on the event loop"""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream or sys.stdin
+        self.enabled = self.stream.isatty() and (termios is not None or msvcrt is not None)
+        self._saved = None
+        self._fd: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, callback: Callable[[str], None]) -> None:
+        """Call ``callback(key)`` for every keypress (needs a running loop)"""
+        if not self.enabled:
+            return
+        if termios is not None:
+            # cbreak: keys arrive without Enter and are not echoed; Ctrl+C
+            # still interrupts
+            fd = self._fd = self.stream.fileno()
+            self._saved = termios.tcgetattr(fd)
+            tty.setcbreak(fd)
+            asyncio.get_running_loop().add_reader(fd, self._on_input, callback)
+        else:
+            self._task = asyncio.ensure_future(self._poll_console(callback))
+
+    def _on_input(self, callback: Callable[[str], None]) -> None:
+        data = os.read(self._fd, 64).decode(errors='ignore')
+        for key in split_keys(data):
+            callback(key)
+
+    async def _poll_console(self, callback: Callable[[str], None]) -> None:
+        """Windows console has no selectable stdin, poll it instead"""
+        while True:
+            while msvcrt.kbhit():
+                key = msvcrt.getwch()
+                if key in ('\x00', '\xe0'):
+                    key = WINDOWS_KEYS.get(msvcrt.getwch(), '')
+                if key:
+                    callback(key)
+            await asyncio.sleep(0.05)
+
+    def stop(self) -> None:
+        """Stop reading and restore the terminal mode"""
+        if self._fd is not None:
+            asyncio.get_running_loop().remove_reader(self._fd)
+            termios.tcsetattr(self._fd, termios.TCSADRAIN, self._saved)
+            self._fd = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
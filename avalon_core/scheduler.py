@@ -0,0 +1,66 @@
+"""
+Rolling poll scheduler.
+
+Instead of polling the whole fleet at once and then sleeping, every miner
+gets its own due time. Miners are spread evenly across the interval when
+they are added, so requests go out at a steady rate rather than in one
+burst per refresh. Each miner is then rescheduled exactly one interval
+after its previous slot, which keeps its sampling period accurate however
+long other miners take to answer. A small random jitter is applied to each
+firing time without accumulating into the slot itself.
+"""
+
+import heapq
+import random
+import time
+from typing import Hashable, List, Optional, Tuple
+
+
+class RollingScheduler:
+    """Min-heap of per-key due times repeating every ``interval`` seconds"""
+
+    def __init__(self, interval: float, jitter: float = 0.05):
+        """
+        Args:
+            interval: Period between two polls of the same key, in seconds
+            jitter: Random offset applied to each firing time, as a fraction
+                of the interval
+        """
+        self.interval = interval
+        self.jitter = jitter
+        # (fire_at, slot, key): slot is the unjittered due time
+        self._heap: List[Tuple[float, float, Hashable]] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def _jittered(self, slot: float) -> float:
+        return slot + random.uniform(0, self.jitter * self.interval)
+
+    def add_all(self, keys: List[Hashable], now: Optional[float] = None) -> None:
+        """Schedule keys spread evenly over one interval starting at ``now``"""
+        now = time.monotonic() if now is None else now
+        step = self.interval / len(keys) if keys else 0
+        for i, key in enumerate(keys):
+            slot = now + i * step
+            heapq.heappush(self._heap, (self._jittered(slot), slot, key))
+
+    def pop_due(self, now: Optional[float] = None) -> List[Hashable]:
+        """Return every key whose time has come and reschedule it"""
+        now = time.monotonic() if now is None else now
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, slot, key = heap[0]
+            slot += self.interval
+            if slot <= now:
+                # Fell more than a period behind (e.g. suspended process):
+                # skip the missed slots instead of firing them in a burst
+                slot += (now - slot) // self.interval * self.interval + self.interval
+            heapq.heapreplace(heap, (self._jittered(slot), slot, key))
+            due.append(key)
+        return due
+
+    def next_due(self) -> Optional[float]:
+        """Monotonic time of the next firing, or None if nothing is scheduled"""
+        return self._heap[0][0] if self._heap else None
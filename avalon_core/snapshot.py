@@ -0,0 +1,134 @@
+"""
+Compact per-poll miner snapshot.
+
+One :class:`MinerSnapshot` is kept per miner by the fleet tools. Values are
+stored as plain numbers in the units listed in :data:`UNITS` (the API's
+own units where it has one), so aggregating, sorting and exporting need
+no parsing. Display strings are produced only by the renderer. The class
+uses ``__slots__`` so a snapshot costs a fixed, small amount of memory.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+
+# Unit of every numeric field
+UNITS = {
+    'work_mode': '',
+    'power': 'W',
+    'hashrate_current': 'MH/s',
+    'hashrate_average': 'MH/s',
+    'temp': '°C',
+    'temp_avg': '°C',
+    'fan1': 'RPM',
+    'fan2': 'RPM',
+    'fan3': 'RPM',
+    'fan4': 'RPM',
+    'accepted': '',
+    'rejected': '',
+    'hardware_errors': '',
+    'difficulty_accepted': '',
+    'difficulty_rejected': '',
+    'accepted_rate': '1/min',
+    'rejected_rate': '1/min',
+    'hw_error_rate': '1/min',
+    'accepted_hashrate': 'MH/s',
+    'current_rejected_pct': '%',
+    'last_share_diff': '',
+    'best_share': '',
+    'rejected_pct': '%',
+    'uptime': 's',
+    'estats_age': 's',
+    'lcd_age': 's',
+    'latency_connect': 'ms',
+    'latency_send': 'ms',
+    'latency_first_byte': 'ms',
+    'latency_complete': 'ms',
+    'latency_parse': 'ms',
+    'last_update': 's',
+    'last_attempt': 's',
+}
+
+
+class MinerSnapshot:
+    """Latest known state of one miner, numeric values unformatted"""
+
+    __slots__ = (
+        'ip', 'model', 'dna', 'status', 'work_mode', 'power', 'hashrate_current',
+        'hashrate_average', 'temp', 'temp_avg', 'fan1', 'fan2', 'fan3', 'fan4',
+        'accepted', 'rejected', 'hardware_errors', 'difficulty_accepted',
+        'difficulty_rejected', 'accepted_rate', 'rejected_rate', 'hw_error_rate',
+        'accepted_hashrate', 'current_rejected_pct', 'pool_url', 'last_share_diff',
+        'best_share', 'rejected_pct', 'uptime', 'estats_age', 'lcd_age', 'latency_connect', 'latency_send',
+        'latency_first_byte', 'latency_complete', 'latency_parse', 'last_update',
+        'last_attempt', 'error', 'error_class', 'stale',
+    )
+
+    def __init__(self, ip: str, status: str = 'Unknown'):
+        self.ip = ip
+        self.model: Optional[str] = None
+        # Chip DNA from the version command (identifies the unit)
+        self.dna: Optional[str] = None
+        # Active, StandBy, Error, Offline or Unknown
+        self.status = status
+        self.work_mode: Optional[int] = None
+        self.power: Optional[float] = None
+        self.hashrate_current: Optional[float] = None
+        self.hashrate_average: Optional[float] = None
+        # Max ASIC temperature (average if the firmware has no max)
+        self.temp: Optional[float] = None
+        self.temp_avg: Optional[float] = None
+        # Fan speeds (fans the model does not have stay None or read 0)
+        self.fan1: Optional[int] = None
+        self.fan2: Optional[int] = None
+        self.fan3: Optional[int] = None
+        self.fan4: Optional[int] = None
+        # Cumulative share and hardware error counters since the last restart
+        self.accepted: Optional[int] = None
+        self.rejected: Optional[int] = None
+        self.hardware_errors: Optional[int] = None
+        self.difficulty_accepted: Optional[float] = None
+        self.difficulty_rejected: Optional[float] = None
+        # Current rates from counter deltas (see rates.RateEngine): shares
+        # and HW errors per minute, hash rate implied by accepted
+        # difficulty, and rejected share of the recent difficulty
+        self.accepted_rate: Optional[float] = None
+        self.rejected_rate: Optional[float] = None
+        self.hw_error_rate: Optional[float] = None
+        self.accepted_hashrate: Optional[float] = None
+        self.current_rejected_pct: Optional[float] = None
+        self.pool_url: Optional[str] = None
+        self.last_share_diff: Optional[float] = None
+        self.best_share: Optional[float] = None
+        # Firmware's Pool Rejected% since the miner started
+        self.rejected_pct: Optional[float] = None
+        self.uptime: Optional[int] = None
+        # Seconds since the cached estats / lcd section behind the values
+        # above was fetched (0 when fetched by this poll, see tiers)
+        self.estats_age: Optional[float] = None
+        self.lcd_age: Optional[float] = None
+        # Time this poll's requests spent in each phase (see timing.PHASES),
+        # summed over the requests; None unless request timing is on
+        self.latency_connect: Optional[float] = None
+        self.latency_send: Optional[float] = None
+        self.latency_first_byte: Optional[float] = None
+        self.latency_complete: Optional[float] = None
+        self.latency_parse: Optional[float] = None
+        # Unix time of the last successful poll (carried forward by failed
+        # ones, None until the first success) and of this poll attempt
+        self.last_update: Optional[float] = None
+        self.last_attempt = time.time()
+        self.error: Optional[str] = None
+        # refused, timeout, reset, bad_json or other when a request failed
+        # (request timing only)
+        self.error_class: Optional[str] = None
+        # Set when the miner's poll missed the deadline and this is the
+        # previous result carried forward
+        self.stale = False
+
+    def __repr__(self) -> str:
+        return f"MinerSnapshot(ip={self.ip!r}, status={self.status!r})"
+
+    def as_dict(self) -> Dict[str, Any]:
+        """All fields as a plain dict (numbers stay numbers)"""
+        return {name: getattr(self, name) for name in self.__slots__}
@@ -0,0 +1,181 @@
+"""
+Columnar fleet state with incrementally maintained aggregates.
+
+Every miner gets a fixed slot. Each numeric metric is one ``array('d')``
+column indexed by slot, with NaN for "no value". Sums, counts of present
+values and per-status miner counts are adjusted by the difference between
+the old and the new value whenever a result lands, so fleet totals,
+averages and group-by totals are O(1) to read however large the fleet.
+
+Float sums maintained by add/subtract can drift by a few ULPs over a very
+long run; :meth:`FleetStore.recompute` rebuilds them exactly in one pass,
+and the fleet monitor calls it once an hour.
+"""
+
+import math
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .snapshot import MinerSnapshot
+
+
+# Numeric snapshot fields kept as columns
+METRICS = ('hashrate_current', 'hashrate_average', 'power', 'temp', 'rejected_pct', 'uptime',
+           'accepted_rate', 'rejected_rate', 'hw_error_rate', 'accepted_hashrate',
+           'current_rejected_pct')
+
+# Status values, stored as small integer codes
+STATUSES = ('Unknown', 'Active', 'StandBy', 'Error', 'Offline')
+
+NAN = float('nan')
+
+
+class FleetStore:
+    """Structure-of-arrays store of the latest metrics of every miner"""
+
+    def __init__(self, ips: Iterable[str]):
+        self.ips: List[str] = list(ips)
+        self.slots: Dict[str, int] = {ip: i for i, ip in enumerate(self.ips)}
+        size = len(self.ips)
+
+        self.columns: Dict[str, array] = {m: array('d', [NAN]) * size for m in METRICS}
+        self.status = array('b', [0]) * size
+        self.stale = array('b', [0]) * size
+        self.models: List[Optional[str]] = [None] * size
+        self.pools: List[Optional[str]] = [None] * size
+        # Bumped on every change, so views can cache orderings built from it
+        self.version = 0
+        # Per field, bumped only when some miner's value of it changes, so a
+        # view can keep its filter and sort results while other fields move
+        self.changes: Dict[str, int] = dict.fromkeys(METRICS + ('status', 'model', 'pool'), 0)
+
+        self._sums = dict.fromkeys(METRICS, 0.0)
+        self._counts = dict.fromkeys(METRICS, 0)
+        self._status_counts = [0] * len(STATUSES)
+        self._status_counts[0] = size
+        self._stale_count = 0
+        # (field, group value) -> metric -> [sum, count]
+        self._groups: Dict[Tuple[str, Optional[str]], Dict[str, List[float]]] = {}
+        for i in range(size):
+            self._group_add(i, 1)
+
+    def __len__(self) -> int:
+        return len(self.ips)
+
+    def _group_keys(self, slot: int) -> Tuple[Tuple[str, Optional[str]], ...]:
+        """Group-by keys of a slot: by model and by status"""
+        return (('model', self.models[slot]), ('status', STATUSES[self.status[slot]]))
+
+    def _group_add(self, slot: int, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) a slot's values from its groups"""
+        for key in self._group_keys(slot):
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = {m: [0.0, 0] for m in METRICS + ('miners',)}
+            group['miners'][1] += sign
+            for metric in METRICS:
+                value = self.columns[metric][slot]
+                if value == value:  # not NaN
+                    group[metric][0] += sign * value
+                    group[metric][1] += sign
+
+    def update(self, snapshot: MinerSnapshot) -> None:
+        """Store a miner's latest snapshot and adjust every aggregate"""
+        slot = self.slots[snapshot.ip]
+        self.version += 1
+        self._group_add(slot, -1)
+
+        for metric in METRICS:
+            column = self.columns[metric]
+            old = column[slot]
+            if old == old:
+                self._sums[metric] -= old
+                self._counts[metric] -= 1
+            new = getattr(snapshot, metric)
+            if new is None:
+                column[slot] = NAN
+                if old == old:
+                    self.changes[metric] += 1
+            else:
+                column[slot] = new
+                self._sums[metric] += new
+                self._counts[metric] += 1
+                if old != new:
+                    self.changes[metric] += 1
+
+        code = STATUSES.index(snapshot.status) if snapshot.status in STATUSES else 0
+        if code != self.status[slot]:
+            self.changes['status'] += 1
+        self._status_counts[self.status[slot]] -= 1
+        self._status_counts[code] += 1
+        self.status[slot] = code
+        if snapshot.model != self.models[slot]:
+            self.changes['model'] += 1
+            self.models[slot] = snapshot.model
+        if snapshot.pool_url != self.pools[slot]:
+            self.changes['pool'] += 1
+            self.pools[slot] = snapshot.pool_url
+        self.set_stale(snapshot.ip, snapshot.stale)
+
+        self._group_add(slot, 1)
+
+    def set_stale(self, ip: str, stale: bool) -> None:
+        """Flag or clear a miner's result as carried forward"""
+        slot = self.slots[ip]
+        flag = 1 if stale else 0
+        if flag != self.stale[slot]:
+            self.version += 1
+        self._stale_count += flag - self.stale[slot]
+        self.stale[slot] = flag
+
+    def total(self, metric: str) -> float:
+        """Sum of a metric over all miners that report it"""
+        return self._sums[metric]
+
+    def present(self, metric: str) -> int:
+        """Number of miners that currently report a metric"""
+        return self._counts[metric]
+
+    def mean(self, metric: str) -> Optional[float]:
+        """Average of a metric over the miners that report it"""
+        count = self._counts[metric]
+        return self._sums[metric] / count if count else None
+
+    def count(self, status: str) -> int:
+        """Number of miners with the given status"""
+        return self._status_counts[STATUSES.index(status)]
+
+    @property
+    def stale_count(self) -> int:
+        return self._stale_count
+
+    def group_total(self, field: str, value: Optional[str], metric: str = 'miners') -> float:
+        """
+        Sum of a metric over one group, e.g. ``group_total('model', 'Q', 'power')``
+
+        ``metric='miners'`` returns the number of miners in the group.
+        """
+        group = self._groups.get((field, value))
+        if group is None:
+            return 0
+        entry = group[metric]
+        return entry[1] if metric == 'miners' else entry[0]
+
+    def groups(self, field: str) -> List[Optional[str]]:
+        """Values of a group-by field that currently have miners"""
+        return [value for (name, value), group in self._groups.items()
+                if name == field and group['miners'][1]]
+
+    def recompute(self) -> None:
+        """Rebuild every aggregate from the columns (exact, O(n))"""
+        for metric in METRICS:
+            values = [v for v in self.columns[metric] if v == v]
+            self._sums[metric] = math.fsum(values)
+            self._counts[metric] = len(values)
+        self._status_counts = [0] * len(STATUSES)
+        for code in self.status:
+            self._status_counts[code] += 1
+        self._stale_count = sum(self.stale)
+        self._groups = {}
+        for i in range(len(self.ips)):
+            self._group_add(i, 1)
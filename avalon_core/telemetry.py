@@ -0,0 +1,171 @@
+"""
+Per-chip and per-PSU telemetry decoded into compact numeric arrays.
+
+``PVT_T0`` (chip temperatures), ``PLL0`` (PLL lock counters) and ``PS``
+(power supply readings) are space-separated integer lists inside the
+``MM ID0`` custom data. They are decoded into :class:`array.array` values,
+which take a few bytes per chip instead of a Python object each.
+
+When NumPy is installed, fleet-wide statistics are computed over one
+concatenated array with segment reductions, so finding a hot or dead
+chip among thousands of miners needs no per-chip Python loop. Without
+NumPy the same results are computed with the standard library.
+"""
+
+import math
+import re
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from .parser import _raw_mm_id0, parse_mm_id0
+
+try:
+    import numpy as np
+except ImportError:  # Optional: pure Python fallback below
+    np = None
+
+
+_INT = re.compile(r'-?\d+')
+
+# Meaning of the PS[...] positions (raw units)
+PS_ERROR = 0
+PS_OUTPUT_VOLTAGE = 2
+PS_OUTPUT_CURRENT = 3
+PS_COMMANDED_VOLTAGE = 5
+PS_OUTPUT_POWER = 6
+
+
+def parse_int_array(value: Optional[str]) -> array:
+    """
+    Decode a space-separated integer list (e.g. ``PVT_T0``) into an array
+
+    Stray text such as a ``PS[`` prefix is ignored. Missing values give an
+    empty array.
+    """
+    if not value:
+        return array('l')
+    try:
+        return array('l', map(int, value.split()))
+    except ValueError:
+        return array('l', map(int, _INT.findall(value)))
+
+
+@dataclass
+class ChipStats:
+    """Summary of one numeric series (e.g. the chip temperatures of a miner)"""
+    count: int = 0
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    mean: Optional[float] = None
+    stddev: Optional[float] = None
+    # Indices of values more than ``threshold`` standard deviations from
+    # the mean
+    outliers: List[int] = field(default_factory=list)
+
+
+def chip_stats(values: Sequence[float], threshold: float = 3.0) -> ChipStats:
+    """Min/max/mean/population stddev and outlier indices of a series"""
+    count = len(values)
+    if not count:
+        return ChipStats()
+
+    if np is not None:
+        data = np.asarray(values, dtype=float)
+        mean = float(data.mean())
+        stddev = float(data.std())
+        outliers = (np.nonzero(np.abs(data - mean) > threshold * stddev)[0].tolist()
+                    if stddev else [])
+        return ChipStats(count, float(data.min()), float(data.max()), mean, stddev, outliers)
+
+    mean = sum(values) / count
+    stddev = math.sqrt(sum((v - mean) ** 2 for v in values) / count)
+    limit = threshold * stddev
+    outliers = [i for i, v in enumerate(values) if abs(v - mean) > limit] if stddev else []
+    return ChipStats(count, min(values), max(values), mean, stddev, outliers)
+
+
+def fleet_chip_stats(series: Mapping[str, Sequence[float]],
+                     threshold: float = 3.0) -> Dict[str, ChipStats]:
+    """
+    :func:`chip_stats` for many miners at once
+
+    With NumPy every miner's series is concatenated into one array and
+    reduced per segment, so the cost is a handful of vectorised passes
+    over all chips of the fleet rather than one Python loop per chip.
+    Miners with no values are left out.
+    """
+    keys = [key for key, values in series.items() if len(values)]
+    if np is None:
+        return {key: chip_stats(series[key], threshold) for key in keys}
+    if not keys:
+        return {}
+
+    counts = np.fromiter((len(series[key]) for key in keys), dtype=np.int64, count=len(keys))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    data = np.concatenate([np.asarray(series[key], dtype=float) for key in keys])
+
+    sums = np.add.reduceat(data, starts)
+    means = sums / counts
+    per_chip_mean = np.repeat(means, counts)
+    deviation = data - per_chip_mean
+    stddevs = np.sqrt(np.add.reduceat(deviation * deviation, starts) / counts)
+    minimums = np.minimum.reduceat(data, starts)
+    maximums = np.maximum.reduceat(data, starts)
+
+    flagged = np.abs(deviation) > threshold * np.repeat(stddevs, counts)
+    flagged &= np.repeat(stddevs, counts) > 0
+    flagged_at = np.nonzero(flagged)[0]
+    owner = np.searchsorted(starts, flagged_at, side='right') - 1
+
+    result = {}
+    for i, key in enumerate(keys):
+        result[key] = ChipStats(int(counts[i]), float(minimums[i]), float(maximums[i]),
+                                float(means[i]), float(stddevs[i]), [])
+    for index, i in zip(flagged_at.tolist(), owner.tolist()):
+        result[keys[i]].outliers.append(index - int(starts[i]))
+    return result
+
+
+def outlier_miners(stats: Mapping[str, ChipStats], threshold: float = 3.0) -> List[str]:
+    """
+    Miners whose mean is far from the rest of the fleet
+
+    Catches a whole hashboard running hot or cold, which per-miner chip
+    outliers cannot see because every chip on it is off by the same amount.
+    """
+    means = {key: s.mean for key, s in stats.items() if s.mean is not None}
+    fleet = chip_stats(list(means.values()), threshold)
+    keys = list(means)
+    return [keys[i] for i in fleet.outliers]
+
+
+@dataclass
+class ChipTelemetry:
+    """Per-chip temperatures, PLL counters and PSU readings of one miner"""
+    temps: array = field(default_factory=lambda: array('l'))
+    pll: array = field(default_factory=lambda: array('l'))
+    ps: array = field(default_factory=lambda: array('l'))
+
+    @classmethod
+    def from_fields(cls, fields: Mapping[str, str]) -> 'ChipTelemetry':
+        """Build from raw custom data fields (see :func:`.parser.parse_mm_id0`)"""
+        return cls(
+            temps=parse_int_array(fields.get('PVT_T0')),
+            pll=parse_int_array(fields.get('PLL0')),
+            ps=parse_int_array(fields.get('PS')),
+        )
+
+    @classmethod
+    def from_response(cls, response: Optional[Dict[str, Any]]) -> 'ChipTelemetry':
+        return cls.from_fields(parse_mm_id0(_raw_mm_id0(response)))
+
+    def ps_value(self, index: int) -> Optional[int]:
+        """Return one PS reading (see the ``PS_*`` indices), or None"""
+        return self.ps[index] if index < len(self.ps) else None
+
+    def temp_stats(self, threshold: float = 3.0) -> ChipStats:
+        return chip_stats(self.temps, threshold)
+
+    def pll_stats(self, threshold: float = 3.0) -> ChipStats:
+        return chip_stats(self.pll, threshold)
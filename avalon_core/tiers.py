@@ -0,0 +1,106 @@
+"""
+Per-command refresh tiers for one miner.
+
+Not every section changes at the same rate: ``version`` (model, firmware,
+DNA) only changes with a firmware update, ``summary`` carries the hot
+counters, and the large ``estats`` blob and ``lcd`` can be refreshed less
+often. :class:`SectionCache` remembers the last response of each command
+and tells the poller which commands are due, so a poll only requests what
+is actually stale.
+
+A reboot is detected by ``Elapsed`` in ``summary`` going backwards; it
+drops every cached section so the next request revalidates them all.
+"""
+
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from .parser import first_entry
+
+
+# Refresh every poll
+EVERY_POLL = 0.0
+# Fetch once, then only again after a reboot
+ONCE_PER_SESSION = None
+
+
+def default_tiers(slow_interval: float) -> Dict[str, Optional[float]]:
+    """Tiers used by the fleet monitor for :data:`~.client.STATUS_COMMANDS`"""
+    return {
+        'version': ONCE_PER_SESSION,
+        'summary': EVERY_POLL,
+        'estats': slow_interval,
+        'lcd': slow_interval,
+    }
+
+
+class SectionCache:
+    """Cached command responses for one miner, refreshed by tier"""
+
+    def __init__(self, tiers: Mapping[str, Optional[float]]):
+        """
+        Args:
+            tiers: Command name to maximum age in seconds. ``EVERY_POLL``
+                (0) refreshes on every poll, ``ONCE_PER_SESSION`` (None)
+                keeps the response until a reboot is detected.
+        """
+        self.tiers = dict(tiers)
+        self._entries: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self.elapsed: Optional[int] = None
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Commands that need to be fetched on this poll, in tier order"""
+        now = time.monotonic() if now is None else now
+        due = []
+        for command, max_age in self.tiers.items():
+            entry = self._entries.get(command)
+            if entry is None:
+                due.append(command)
+            elif max_age is not None and now - entry[1] >= max_age:
+                due.append(command)
+        return due
+
+    def update(self, sections: Mapping[str, Dict[str, Any]],
+               now: Optional[float] = None) -> bool:
+        """
+        Store fresh responses
+
+        Returns:
+            True if a reboot was detected. Every section that was not part
+            of this update has then been dropped and is due again.
+        """
+        now = time.monotonic() if now is None else now
+        rebooted = False
+
+        summary = first_entry(sections.get('summary'), 'SUMMARY')
+        if 'Elapsed' in summary:
+            try:
+                elapsed = int(summary['Elapsed'])
+            except (TypeError, ValueError):
+                elapsed = None
+            if elapsed is not None:
+                if self.elapsed is not None and elapsed < self.elapsed:
+                    rebooted = True
+                    self._entries.clear()
+                self.elapsed = elapsed
+
+        for command, response in sections.items():
+            self._entries[command] = (response, now)
+        return rebooted
+
+    def age(self, command: str, now: Optional[float] = None) -> Optional[float]:
+        """Seconds since ``command`` was fetched, or None if it is not cached"""
+        entry = self._entries.get(command)
+        if entry is None:
+            return None
+        now = time.monotonic() if now is None else now
+        return now - entry[1]
+
+    def invalidate(self) -> None:
+        """Forget every cached response"""
+        self._entries.clear()
+        self.elapsed = None
+
+    def sections(self) -> Dict[str, Dict[str, Any]]:
+        """Latest response of every command that has been fetched"""
+        return {command: entry[0] for command, entry in self._entries.items()}
@@ -0,0 +1,263 @@
+"""
+TCP transport for the CGMiner-style Avalon API.
+
+Every request is one short-lived TCP connection: send a JSON command, read
+until the trailing null byte, close. The sync and async variants share the
+request encoder and response decoder so framing and error handling are
+identical for every tool.
+"""
+
+import json
+import time
+import socket
+import asyncio
+from typing import Any, Dict, Optional
+
+from .exceptions import AvalonMinerApiError, AvalonMinerApiCommunicationError
+from .timing import RequestTimer, classify_error
+
+
+DEFAULT_PORT = 4028
+DEFAULT_TIMEOUT = 5
+
+# Responses are terminated by a single null byte
+TERMINATOR = b'\x00'
+
+# Upper bound for a single API response (estats on larger models is a few KB)
+RESPONSE_LIMIT = 1024 * 1024
+
+# Bytes requested per read on the async path
+READ_SIZE = 65536
+
+
+def build_request(command: str, params: str = '') -> bytes:
+    """Encode a command (and optional parameter string) as a request payload"""
+    if params:
+        json_cmd = json.dumps({
+            "command": command,
+            "parameter": params
+        }, separators=(',', ':'))
+    else:
+        json_cmd = json.dumps({
+            "command": command
+        }, separators=(',', ':'))
+    return json_cmd.encode('utf-8')
+
+
+def decode_response(data: bytes) -> Dict[str, Any]:
+    """Decode a raw response (strip null bytes and whitespace) into JSON"""
+    return json.loads(data.decode('utf-8').rstrip('\x00').strip())
+
+
+def _decode(host: str, port: int, response: bytes,
+            timer: Optional[RequestTimer]) -> Dict[str, Any]:
+    try:
+        decoded = decode_response(response)
+    except (ValueError, UnicodeDecodeError) as exc:
+        if timer is not None:
+            # No reply at all is a dropped connection, not bad JSON
+            timer.fail('bad_json' if response else 'reset')
+        msg = f"Invalid JSON response from {host}:{port} - {exc}"
+        raise AvalonMinerApiCommunicationError(msg) from exc
+    if timer is not None:
+        timer.mark()
+    return decoded
+
+
+def send_command(host: str, port: int, command: str, params: str = '',
+                 timeout: float = DEFAULT_TIMEOUT,
+                 timer: Optional[RequestTimer] = None) -> Dict[str, Any]:
+    """
+    Send a command and block until the framed response has been read
+
+    Args:
+        host: Miner IP address
+        port: API port
+        command: API command name
+        params: Optional command parameters
+        timeout: Seconds for the whole exchange, connect included
+        timer: Optional :class:`.timing.RequestTimer` that receives the
+            phase timings and the error class
+
+    Returns:
+        Dictionary containing the JSON response
+
+    Raises:
+        AvalonMinerApiCommunicationError: On connection, timeout or JSON
+            errors, or a reply larger than :data:`RESPONSE_LIMIT`
+    """
+    # One deadline for the whole exchange, as in async_exchange
+    deadline = time.monotonic() + timeout
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            if timer is not None:
+                timer.mark()
+            sock.settimeout(_time_left(deadline))
+            sock.sendall(build_request(command, params))
+            if timer is not None:
+                timer.mark()
+
+            # Receive response until the null terminator arrives
+            response = bytearray()
+            while True:
+                try:
+                    sock.settimeout(_time_left(deadline))
+                    chunk = sock.recv(READ_SIZE)
+                except socket.timeout:
+                    # Firmware that neither terminates nor closes: use what we have
+                    if not response:
+                        raise
+                    break
+                if timer is not None and not response:
+                    timer.mark()  # First byte (or EOF)
+                if not chunk:
+                    break
+                response += chunk
+                if chunk.endswith(TERMINATOR):
+                    break
+                if len(response) > RESPONSE_LIMIT:
+                    if timer is not None:
+                        timer.fail('other')
+                    raise AvalonMinerApiCommunicationError(
+                        f"Response larger than {RESPONSE_LIMIT} bytes")
+            if timer is not None:
+                timer.mark()
+
+    except socket.timeout as exc:
+        if timer is not None:
+            timer.fail('timeout')
+        msg = f"Timeout connecting to {host}:{port}"
+        raise AvalonMinerApiCommunicationError(msg) from exc
+    except AvalonMinerApiError:
+        # Already classified (it is also an OSError)
+        raise
+    except OSError as exc:
+        if timer is not None:
+            timer.fail(classify_error(exc))
+        msg = f"Error communicating with {host}:{port} - {exc}"
+        raise AvalonMinerApiCommunicationError(msg) from exc
+
+    return _decode(host, port, response, timer)
+
+
+async def async_probe(host: str, port: int, timeout: float = 1.0) -> bool:
+    """Return True if a TCP connection to the API port can be opened"""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=timeout)
+    except (asyncio.TimeoutError, OSError):
+        return False
+    writer.close()
+    return True
+
+
+async def async_exchange(host: str, port: int, payload: bytes,
+                         timeout: float = DEFAULT_TIMEOUT,
+                         timer: Optional[RequestTimer] = None) -> bytes:
+    """
+    Send a raw request on the running event loop and return the raw reply
+
+    The reply is returned as received, terminator included (if the
+    firmware sent one). Used as is by the API proxy; everything else goes
+    through :func:`async_send_command`. ``timeout`` bounds the whole
+    exchange, connect included. A ``timer`` gets the connect, send, first
+    byte and complete phases, or the error class.
+
+    Raises:
+        AvalonMinerApiCommunicationError: On connection or timeout errors
+    """
+    # One deadline for the whole exchange, not a fresh timeout per step
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, limit=RESPONSE_LIMIT),
+            timeout=_remaining(loop, deadline),
+        )
+
+        if timer is not None:
+            timer.mark()
+
+        writer.write(payload)
+        await asyncio.wait_for(writer.drain(), timeout=_remaining(loop, deadline))
+
+        if timer is not None:
+            timer.mark()
+        return await _read_reply(reader, loop, deadline, timer)
+
+    except asyncio.TimeoutError as exc:
+        if timer is not None:
+            timer.fail('timeout')
+        msg = f"Timeout connecting to {host}:{port}"
+        raise AvalonMinerApiCommunicationError(msg) from exc
+    except AvalonMinerApiError:
+        # Already classified (it is also an OSError)
+        raise
+    except OSError as exc:
+        if timer is not None:
+            timer.fail(classify_error(exc))
+        msg = f"Error communicating with {host}:{port} - {exc}"
+        raise AvalonMinerApiCommunicationError(msg) from exc
+    except Exception as exc:
+        if timer is not None:
+            timer.fail('other')
+        msg = f"Unexpected error communicating with miner: {exc}"
+        raise AvalonMinerApiError(msg) from exc
+
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _time_left(deadline: float) -> float:
+    """Seconds until a :func:`time.monotonic` deadline, as a socket timeout"""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise socket.timeout('timed out')
+    return remaining
+
+
+def _remaining(loop: asyncio.AbstractEventLoop, deadline: float) -> float:
+    return max(0.0, deadline - loop.time())
+
+
+async def _read_reply(reader: asyncio.StreamReader, loop: asyncio.AbstractEventLoop,
+                      deadline: float, timer: Optional[RequestTimer]) -> bytes:
+    """Read until the null terminator, EOF or the deadline, like :func:`send_command`"""
+    response = bytearray()
+    while True:
+        try:
+            chunk = await asyncio.wait_for(reader.read(READ_SIZE),
+                                           timeout=_remaining(loop, deadline))
+        except asyncio.TimeoutError:
+            # Firmware that neither terminates nor closes: use what we have
+            if not response:
+                raise
+            break
+        if timer is not None and not response:
+            timer.mark()  # First byte (or EOF)
+        if not chunk:
+            break
+        response += chunk
+        if chunk.endswith(TERMINATOR):
+            break
+        if len(response) > RESPONSE_LIMIT:
+            if timer is not None:
+                timer.fail('other')
+            raise AvalonMinerApiCommunicationError(
+                f"Response larger than {RESPONSE_LIMIT} bytes")
+    if timer is not None:
+        timer.mark()
+    return bytes(response)
+
+
+async def async_send_command(host: str, port: int, command: str, params: str = '',
+                             timeout: float = DEFAULT_TIMEOUT,
+                             timer: Optional[RequestTimer] = None) -> Dict[str, Any]:
+    """
+    Send a command on the running event loop and await the framed response
+
+    Same contract as :func:`send_command`.
+    """
+    response = await async_exchange(host, port, build_request(command, params), timeout, timer)
+    return _decode(host, port, response, timer)
@@ -0,0 +1,247 @@
+"""
+Scrollable, sortable and filterable view of the fleet table.
+
+The view decides which miners appear on screen and in which order, reading
+only the numeric columns of a :class:`.store.FleetStore`. IP addresses are
+parsed into sort keys once, when the view is created. A metric sort picks
+just the first ``offset + height`` rows with a bounded heap
+(:func:`heapq.nsmallest`) instead of sorting the whole fleet. The filtered
+set is cached until a filtered field changes (see ``FleetStore.changes``)
+and the order until the sort column changes too, so scrolling, a
+clock-only redraw or results that move only other fields cost the visible
+rows, not the fleet.
+"""
+
+import heapq
+import ipaddress
+from typing import Callable, List, Optional, Tuple
+
+from .store import STATUSES, FleetStore
+
+
+# Sort key -> (store column, direction that puts the worst miners first:
+# 1 for highest first, -1 for lowest first)
+SORT_COLUMNS = {
+    'temp': ('temp', 1),
+    'hashrate': ('hashrate_average', -1),
+    'rejected': ('current_rejected_pct', 1),
+    'uptime': ('uptime', -1),
+}
+SORT_KEYS = ('ip',) + tuple(SORT_COLUMNS)
+
+# Metric used by the worst-N view while the table is sorted by IP
+DEFAULT_WORST_SORT = 'temp'
+
+
+class FleetView:
+    """Viewport over a :class:`.store.FleetStore`: filters, sort order and scroll"""
+
+    def __init__(self, store: FleetStore, sort: str = 'ip', reverse: bool = False,
+                 status: Optional[str] = None, model: Optional[str] = None,
+                 pool: Optional[str] = None, subnet: Optional[str] = None,
+                 worst: Optional[int] = None):
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key '{sort}' (expected one of {', '.join(SORT_KEYS)})")
+        if status is not None and status not in STATUSES:
+            raise ValueError(f"Unknown status '{status}' (expected one of {', '.join(STATUSES)})")
+
+        self.store = store
+        self.sort = sort
+        # Metric sorts put the worst miners first; reverse flips that
+        self.reverse = reverse
+        self.status = status
+        self.model = model
+        # Case-insensitive substring of the pool URL
+        self.pool = pool
+        self.subnet = ipaddress.ip_network(subnet, strict=False) if subnet else None
+        # Worst-N view: show only the N worst miners by the sort metric
+        self.worst_size = worst or 20
+        self.worst_only = worst is not None
+        self.offset = 0
+        self.page = 20
+
+        addresses = [ipaddress.ip_address(ip) for ip in store.ips]
+        self._addresses = addresses
+        self._ip_keys: List[Tuple[int, int]] = [(a.version, int(a)) for a in addresses]
+        self._ip_order: List[int] = sorted(range(len(addresses)), key=self._ip_keys.__getitem__)
+        self._match_key = None
+        self._match_cache: List[int] = []
+        self._cache_key = None
+        self._cache: Tuple[List[int], int] = ([], 0)
+
+    def _settings(self) -> tuple:
+        return (self.sort, self.reverse, self.status, self.model, self.pool,
+                self.subnet, self.worst_only, self.worst_size)
+
+    def _filter_key(self) -> tuple:
+        """The filters and the change counts of the fields they read"""
+        changes = self.store.changes
+        return (self.status, self.model, self.pool, self.subnet,
+                changes['status'] if self.status is not None else None,
+                changes['model'] if self.model is not None else None,
+                changes['pool'] if self.pool else None)
+
+    def _effective_sort(self) -> str:
+        if self.worst_only and self.sort == 'ip':
+            return DEFAULT_WORST_SORT
+        return self.sort
+
+    def _matches(self) -> List[int]:
+        """Slots that pass the filters, in IP order"""
+        store = self.store
+        match_key = self._filter_key()
+        if match_key == self._match_key:
+            return self._match_cache
+
+        slots = self._ip_order
+        if self.status is not None:
+            code = STATUSES.index(self.status)
+            status = store.status
+            slots = [s for s in slots if status[s] == code]
+        if self.model is not None:
+            models = store.models
+            slots = [s for s in slots if models[s] == self.model]
+        if self.pool:
+            needle = self.pool.lower()
+            pools = store.pools
+            slots = [s for s in slots if pools[s] and needle in pools[s].lower()]
+        if self.subnet is not None:
+            network = self.subnet
+            addresses = self._addresses
+            slots = [s for s in slots if addresses[s] in network]
+
+        self._match_key = match_key
+        self._match_cache = slots
+        return slots
+
+    def _sort_key(self, sort: str) -> Callable[[int], tuple]:
+        column, direction = SORT_COLUMNS[sort]
+        if self.reverse:
+            direction = -direction
+        values = self.store.columns[column]
+        ip_keys = self._ip_keys
+
+        def key(slot: int) -> tuple:
+            value = values[slot]
+            if value != value:  # No value: always last
+                return (1, 0.0, ip_keys[slot])
+            return (0, -direction * value, ip_keys[slot])
+        return key
+
+    def select(self, limit: Optional[int]) -> Tuple[List[int], int]:
+        """
+        Return the first ``limit`` matching slots in display order (all of
+        them when ``limit`` is None) and the number of matching miners
+        """
+        if self.worst_only:
+            limit = self.worst_size if limit is None else min(limit, self.worst_size)
+        sort = self._effective_sort()
+        column_changes = None if sort == 'ip' else self.store.changes[SORT_COLUMNS[sort][0]]
+        cache_key = (self._filter_key(), column_changes, limit) + self._settings()
+        if cache_key == self._cache_key:
+            return self._cache
+
+        slots = self._matches()
+        matched = len(slots)
+
+        if sort == 'ip':
+            ordered = slots[::-1] if self.reverse else slots
+            if limit is not None:
+                ordered = ordered[:limit]
+        elif limit is None:
+            ordered = sorted(slots, key=self._sort_key(sort))
+        else:
+            ordered = heapq.nsmallest(limit, slots, key=self._sort_key(sort))
+
+        self._cache_key = cache_key
+        self._cache = (ordered, matched)
+        return self._cache
+
+    def visible(self, height: Optional[int] = None) -> List[str]:
+        """
+        IPs of the miners on screen, ``height`` rows from the scroll offset
+
+        With ``height`` None every matching miner is returned (used when the
+        output is not a terminal).
+        """
+        if height is None:
+            ordered, _ = self.select(None)
+            return [self.store.ips[s] for s in ordered]
+
+        self.page = max(1, height)
+        matched = len(self._matches())
+        total = min(matched, self.worst_size) if self.worst_only else matched
+        self.offset = max(0, min(self.offset, total - height))
+        ordered, _ = self.select(self.offset + height)
+        return [self.store.ips[s] for s in ordered[self.offset:]]
+
+    def describe(self, shown: int) -> str:
+        """One-line summary of the current sort, filters and scroll position"""
+        matched = len(self._matches())
+        sort = self._effective_sort()
+        if sort == 'ip':
+            order = 'descending' if self.reverse else 'ascending'
+        else:
+            order = 'best first' if self.reverse else 'worst first'
+
+        parts = []
+        if self.worst_only:
+            parts.append(f"{'Best' if self.reverse else 'Worst'} {self.worst_size} by {sort}")
+        else:
+            parts.append(f"Sort: {sort} ({order})")
+
+        filters = [f"{name}={value}" for name, value in (
+            ('status', self.status), ('model', self.model),
+            ('pool', self.pool), ('subnet', self.subnet)) if value]
+        parts.append("Filter: " + (' '.join(filters) if filters else 'none'))
+
+        if shown:
+            rows = f"Rows {self.offset + 1}-{self.offset + shown} of {matched}"
+        else:
+            rows = f"Rows 0 of {matched}"
+        if matched != len(self.store):
+            rows += f" ({len(self.store)} total)"
+        parts.append(rows)
+        return ' | '.join(parts)
+
+    def _cycle(self, options: List[Optional[str]], current: Optional[str]) -> Optional[str]:
+        index = options.index(current) if current in options else -1
+        return options[(index + 1) % len(options)]
+
+    def handle_key(self, key: str) -> bool:
+        """Apply one keypress (see :class:`.render.KeyReader`); True if the view changed"""
+        before = (self.offset,) + self._settings()
+
+        if key in ('down', 'j'):
+            self.offset += 1
+        elif key in ('up', 'k'):
+            self.offset = max(0, self.offset - 1)
+        elif key in ('pgdn', ' '):
+            self.offset += self.page
+        elif key in ('pgup', 'b'):
+            self.offset = max(0, self.offset - self.page)
+        elif key in ('home', 'g'):
+            self.offset = 0
+        elif key in ('end', 'G'):
+            self.offset = len(self.store)  # Clamped to the last page when drawn
+        elif key == 's':
+            self.sort = SORT_KEYS[(SORT_KEYS.index(self.sort) + 1) % len(SORT_KEYS)]
+            self.offset = 0
+        elif key == 'r':
+            self.reverse = not self.reverse
+            self.offset = 0
+        elif key == 'w':
+            self.worst_only = not self.worst_only
+            self.offset = 0
+        elif key == 'f':
+            self.status = self._cycle([None] + list(STATUSES), self.status)
+            self.offset = 0
+        elif key == 'm':
+            models = sorted(m for m in self.store.groups('model') if m is not None)
+            self.model = self._cycle([None] + models, self.model)
+            self.offset = 0
+        elif key == 'c':
+            self.status = self.model = self.pool = self.subnet = None
+            self.offset = 0
+
+        return (self.offset,) + self._settings() != before
@@ -9,198 +9,298 @@ Copyright (c) 2025
 SPDX-License-Identifier: Apache-2.0
 """
 
+import os
 import sys
-import json
-import socket
+import asyncio
 import argparse
-import ipaddress
 import time
-import os
 import re
+import math
+import shutil
+import sqlite3
+import logging
+from array import array
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-from dataclasses import dataclass, field
-from threading import Thread, Lock
-from queue import Queue
-
-
-@dataclass
-class MinerStatus:
-    """Data class for miner status"""
-    ip: str
-    model: str = "N/A"
-    status: str = "Unknown"
-    work_mode: str = "N/A"
-    power: str = "N/A"
-    hashrate_current: str = "N/A"
-    hashrate_average: str = "N/A"
-    temp_asic: str = "N/A"
-    active_pool: str = "N/A"
-    last_share_diff: str = "N/A"
-    best_share: str = "N/A"
-    rejected_pct: str = "N/A"
-    uptime: str = "N/A"
-    last_update: float = field(default_factory=time.time)
-    error: Optional[str] = None
-
-
-class AvalonMinerAPI:
-    """Handle communication with Avalon Miner API"""
-
-    def __init__(self, ip: str, port: int = 4028, timeout: int = 3):
-        self.ip = ip
-        self.port = port
-        self.timeout = timeout
-
-    def send_command(self, command: str, params: str = '') -> Optional[Dict[str, Any]]:
-        """Send a command to the miner API"""
-        if params:
-            json_cmd = json.dumps({
-                "command": command,
-                "parameter": params
-            }, separators=(',', ':'))
-        else:
-            json_cmd = json.dumps({
-                "command": command
-            }, separators=(',', ':'))
-
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(self.timeout)
-            sock.connect((self.ip, self.port))
-            sock.sendall(json_cmd.encode('utf-8'))
-            time.sleep(0.05)  # Shorter delay for fleet monitoring
-
-            response = b''
-            while True:
-                try:
-                    chunk = sock.recv(4096)
-                    if not chunk:
-                        break
-                    response += chunk
-                except socket.timeout:
-                    break
-
-            sock.close()
-
-            # Parse JSON response (strip null bytes and whitespace)
-            response_str = response.decode('utf-8').rstrip('\x00').strip()
-            return json.loads(response_str)
-
-        except (socket.timeout, socket.error, json.JSONDecodeError, Exception):
-            return None
+from typing import Dict, Any, List, Optional, Set, Tuple
+from threading import Lock
+
+from avalon_core import (
+    AvalonConfigError,
+    load_config_file,
+    validate_ip,
+    parse_ip_range,
+    AsyncAvalonMinerClient,
+    CircuitBreaker,
+    LatencyEstimator,
+    LatencyStats,
+    PHASES,
+    RollingScheduler,
+    SectionCache,
+    default_tiers,
+    async_probe,
+    MinerVersion,
+    MinerSummary,
+    MinerLcd,
+    MinerSnapshot,
+    FleetStore,
+    RingHistory,
+    RateEngine,
+    TREND_WINDOWS,
+    FrameRenderer,
+    MetricsRecorder,
+    MetricsServer,
+    PrometheusExporter,
+    RecordWriter,
+    OUTPUT_FORMATS,
+    open_writer,
+    KeyReader,
+    FleetView,
+    SORT_KEYS,
+    STATUSES,
+    WORK_MODE_NAMES,
+    parse_custom_data,
+    to_ths,
+    format_hashrate,
+    format_difficulty,
+    format_uptime,
+    format_sparkline,
+    format_trend,
+    parse_int_array,
+    fleet_chip_stats,
+    outlier_miners,
+)
+from avalon_core.breaker import HALF_OPEN
+from avalon_core.recorder import DAY
+from avalon_core.rates import COUNTERS, HASHES_PER_DIFF1
+from avalon_core.timing import TOTAL
+
+logger = logging.getLogger(__name__)
+
+
+# Width of the table and its separator lines
+TABLE_WIDTH = 180
+# Longest error message shown under a row
+ERROR_WIDTH = TABLE_WIDTH - len("  └─ Error: ")
+
+# Seconds between checks for polls that overran the cycle deadline
+STALE_CHECK = 1.0
+
+# Seconds between exact rebuilds of the fleet totals (undoes float drift)
+RECOMPUTE_INTERVAL = 3600
+
+# Width of the "HR 1m/5m/15m" column
+TREND_WIDTH = 17
+
+# Samples drawn in the hash rate and temperature sparklines
+HASHRATE_SPARK = 10
+TEMP_SPARK = 8
+
+
+def _number(value: Any, scale: float = 1) -> Optional[float]:
+    """Return a parsed custom data value as a number, None if absent or text"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value * scale if scale != 1 else value
+    return None
+
+
+def _percent(value: Optional[float]) -> str:
+    return f"{value:.2f}%" if value is not None else "N/A"
+
+
+def short_pool(url: Optional[str]) -> str:
+    """Shorten a pool URL to its host name for the table"""
+    if not url:
+        return "N/A"
+    match = re.search(r'://([^:]+)', url)
+    return (match.group(1) if match else url)[:20]
+
+
+def format_cells(m: MinerSnapshot) -> Dict[str, str]:
+    """Format the numeric snapshot values of one table row"""
+    return {
+        'model': m.model or "N/A",
+        'work_mode': WORK_MODE_NAMES.get(str(m.work_mode), "N/A"),
+        'power': f"{m.power:.0f}W" if m.power is not None else "N/A",
+        'hashrate_current': format_hashrate(m.hashrate_current, unit=False),
+        'hashrate_average': format_hashrate(m.hashrate_average, unit=False),
+        'temp': f"{m.temp:.0f}°C" if m.temp is not None else "N/A",
+        'pool': short_pool(m.pool_url),
+        'last_share_diff': format_difficulty(m.last_share_diff, compact=True),
+        'best_share': format_difficulty(m.best_share, compact=True),
+        'rejected_pct': _percent(m.current_rejected_pct if m.current_rejected_pct is not None
+                                 else m.rejected_pct),
+        'uptime': format_uptime(m.uptime, style='compact') if m.uptime is not None else "N/A",
+    }
+
+
+def freshness(age: Optional[float], interval: float) -> str:
+    """Colored marker for how long ago a miner last answered (None: never)"""
+    if age is None:
+        return "\033[91m○\033[0m"
+    if age < 1.5 * interval:
+        return "\033[92m●\033[0m"  # Updated this cycle
+    if age < 3 * interval:
+        return "\033[93m◐\033[0m"  # A poll or two behind
+    return "\033[91m○\033[0m"      # Not heard from for a while
+
+
+def trend_value(mhs: Optional[float]) -> str:
+    """One mean of the trend column in TH/s, with fewer decimals as it grows"""
+    if mhs is None:
+        return '-'
+    ths = to_ths(mhs)
+    if ths < 10:
+        return f"{ths:.2f}"
+    if ths < 100:
+        return f"{ths:.1f}"
+    return f"{ths:.0f}"
 
 
 class FleetMonitor:
     """Monitor multiple miners and display status table"""
 
-    def __init__(self, miner_ips: List[str], interval: int = 10, port: int = 4028):
+    def __init__(self, miner_ips: List[str], interval: int = 10, port: int = 4028,
+                 concurrency: int = 256, failure_threshold: int = 3, max_backoff: int = 600,
+                 timeout_floor: float = 0.5, timeout_ceiling: float = 5.0,
+                 cycle_deadline: Optional[float] = None, slow_interval: float = 30,
+                 view: Optional[Dict[str, Any]] = None, frame_rate: float = 2,
+                 writer: Optional[RecordWriter] = None, flush_interval: float = 1,
+                 recorder: Optional[MetricsRecorder] = None,
+                 history_size: Optional[int] = None,
+                 metrics_server: Optional[MetricsServer] = None, headless: bool = False,
+                 latency_stats: Optional[LatencyStats] = None):
         self.miner_ips = miner_ips
         self.interval = interval
         self.port = port
-        self.miner_data: Dict[str, MinerStatus] = {}
+        self.concurrency = concurrency
+        self.failure_threshold = failure_threshold
+        self.max_backoff = max_backoff
+        self.timeout_floor = timeout_floor
+        self.timeout_ceiling = timeout_ceiling
+        # Longest a refresh cycle may wait for results (default: interval)
+        self.cycle_deadline = cycle_deadline if cycle_deadline is not None else interval
+        # Dashboard redraws per second, independent of polling
+        self.frame_rate = frame_rate
+        self.miner_data: Dict[str, MinerSnapshot] = {}
+        # Columnar copy of the numeric state with O(1) fleet aggregates
+        self.store = FleetStore(miner_ips)
+        # Recent hash rate (5s, MH/s) and max temperature samples of every
+        # miner, sized to cover the longest trend window by default
+        if history_size is None:
+            history_size = max(HASHRATE_SPARK, math.ceil(max(TREND_WINDOWS) / interval) + 1)
+        self.hashrate_history = RingHistory(len(miner_ips), history_size)
+        self.temp_history = RingHistory(len(miner_ips), history_size)
+        # Current share, reject and HW error rates from counter deltas
+        self.rates = RateEngine(len(miner_ips))
+        self.renderer = FrameRenderer()
+        # Sort order, filters and scroll position of the table
+        self.view = FleetView(self.store, **(view or {}))
+        self.keys = KeyReader()
+        self.redraw: Optional[asyncio.Event] = None
+        # Headless mode: one record per completed poll instead of the table
+        self.writer = writer
+        self.flush_interval = flush_interval
+        # Poll without drawing the table (records, metrics or recording only)
+        self.headless = headless or writer is not None
+        # Time-series history of every poll in a local database
+        self.recorder = recorder
+        # Prometheus endpoint, fed one miner at a time as results land
+        self.metrics_server = metrics_server
+        self.exporter = metrics_server.exporter if metrics_server is not None else None
+        # Per-phase request timing and error classes (off unless given)
+        self.latency_stats = latency_stats
+        self.clients: Dict[str, AsyncAvalonMinerClient] = {}
+        # version is fetched once per session, summary every poll, estats
+        # and lcd every slow_interval seconds
+        self.tiers = default_tiers(slow_interval)
+        self.caches: Dict[str, SectionCache] = {}
+        self.chip_temps: Dict[str, array] = {}
+        # Chip check lines, recomputed only when chip_temps changes
+        self.chip_version = 0
+        self._chip_lines = (-1, [])
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        # Miners queued or in flight, with the time they were queued;
+        # survives across cycles so stragglers finish in the background
+        # instead of being dropped
+        self.pending: Dict[str, float] = {}
+        self.scheduler = RollingScheduler(interval)
+        self.queue: Optional[asyncio.Queue] = None
+        self.idle: Optional[asyncio.Event] = None
+        self.workers: List[asyncio.Task] = []
         self.data_lock = Lock()
         self.running = True
+        # Fatal error raised in a background task, re-raised by the main loop
+        self.fatal: Optional[BaseException] = None
+
+    def get_client(self, ip: str) -> AsyncAvalonMinerClient:
+        """Return the persistent client for a miner (keeps batch support state)"""
+        client = self.clients.get(ip)
+        if client is None:
+            latency = LatencyEstimator(self.timeout_floor, self.timeout_ceiling)
+            client = self.clients[ip] = AsyncAvalonMinerClient(
+                ip, self.port, latency=latency, instrument=self.latency_stats is not None)
+        return client
+
+    def get_cache(self, ip: str) -> SectionCache:
+        """Return the per-tier section cache for a miner"""
+        cache = self.caches.get(ip)
+        if cache is None:
+            cache = self.caches[ip] = SectionCache(self.tiers)
+        return cache
+
+    async def fetch_sections(self, ip: str) -> Tuple[Dict[str, Dict[str, Any]], Set[str]]:
+        """
+        Fetch the sections that are due and merge them with cached ones
 
-    def format_hashrate(self, mhs: float, from_mhs: bool = True) -> str:
-        """Format hash rate in TH/s"""
-        try:
-            if from_mhs:
-                ths = mhs / 1_000_000
-            else:
-                ths = mhs / 1_000
-            return f"{ths:.2f}"
-        except (ValueError, TypeError):
-            return "N/A"
-
-    def format_difficulty(self, diff: float) -> str:
-        """Format difficulty with appropriate unit"""
-        try:
-            diff = float(diff)
-            if diff >= 1e15:
-                return f"{diff / 1e15:.2f}P"
-            elif diff >= 1e12:
-                return f"{diff / 1e12:.2f}T"
-            elif diff >= 1e9:
-                return f"{diff / 1e9:.2f}G"
-            elif diff >= 1e6:
-                return f"{diff / 1e6:.2f}M"
-            elif diff >= 1e3:
-                return f"{diff / 1e3:.2f}K"
-            else:
-                return f"{diff:.0f}"
-        except (ValueError, TypeError):
-            return "N/A"
-
-    def format_uptime(self, seconds: int) -> str:
-        """Format uptime in human-readable format"""
-        try:
-            seconds = int(seconds)
-            days = seconds // 86400
-            hours = (seconds % 86400) // 3600
-            minutes = (seconds % 3600) // 60
-            if days > 0:
-                return f"{days}d{hours:02d}h"
-            elif hours > 0:
-                return f"{hours}h{minutes:02d}m"
-            else:
-                return f"{minutes}m"
-        except (ValueError, TypeError):
-            return "N/A"
-
-    def parse_custom_data(self, estats_response: Dict[str, Any]) -> Dict[str, Any]:
-        """Parse custom Avalon data from estats response"""
-        custom_data = {}
-
-        if 'STATS' not in estats_response:
-            return custom_data
-
-        # Try different patterns for custom data
-        custom_data_raw = None
-
-        # Pattern 1: Avalon Nano 3S
-        for stat in estats_response.get('STATS', []):
-            if 'MM ID0' in stat and stat['MM ID0']:
-                custom_data_raw = stat['MM ID0']
-                break
-
-        # Pattern 2: Avalon Q
-        if not custom_data_raw and 'MM ID0:Summary' in estats_response.get('STATS', {}):
-            custom_data_raw = estats_response['STATS'].get('MM ID0:Summary', '')
-            custom_data_raw = re.sub(r'(\w+):\[([^\]]+)\]', r'\1[\2]', custom_data_raw)
-
-        if custom_data_raw:
-            matches = re.findall(r'(\w+)\[([^\]]+)\]', custom_data_raw)
-            for key, value in matches:
-                # Try to convert to appropriate type
-                try:
-                    if '.' in value:
-                        custom_data[key] = float(value)
-                    else:
-                        custom_data[key] = int(value)
-                except ValueError:
-                    custom_data[key] = value
-
-        return custom_data
+        Returns:
+            The merged sections and the commands actually fetched this poll
+        """
+        client = self.get_client(ip)
+        cache = self.get_cache(ip)
+
+        # Only request what is due, in a single round trip
+        sections = await client.async_fetch_sections(cache.due())
+        fetched = set(sections)
+        if cache.update(sections):
+            # Rebooted: revalidate version and the slow sections right away
+            due = [command for command in cache.due() if command not in sections]
+            if due:
+                sections = await client.async_fetch_sections(due)
+                fetched.update(sections)
+                cache.update(sections)
+
+        return cache.sections(), fetched
+
+    async def fetch_miner_status(self, ip: str) -> Tuple[MinerSnapshot, Set[str]]:
+        """
+        Fetch status for a single miner
 
-    def fetch_miner_status(self, ip: str) -> MinerStatus:
-        """Fetch status for a single miner"""
-        status = MinerStatus(ip=ip)
+        Returns:
+            The snapshot and the commands fetched this poll (the rest of
+            the snapshot's sections came from the cache)
+        """
+        status = MinerSnapshot(ip=ip)
+        fetched: Set[str] = set()
 
         try:
-            api = AvalonMinerAPI(ip, self.port, timeout=3)
+            sections, fetched = await self.fetch_sections(ip)
 
-            # Fetch version
-            version_response = api.send_command('version')
+            version_response = sections.get('version')
             if version_response and 'VERSION' in version_response:
-                ver = version_response['VERSION'][0] if version_response['VERSION'] else {}
-                status.model = ver.get('MODEL', 'N/A')
+                version = MinerVersion.from_response(version_response)
+                status.model = version.model or None
+                status.dna = version.dna or None
 
-            # Fetch estats for custom data
-            estats_response = api.send_command('estats')
+            # Custom data from estats
+            estats_response = sections.get('estats')
             custom_data = {}
             if estats_response:
-                custom_data = self.parse_custom_data(estats_response)
+                custom_data = parse_custom_data(estats_response)
+
+                # Per-chip temperatures for the fleet-wide outlier check
+                if 'estats' in fetched and 'PVT_T0' in custom_data:
+                    self.chip_temps[ip] = parse_int_array(str(custom_data['PVT_T0']))
+                    self.chip_version += 1
 
                 # Extract data from custom fields
                 if 'SoftOFF' in custom_data:
@@ -208,119 +308,298 @@ class FleetMonitor:
                 else:
                     status.status = 'Active'
 
-                if 'WORKMODE' in custom_data:
-                    mode_map = {0: 'Eco', 1: 'Standard', 2: 'Super'}
-                    status.work_mode = mode_map.get(custom_data['WORKMODE'], 'N/A')
-
-                if 'MPO' in custom_data:
-                    status.power = f"{custom_data['MPO']}W"
-
-                if 'GHSspd' in custom_data:
-                    status.hashrate_current = self.format_hashrate(custom_data['GHSspd'], from_mhs=False)
-
-                if 'GHSavg' in custom_data:
-                    status.hashrate_average = self.format_hashrate(custom_data['GHSavg'], from_mhs=False)
-
-                if 'TMax' in custom_data:
-                    status.temp_asic = f"{custom_data['TMax']}°C"
-                elif 'TAvg' in custom_data:
-                    status.temp_asic = f"{custom_data['TAvg']}°C"
-
-                if 'Elapsed' in custom_data:
-                    status.uptime = self.format_uptime(custom_data['Elapsed'])
-
-            # Fetch summary for additional stats
-            summary_response = api.send_command('summary')
+                status.work_mode = _number(custom_data.get('WORKMODE'))
+                status.power = _number(custom_data.get('MPO'))
+                status.temp = _number(custom_data.get('TMax', custom_data.get('TAvg')))
+                status.temp_avg = _number(custom_data.get('TAvg'))
+                status.fan1 = _number(custom_data.get('Fan1'))
+                status.fan2 = _number(custom_data.get('Fan2'))
+                status.fan3 = _number(custom_data.get('Fan3'))
+                status.fan4 = _number(custom_data.get('Fan4'))
+
+            # Summary is refreshed every poll, so it is preferred for the
+            # hash rates and uptime
+            summary_response = sections.get('summary')
             if summary_response and 'SUMMARY' in summary_response:
-                summary_list = summary_response['SUMMARY']
-                summary = summary_list[0] if isinstance(summary_list, list) and len(summary_list) > 0 else {}
-
-                # Fallback hash rates if not in custom data
-                if status.hashrate_average == "N/A" and 'MHS av' in summary:
-                    status.hashrate_average = self.format_hashrate(summary['MHS av'], from_mhs=True)
+                summary = MinerSummary.from_response(summary_response)
+
+                status.hashrate_average = summary.mhs_av
+                status.hashrate_current = summary.mhs_5s
+                status.uptime = summary.elapsed
+                status.rejected_pct = summary.pool_rejected_pct
+                status.accepted = summary.accepted
+                status.rejected = summary.rejected
+                status.hardware_errors = summary.hardware_errors
+                status.difficulty_accepted = summary.difficulty_accepted
+                status.difficulty_rejected = summary.difficulty_rejected
+
+            # Fallback to estats when summary lacks them (GH/s there)
+            if status.hashrate_current is None and 'GHSspd' in custom_data:
+                status.hashrate_current = _number(custom_data['GHSspd'], 1000)
+
+            if status.hashrate_average is None and 'GHSavg' in custom_data:
+                status.hashrate_average = _number(custom_data['GHSavg'], 1000)
+
+            if status.uptime is None:
+                status.uptime = _number(custom_data.get('Elapsed'))
+
+            # LCD for pool info
+            lcd_response = sections.get('lcd')
+            if lcd_response and 'LCD' in lcd_response:
+                lcd = MinerLcd.from_response(lcd_response)
 
-                if status.hashrate_current == "N/A" and 'MHS 5s' in summary:
-                    status.hashrate_current = self.format_hashrate(summary['MHS 5s'], from_mhs=True)
+                status.pool_url = lcd.current_pool or None
+                status.last_share_diff = lcd.last_share_difficulty
+                status.best_share = lcd.best_share
 
-                if 'Pool Rejected%' in summary:
-                    status.rejected_pct = f"{summary['Pool Rejected%']:.2f}%"
+            # Slow sections may come from the cache: record how old they are
+            cache = self.get_cache(ip)
+            now = time.monotonic()
+            status.estats_age = 0.0 if 'estats' in fetched else cache.age('estats', now)
+            status.lcd_age = 0.0 if 'lcd' in fetched else cache.age('lcd', now)
 
-            # Fetch LCD for pool info
-            lcd_response = api.send_command('lcd')
-            if lcd_response and 'LCD' in lcd_response:
-                lcd_list = lcd_response['LCD']
-                lcd = lcd_list[0] if isinstance(lcd_list, list) and len(lcd_list) > 0 else {}
-
-                pool_url = lcd.get('Current Pool', 'N/A')
-                # Shorten pool URL for display
-                if pool_url != 'N/A':
-                    # Extract domain from URL
-                    match = re.search(r'://([^:]+)', pool_url)
-                    if match:
-                        status.active_pool = match.group(1)[:20]  # Limit length
-                    else:
-                        status.active_pool = pool_url[:20]
-
-                if 'Last Share Difficulty' in lcd:
-                    status.last_share_diff = self.format_difficulty(lcd['Last Share Difficulty'])
-
-                if 'Best Share' in lcd:
-                    status.best_share = self.format_difficulty(lcd['Best Share'])
-
-            status.last_update = time.time()
+            status.last_update = status.last_attempt = time.time()
             status.error = None
 
         except Exception as e:
+            status.last_attempt = time.time()
             status.status = "Error"
-            status.error = str(e)[:30]
-
-        return status
+            # Full message; the dashboard clips it when drawing
+            status.error = str(e) or type(e).__name__
+
+        if self.latency_stats is not None and ip in self.clients:
+            self.apply_timings(self.clients[ip], status)
+
+        return status, fetched
+
+    def apply_timings(self, client: AsyncAvalonMinerClient, status: MinerSnapshot):
+        """Add this poll's requests to the histograms and their phase times to the snapshot"""
+        totals: List[Optional[float]] = [None] * len(PHASES)
+        for timer in client.pop_timers():
+            self.latency_stats.record(timer)
+            for i, duration in enumerate(timer.durations()):
+                totals[i] = (totals[i] or 0.0) + duration * 1000
+            if timer.error is not None:
+                status.error_class = timer.error
+        for phase, total in zip(PHASES, totals):
+            setattr(status, 'latency_' + phase, total)
+
+    async def probe(self, ip: str) -> bool:
+        """Check that a half-open miner's API port accepts connections"""
+        # The miner's adaptive deadline, never more than the configured timeout
+        timeout = min(self.get_client(ip).latency.timeout, self.timeout_ceiling)
+        return await async_probe(ip, self.port, timeout=timeout)
+
+    async def poll_miner(self, ip: str):
+        """Poll one miner through its circuit breaker and store the result"""
+        breaker = self.breakers.get(ip)
+        if breaker is None:
+            breaker = self.breakers[ip] = CircuitBreaker(
+                self.failure_threshold, base_backoff=self.interval, max_backoff=self.max_backoff)
+
+        if not breaker.allow_request():
+            return  # Offline and backing off: keep the previous status
+
+        if breaker.state == HALF_OPEN and not await self.probe(ip):
+            breaker.record_failure()
+            status, fetched = MinerSnapshot(ip=ip), set()
+        else:
+            status, fetched = await self.fetch_miner_status(ip)
+            if status.status == "Error":
+                breaker.record_failure()
+            else:
+                breaker.record_success()
 
-    def update_miner(self, ip: str, queue: Queue):
-        """Worker thread to update a single miner"""
-        status = self.fetch_miner_status(ip)
-        queue.put((ip, status))
+        if breaker.is_open:
+            since = datetime.fromtimestamp(breaker.offline_since).strftime('%Y-%m-%d %H:%M:%S')
+            status.status = "Offline"
+            status.error = f"Offline since {since}"
 
-    def update_all_miners(self):
-        """Update status for all miners using threads"""
-        queue = Queue()
-        threads = []
+        with self.data_lock:
+            slot = self.store.slots[ip]
+            previous = self.miner_data.get(ip)
+            if status.last_update is None and previous is not None:
+                # Failed: keep the time of the last good sample
+                status.last_update = previous.last_update
+            if status.accepted is not None:
+                self.apply_rates(slot, status)
+            self.miner_data[ip] = status
+            self.store.update(status)
+            if status.hashrate_current is not None:
+                self.hashrate_history.push(slot, status.last_update, status.hashrate_current)
+            # Temperatures come from estats, which is only refreshed every
+            # slow_interval; cached values are not new samples
+            if status.temp is not None and 'estats' in fetched:
+                self.temp_history.push(slot, status.last_update, status.temp)
+            if self.exporter is not None:
+                self.exporter.update(slot, status)
+
+        if self.writer is not None:
+            self.writer.write(status)
+        if self.recorder is not None:
+            self.recorder.record(status)
+
+    def apply_rates(self, slot: int, status: MinerSnapshot):
+        """Fill in the current rates from the change of the summary counters"""
+        rates = self.rates.update(slot, status.last_update, status.uptime,
+                                  [getattr(status, name) for name in COUNTERS])
+        if rates is None:
+            return
+        accepted, rejected, hw_errors, diff_accepted, diff_rejected = rates
+
+        status.accepted_rate = accepted * 60 if accepted is not None else None
+        status.rejected_rate = rejected * 60 if rejected is not None else None
+        status.hw_error_rate = hw_errors * 60 if hw_errors is not None else None
+        if diff_accepted is not None:
+            status.accepted_hashrate = diff_accepted * HASHES_PER_DIFF1 / 1e6
+
+        # Weighted by difficulty when the firmware reports it, by share count otherwise
+        if diff_accepted is not None and diff_rejected is not None:
+            good, bad = diff_accepted, diff_rejected
+        else:
+            good, bad = accepted, rejected
+        if good is not None and bad is not None and good + bad > 0:
+            status.current_rejected_pct = bad / (good + bad) * 100
+
+    async def worker(self):
+        """Poll miners from the queue until cancelled"""
+        while True:
+            ip = await self.queue.get()
+            try:
+                await self.poll_miner(ip)
+            except asyncio.CancelledError:
+                raise
+            except BrokenPipeError as e:
+                # The output reader went away: no other miner can be written either
+                self.stop(e)
+            except Exception:
+                logger.exception("Polling %s failed", ip)
+            finally:
+                self.pending.pop(ip, None)
+                if not self.pending:
+                    self.idle.set()
+                self.queue.task_done()
+
+    def start_workers(self):
+        """Create the queue and the fixed worker pool on the running loop"""
+        self.queue = asyncio.Queue()
+        self.idle = asyncio.Event()
+        count = min(self.concurrency, len(self.miner_ips))
+        self.workers = [asyncio.ensure_future(self.worker()) for _ in range(count)]
+
+    def enqueue(self, ip: str, now: float):
+        """Queue a miner for polling unless it is still queued or in flight"""
+        if ip not in self.pending:
+            self.pending[ip] = now
+            self.queue.put_nowait(ip)
+            self.idle.clear()
+
+    def mark_stale(self, now: float):
+        """Flag miners whose poll has been pending longer than the deadline
+
+        A miner that turns stale is re-exported and, in headless mode,
+        written once more with ``stale`` set, so every output shows that
+        its values are carried forward.
+        """
+        flagged = []
+        with self.data_lock:
+            for ip, queued_at in self.pending.items():
+                status = self.miner_data.get(ip)
+                if status is None or status.stale or now - queued_at < self.cycle_deadline:
+                    continue
+                status.stale = True
+                self.store.set_stale(ip, True)
+                if self.exporter is not None:
+                    self.exporter.update(self.store.slots[ip], status)
+                flagged.append(status)
+
+        if self.writer is not None:
+            for status in flagged:
+                self.writer.write(status)
+
+    async def schedule_loop(self):
+        """Feed miners to the workers as their rolling due times come up
+
+        Every miner is polled once per ``interval``, with start times spread
+        evenly across the interval, so the request rate stays steady instead
+        of bursting at the start of each refresh.
+        """
+        if self.queue is None:
+            self.start_workers()
 
-        # Start a thread for each miner
+        # First sweep: queue everyone now so the table fills in as fast as
+        # the workers allow, then settle into the rolling schedule
+        now = time.monotonic()
         for ip in self.miner_ips:
-            thread = Thread(target=self.update_miner, args=(ip, queue))
-            thread.daemon = True
-            thread.start()
-            threads.append(thread)
-
-        # Wait for all threads to complete (with timeout)
-        for thread in threads:
-            thread.join(timeout=5)
-
-        # Collect results from queue
-        while not queue.empty():
-            ip, status = queue.get()
+            self.enqueue(ip, now)
+        self.scheduler.add_all(self.miner_ips, now + self.interval)
+
+        while self.running:
+            now = time.monotonic()
+            for ip in self.scheduler.pop_due(now):
+                self.enqueue(ip, now)
+            next_due = self.scheduler.next_due()
+            if next_due is None:
+                await asyncio.sleep(self.interval)
+            else:
+                await asyncio.sleep(max(0.0, next_due - time.monotonic()))
+
+    async def stale_loop(self):
+        """Flag overrunning polls as stale, whatever the output mode"""
+        period = min(STALE_CHECK, self.cycle_deadline)
+        while True:
+            await asyncio.sleep(period)
+            try:
+                self.mark_stale(time.monotonic())
+            except BrokenPipeError as e:
+                self.stop(e)
+
+    async def recompute_loop(self):
+        """Rebuild the store's running sums now and then, so they cannot drift"""
+        while True:
+            await asyncio.sleep(RECOMPUTE_INTERVAL)
             with self.data_lock:
-                self.miner_data[ip] = status
-
-    def clear_screen(self):
-        """Clear terminal screen"""
-        os.system('clear' if os.name != 'nt' else 'cls')
+                self.store.recompute()
+
+    async def recorder_loop(self):
+        """Write recorded samples in batches, off the event loop thread"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.recorder.flush_interval)
+            await loop.run_in_executor(None, self.recorder.sync)
+
+    def start_background(self) -> List[asyncio.Task]:
+        """Start the scheduler and the housekeeping tasks and, when enabled, the recorder and the metrics endpoint"""
+        tasks = [asyncio.ensure_future(self.schedule_loop()),
+                 asyncio.ensure_future(self.stale_loop()),
+                 asyncio.ensure_future(self.recompute_loop())]
+        if self.recorder is not None:
+            tasks.append(asyncio.ensure_future(self.recorder_loop()))
+        if self.metrics_server is not None:
+            tasks.append(asyncio.ensure_future(self.metrics_server.serve()))
+        return tasks
 
     def draw_table(self):
-        """Draw the status table"""
-        self.clear_screen()
+        """Draw the status table, rewriting only the rows that changed"""
+        self.renderer.render(self.build_frame())
+
+    def build_frame(self) -> List[str]:
+        """Build the lines of one dashboard frame"""
+        lines: List[str] = []
+        out = lines.append
 
         # Header
-        print("=" * 165)
-        print("AVALON FLEET MONITOR")
-        print("=" * 165)
-        print(f"Monitoring {len(self.miner_ips)} miners | Refresh interval: {self.interval}s | Last update: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print("=" * 165)
+        out("=" * TABLE_WIDTH)
+        out("AVALON FLEET MONITOR")
+        out("=" * TABLE_WIDTH)
+        out(f"Monitoring {len(self.miner_ips)} miners | Refresh interval: {self.interval}s | "
+            f"Responded: {len(self.miner_data)}/{len(self.miner_ips)} | "
+            f"Last update: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        out("=" * TABLE_WIDTH)
 
         # Table header
         header = (
-            f"{'IP Address':<15} "
+            f"  {'IP Address':<15} "
             f"{'Model':<8} "
             f"{'Status':<8} "
             f"{'Mode':<8} "
@@ -332,16 +611,36 @@ class FleetMonitor:
             f"{'Last':<8} "
             f"{'Best':<8} "
             f"{'Rej%':<7} "
-            f"{'Uptime':<8}"
+            f"{'Uptime':<8} "
+            f"{'HR 1m/5m/15m':<{TREND_WIDTH}} "
+            f"{'HR Trend':<10} "
+            f"{'Temp Trend':<10}"
         )
-        print(header)
-        print("-" * 165)
+        out(header)
+        out("-" * TABLE_WIDTH)
 
-        # Sort miners by IP
-        sorted_ips = sorted(self.miner_ips, key=lambda x: [int(p) for p in x.split('.')])
+        chip_lines = self.chip_check_lines()
 
+        # Only the rows that fit on screen are selected and formatted
+        height = None
+        if self.renderer.interactive:
+            fixed = len(lines) + len(chip_lines) + 5 + (self.latency_stats is not None)
+            height = max(1, shutil.get_terminal_size().lines - fixed - 1)
+
+        now = time.time()
         with self.data_lock:
-            for ip in sorted_ips:
+            visible_ips = self.view.visible(height)
+            budget = height
+            shown = 0
+            for ip in visible_ips:
+                if budget is not None:
+                    # Each miner takes its row plus any status lines below it
+                    m = self.miner_data.get(ip)
+                    needed = 1 + (bool(m.stale) + bool(m.error) if m else 0)
+                    if needed > budget and shown:
+                        break
+                    budget -= needed
+                shown += 1
                 if ip in self.miner_data:
                     m = self.miner_data[ip]
 
@@ -355,34 +654,48 @@ class FleetMonitor:
                     elif m.status == "StandBy":
                         status_color = "\033[93m"  # Yellow
                         reset_color = "\033[0m"
-                    elif m.status == "Error":
+                    elif m.status in ("Error", "Offline"):
                         status_color = "\033[91m"  # Red
                         reset_color = "\033[0m"
 
+                    c = format_cells(m)
+                    c.update(self.trend_cells(ip))
+                    age = None if m.last_update is None else now - m.last_update
                     row = (
+                        f"{freshness(age, self.interval)} "
                         f"{m.ip:<15} "
-                        f"{m.model:<8} "
+                        f"{c['model']:<8} "
                         f"{status_color}{m.status:<8}{reset_color} "
-                        f"{m.work_mode:<8} "
-                        f"{m.power:<6} "
-                        f"{m.hashrate_current:<7} "
-                        f"{m.hashrate_average:<7} "
-                        f"{m.temp_asic:<6} "
-                        f"{m.active_pool:<20} "
-                        f"{m.last_share_diff:<8} "
-                        f"{m.best_share:<8} "
-                        f"{m.rejected_pct:<7} "
-                        f"{m.uptime:<8}"
+                        f"{c['work_mode']:<8} "
+                        f"{c['power']:<6} "
+                        f"{c['hashrate_current']:<7} "
+                        f"{c['hashrate_average']:<7} "
+                        f"{c['temp']:<6} "
+                        f"{c['pool']:<20} "
+                        f"{c['last_share_diff']:<8} "
+                        f"{c['best_share']:<8} "
+                        f"{c['rejected_pct']:<7} "
+                        f"{c['uptime']:<8} "
+                        f"{c['hashrate_trend']:<{TREND_WIDTH}} "
+                        f"{c['hashrate_spark']:<10} "
+                        f"{c['temp_spark']:<10}"
                     )
-                    print(row)
-
-                    # Show error if present
-                    if m.error:
-                        print(f"  └─ Error: {m.error}")
+                    out(row)
+
+                    # Show offline state, staleness or error if present
+                    if m.stale and m.last_update is None:
+                        out("  └─ Stale: no reply this cycle, and no successful poll yet")
+                    elif m.stale:
+                        updated = datetime.fromtimestamp(m.last_update).strftime('%H:%M:%S')
+                        out(f"  └─ Stale: no reply this cycle, showing data from {updated}")
+                    if m.status == "Offline":
+                        out(f"  └─ {m.error}")
+                    elif m.error:
+                        out(f"  └─ Error: {m.error[:ERROR_WIDTH]}")
                 else:
                     # Miner not yet scanned
                     row = (
-                        f"{ip:<15} "
+                        f"  {ip:<15} "
                         f"{'...':<8} "
                         f"{'Scanning':<8} "
                         f"{'...':<8} "
@@ -394,97 +707,225 @@ class FleetMonitor:
                         f"{'...':<8} "
                         f"{'...':<8} "
                         f"{'...':<7} "
-                        f"{'...':<8}"
+                        f"{'...':<8} "
+                        f"{'...':<{TREND_WIDTH}} "
+                        f"{'...':<10} "
+                        f"{'...':<10}"
                     )
-                    print(row)
+                    out(row)
 
-        print("=" * 165)
+        out("=" * TABLE_WIDTH)
 
-        # Summary stats
+        # Summary stats, maintained incrementally by the store
         with self.data_lock:
-            total_miners = len(self.miner_ips)
-            active_miners = sum(1 for m in self.miner_data.values() if m.status == "Active")
-            standby_miners = sum(1 for m in self.miner_data.values() if m.status == "StandBy")
-            error_miners = sum(1 for m in self.miner_data.values() if m.status == "Error")
-
-            # Calculate total hashrate
-            total_hashrate = 0.0
-            for m in self.miner_data.values():
-                if m.hashrate_average != "N/A":
-                    try:
-                        total_hashrate += float(m.hashrate_average)
-                    except ValueError:
-                        pass
-
-            print(f"Total: {total_miners} | Active: \033[92m{active_miners}\033[0m | "
+            store = self.store
+            total_miners = len(store)
+            active_miners = store.count("Active")
+            standby_miners = store.count("StandBy")
+            error_miners = store.count("Error")
+            offline_miners = store.count("Offline")
+            stale_miners = store.stale_count
+
+            # Total hashrate (MH/s -> TH/s)
+            total_hashrate = to_ths(store.total('hashrate_average'))
+
+            # Current share health, from the per-miner rates
+            accepted_rate = store.total('accepted_rate')
+            rejected_rate = store.total('rejected_rate')
+            shares = accepted_rate + rejected_rate
+            reject_pct = f"{rejected_rate / shares * 100:.2f}%" if shares else "N/A"
+
+            out(f"Total: {total_miners} | Active: \033[92m{active_miners}\033[0m | "
                   f"StandBy: \033[93m{standby_miners}\033[0m | "
                   f"Error: \033[91m{error_miners}\033[0m | "
-                  f"Fleet Hash Rate: \033[96m{total_hashrate:.2f} TH/s\033[0m")
+                  f"Offline: \033[91m{offline_miners}\033[0m | "
+                  f"Stale: {stale_miners} | "
+                  f"Fleet Hash Rate: \033[96m{total_hashrate:.2f} TH/s\033[0m | "
+                  f"Shares: {accepted_rate:.1f}/min | Rejected: {reject_pct} | "
+                  f"HW Errors: {store.total('hw_error_rate'):.2f}/min")
+            if self.latency_stats is not None:
+                out(self.latency_line())
+            out(self.view.describe(shown))
+
+        lines.extend(chip_lines)
+
+        out("")
+        if self.keys.enabled:
+            out("Keys: Up/Down PgUp/PgDn Home/End scroll | s sort | r reverse | w worst N | "
+                "f status | m model | c clear filters | q quit")
+        else:
+            out("Press Ctrl+C to exit")
+        return lines
+
+    def latency_line(self) -> str:
+        """Median and 95th percentile of every request phase, and the error counts"""
+        stats = self.latency_stats
+        cells = []
+        for phase in PHASES + (TOTAL,):
+            histogram = stats.merged(phase)
+            if histogram.count:
+                cell = f"{histogram.quantile(0.5) * 1000:.1f}/{histogram.quantile(0.95) * 1000:.1f}"
+            else:
+                cell = "-"
+            cells.append(f"{phase.replace('_', ' ')} {cell}")
+        errors = ', '.join(f"{name} {count}" for name, count in stats.error_counts().items() if count)
+        return f"Latency p50/p95 ms: {' | '.join(cells)} | Errors: {errors or 'none'}"
+
+    def trend_cells(self, ip: str) -> Dict[str, str]:
+        """Format the 1m/5m/15m hash rate means and the sparklines of one row"""
+        slot = self.store.slots[ip]
+        hashrate = self.hashrate_history
+        temp = self.temp_history
+
+        means = hashrate.trends(slot)
+        trend = '/'.join(trend_value(v) for v in means)
+        if len(trend) > TREND_WIDTH:
+            # Beyond 999 TH/s per miner: clip rather than shift the columns
+            trend = trend[:TREND_WIDTH - 1] + '…'
+
+        latest = hashrate.latest(slot) or 0
+        # Swings under 5% of the hash rate or 5°C draw as a flat line
+        hashrate_spark = format_sparkline(hashrate.recent(slot, HASHRATE_SPARK), 0.05 * latest)
+        temp_arrow = format_trend(temp.mean(slot, 0), temp.mean(slot, len(TREND_WINDOWS) - 1), 1.0)
+        temp_spark = format_sparkline(temp.recent(slot, TEMP_SPARK), 5.0) + temp_arrow
+
+        return {
+            'hashrate_trend': trend if any(v is not None for v in means) else "N/A",
+            'hashrate_spark': hashrate_spark,
+            'temp_spark': temp_spark.rstrip() or "N/A",
+        }
+
+    def chip_check_lines(self, limit: int = 5) -> List[str]:
+        """Lines naming chips and miners whose temperatures stand out"""
+        version, lines = self._chip_lines
+        if version == self.chip_version:
+            return lines
+
+        lines = []
+        stats = fleet_chip_stats(self.chip_temps)
+        chips = [f"{ip} #{i} ({self.chip_temps[ip][i]}°C)"
+                 for ip, s in stats.items() for i in s.outliers]
+        miners = outlier_miners(stats)
+
+        if chips:
+            more = f" (+{len(chips) - limit} more)" if len(chips) > limit else ""
+            lines.append(f"\033[91mChip temp outliers:\033[0m {', '.join(chips[:limit])}{more}")
+        if miners:
+            more = f" (+{len(miners) - limit} more)" if len(miners) > limit else ""
+            lines.append(f"\033[91mMiners off fleet chip temp:\033[0m {', '.join(miners[:limit])}{more}")
+
+        self._chip_lines = (self.chip_version, lines)
+        return lines
+
+    def on_key(self, key: str):
+        """Apply a keypress to the view and redraw right away if it changed"""
+        if key == 'q':
+            self.running = False
+            self.redraw.set()
+        elif self.view.handle_key(key):
+            self.redraw.set()
 
-        print("\nPress Ctrl+C to exit")
+    async def monitor_loop(self):
+        """Run the rolling scheduler and redraw at a fixed frame rate until stopped
+
+        Results land in the store as each miner answers, and every frame
+        shows whatever has arrived so far. A keypress that changes the view
+        redraws immediately without shifting the frame clock. When the
+        output is not a terminal, one full frame is written per interval.
+        """
+        background = self.start_background()
+        self.redraw = asyncio.Event()
+        self.keys.start(self.on_key)
+        period = 1 / self.frame_rate if self.renderer.interactive else self.interval
+        next_frame = time.monotonic()
+        try:
+            while self.running:
+                now = time.monotonic()
+                if now >= next_frame:
+                    next_frame += period
+                    if next_frame <= now:
+                        # Fell behind: skip frames rather than catch up
+                        next_frame = now + period
+                self.draw_table()
+                self.redraw.clear()
+                try:
+                    await asyncio.wait_for(self.redraw.wait(), timeout=next_frame - time.monotonic())
+                except asyncio.TimeoutError:
+                    pass
+            if self.fatal is not None:
+                raise self.fatal
+        finally:
+            self.keys.stop()
+            for task in background:
+                task.cancel()
+
+    def stop(self, error: Optional[BaseException] = None):
+        """Stop the main loop, re-raising ``error`` from it when given"""
+        if error is not None and self.fatal is None:
+            self.fatal = error
+        self.running = False
+
+    async def headless_loop(self):
+        """Run the rolling scheduler and flush output records until stopped"""
+        background = self.start_background()
+        try:
+            while self.running:
+                await asyncio.sleep(self.flush_interval)
+                if self.writer is not None:
+                    self.writer.flush()
+            if self.fatal is not None:
+                raise self.fatal
+        finally:
+            for task in background:
+                task.cancel()
 
     def run(self):
         """Main monitoring loop"""
+        try:
+            if self.headless:
+                self.run_headless()
+            else:
+                self.run_dashboard()
+        finally:
+            if self.recorder is not None:
+                self.recorder.close()
+            if self.metrics_server is not None:
+                self.metrics_server.close()
+
+    def run_dashboard(self):
+        """Draw the interactive table until Ctrl+C or q"""
         print("Starting Avalon Fleet Monitor...")
         print(f"Monitoring {len(self.miner_ips)} miners with {self.interval}s refresh interval")
+        if self.metrics_server is not None:
+            print(f"Serving Prometheus metrics at {self.metrics_server.url}")
         time.sleep(1)
 
         try:
-            while self.running:
-                self.update_all_miners()
-                self.draw_table()
-                time.sleep(self.interval)
+            asyncio.run(self.monitor_loop())
 
         except KeyboardInterrupt:
             print("\n\nShutting down Fleet Monitor...")
             self.running = False
 
+        finally:
+            self.renderer.close()
 
-def load_config_file(config_path: str) -> Dict[str, Any]:
-    """Load configuration from JSON file"""
-    try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        return config
-    except FileNotFoundError:
-        print(f"Error: Configuration file '{config_path}' not found")
-        sys.exit(1)
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON in configuration file: {e}")
-        sys.exit(1)
-    except Exception as e:
-        print(f"Error: Failed to load configuration file: {e}")
-        sys.exit(1)
-
-
-def validate_ip(ip: str) -> bool:
-    """Validate IP address"""
-    try:
-        ipaddress.ip_address(ip)
-        return True
-    except ValueError:
-        return False
-
-
-def parse_ip_range(ip_range: str) -> List[str]:
-    """Parse IP range like 192.168.1.100-110 into list of IPs"""
-    ips = []
-
-    # Check if it's a range
-    match = re.match(r'^(\d+\.\d+\.\d+\.)(\d+)-(\d+)$', ip_range)
-    if match:
-        prefix = match.group(1)
-        start = int(match.group(2))
-        end = int(match.group(3))
+    def run_headless(self):
+        """Write records instead of drawing the table (stdout stays data only)"""
+        try:
+            asyncio.run(self.headless_loop())
+            if self.writer is not None:
+                self.writer.close()
 
-        for i in range(start, end + 1):
-            ips.append(f"{prefix}{i}")
-    else:
-        # Single IP
-        if validate_ip(ip_range):
-            ips.append(ip_range)
+        except KeyboardInterrupt:
+            self.running = False
+            if self.writer is not None:
+                self.writer.close()
 
-    return ips
+        except BrokenPipeError:
+            # Reader went away (e.g. piped into head): drop the rest quietly
+            self.running = False
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
 
 
 def main():
@@ -505,6 +946,12 @@ Examples:
   # Custom refresh interval (30 seconds)
   %(prog)s --config fleet.json --interval 30
 
+  # Headless: one NDJSON record per poll on stdout
+  %(prog)s --config fleet.json --output ndjson | your-pipeline
+
+  # Prometheus endpoint only, no table
+  %(prog)s --config fleet.json --output none --metrics-port 9864
+
 Config file format (fleet.json):
   {
     "miners": [
@@ -513,7 +960,23 @@ Config file format (fleet.json):
       "192.168.1.102"
     ],
     "interval": 10,
-    "port": 4028
+    "port": 4028,
+    "concurrency": 256,
+    "failure_threshold": 3,
+    "max_backoff": 600,
+    "timeout_floor": 0.5,
+    "timeout_ceiling": 5.0,
+    "cycle_deadline": 10,
+    "slow_interval": 30,
+    "frame_rate": 2,
+    "history_size": 91,
+    "output": "table",
+    "flush_interval": 1,
+    "metrics": {"port": 9864, "host": "0.0.0.0"},
+    "timings": false,
+    "record": {"path": "fleet.db", "raw_retention_days": 2,
+               "minute_retention_days": 30, "hour_retention_days": 730},
+    "view": {"sort": "temp", "status": "Active", "subnet": "192.168.1.0/24"}
   }
 
 Or with IP ranges:
@@ -532,17 +995,71 @@ Or with IP ranges:
                        help='Refresh interval in seconds (default: 10)')
     parser.add_argument('--port', '-p', type=int, default=4028, metavar='PORT',
                        help='API port (default: 4028)')
+    parser.add_argument('--concurrency', type=int, metavar='N',
+                       help='Maximum number of miners polled at the same time (default: 256)')
+    parser.add_argument('--frame-rate', type=float, metavar='FPS',
+                       help='Dashboard redraws per second (default: 2)')
+    parser.add_argument('--output', '-o', choices=('table', 'none') + OUTPUT_FORMATS,
+                       help='table (interactive, default), headless ndjson/csv with one record per poll, '
+                            'or none (e.g. metrics endpoint only)')
+    parser.add_argument('--output-file', metavar='FILE',
+                       help='Append ndjson/csv records to FILE instead of stdout')
+    parser.add_argument('--flush-interval', type=float, metavar='SECONDS',
+                       help='How often buffered ndjson/csv records are written (default: 1)')
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                       help='Serve Prometheus metrics at http://HOST:PORT/metrics')
+    parser.add_argument('--metrics-host', metavar='HOST',
+                       help='Address the metrics endpoint listens on (default: 0.0.0.0)')
+    parser.add_argument('--timings', action='store_true',
+                       help='Time every request phase (connect, send, first byte, complete, parse) '
+                            'and classify errors, for the footer, records and metrics')
+    parser.add_argument('--record', metavar='FILE',
+                       help='Record every poll to a SQLite time-series database')
+    parser.add_argument('--sort', choices=SORT_KEYS,
+                       help='Initial table order; metric sorts put the worst miners first (default: ip)')
+    parser.add_argument('--worst', type=int, metavar='N',
+                       help='Show only the N worst miners by the sort metric')
+    parser.add_argument('--status', choices=STATUSES,
+                       help='Only show miners with this status')
+    parser.add_argument('--model', metavar='MODEL',
+                       help='Only show miners of this model')
+    parser.add_argument('--pool', metavar='TEXT',
+                       help='Only show miners whose pool URL contains TEXT')
+    parser.add_argument('--subnet', metavar='CIDR',
+                       help='Only show miners in this subnet, e.g. 192.168.1.0/24')
 
     args = parser.parse_args()
+    # Diagnostics go to stderr so headless stdout stays data only
+    logging.basicConfig(format='%(asctime)s %(levelname)s %(name)s: %(message)s')
 
     # Determine configuration source
     miner_ips = []
     interval = 10
     port = 4028
+    concurrency = 256
+    failure_threshold = 3
+    max_backoff = 600
+    timeout_floor = 0.5
+    timeout_ceiling = 5.0
+    cycle_deadline = None
+    slow_interval = 30
+    view = {}
+    frame_rate = 2
+    history_size = None
+    output = 'table'
+    output_file = None
+    flush_interval = 1
+    metrics = {}
+    record = {}
+    timings = False
 
     if args.config:
         # Load from config file
-        config = load_config_file(args.config)
+        try:
+            config = load_config_file(args.config)
+        except AvalonConfigError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
 
         # Parse miners (can be list of IPs or ranges)
         if 'miners' in config:
@@ -562,6 +1079,62 @@ Or with IP ranges:
         if 'port' in config:
             port = config['port']
 
+        # Get concurrency cap from config
+        if 'concurrency' in config:
+            concurrency = config['concurrency']
+
+        # Get circuit breaker settings from config
+        if 'failure_threshold' in config:
+            failure_threshold = config['failure_threshold']
+        if 'max_backoff' in config:
+            max_backoff = config['max_backoff']
+
+        # Get adaptive timeout bounds from config
+        if 'timeout_floor' in config:
+            timeout_floor = config['timeout_floor']
+        if 'timeout_ceiling' in config:
+            timeout_ceiling = config['timeout_ceiling']
+
+        # Get refresh cycle deadline from config
+        if 'cycle_deadline' in config:
+            cycle_deadline = config['cycle_deadline']
+
+        # Get refresh period of the slow sections (estats, lcd) from config
+        if 'slow_interval' in config:
+            slow_interval = config['slow_interval']
+
+        # Get dashboard frame rate from config
+        if 'frame_rate' in config:
+            frame_rate = config['frame_rate']
+
+        # Get per-miner sample history length from config
+        if 'history_size' in config:
+            history_size = config['history_size']
+
+        # Get headless output settings from config
+        if 'output' in config:
+            output = config['output']
+        if 'output_file' in config:
+            output_file = config['output_file']
+        if 'flush_interval' in config:
+            flush_interval = config['flush_interval']
+
+        # Get Prometheus endpoint settings from config
+        if 'metrics' in config:
+            metrics = dict(config['metrics'])
+
+        # Get request timing switch from config
+        if 'timings' in config:
+            timings = bool(config['timings'])
+
+        # Get time-series recorder settings from config
+        if 'record' in config:
+            record = dict(config['record'])
+
+        # Get initial sort order and filters of the table from config
+        if 'view' in config:
+            view = dict(config['view'])
+
     elif args.ips:
         # Load from command line
         for entry in args.ips:
@@ -579,6 +1152,41 @@ Or with IP ranges:
     if args.port != 4028:
         port = args.port
 
+    # Override concurrency if specified on command line
+    if args.concurrency is not None:
+        concurrency = args.concurrency
+
+    # Override frame rate if specified on command line
+    if args.frame_rate is not None:
+        frame_rate = args.frame_rate
+
+    # Override headless output settings if specified on command line
+    if args.output is not None:
+        output = args.output
+    if args.output_file is not None:
+        output_file = args.output_file
+    if args.flush_interval is not None:
+        flush_interval = args.flush_interval
+
+    # Override metrics endpoint if specified on command line
+    if args.metrics_port is not None:
+        metrics['port'] = args.metrics_port
+    if args.metrics_host is not None:
+        metrics['host'] = args.metrics_host
+
+    # Turn request timing on if specified on command line
+    if args.timings:
+        timings = True
+
+    # Override recorder database if specified on command line
+    if args.record is not None:
+        record['path'] = args.record
+
+    # Override sort order and filters if specified on command line
+    for option in ('sort', 'worst', 'status', 'model', 'pool', 'subnet'):
+        if getattr(args, option) is not None:
+            view[option] = getattr(args, option)
+
     # Validate we have miners
     if not miner_ips:
         print("Error: No valid miner IP addresses specified")
@@ -597,8 +1205,97 @@ Or with IP ranges:
         print("Error: Interval must be at least 1 second")
         sys.exit(1)
 
+    # Validate concurrency
+    if concurrency < 1:
+        print("Error: Concurrency must be at least 1")
+        sys.exit(1)
+
+    # Validate circuit breaker settings
+    if failure_threshold < 1:
+        print("Error: failure_threshold must be at least 1")
+        sys.exit(1)
+
+    # Validate adaptive timeout bounds
+    if timeout_floor <= 0 or timeout_ceiling < timeout_floor:
+        print("Error: timeout_floor must be positive and not above timeout_ceiling")
+        sys.exit(1)
+
+    # Validate cycle deadline
+    if cycle_deadline is not None and cycle_deadline <= 0:
+        print("Error: cycle_deadline must be positive")
+        sys.exit(1)
+
+    # Validate frame rate
+    if frame_rate <= 0:
+        print("Error: frame_rate must be positive")
+        sys.exit(1)
+
+    # Validate headless output settings
+    if output not in ('table', 'none') + OUTPUT_FORMATS:
+        print(f"Error: output must be one of table, none, {', '.join(OUTPUT_FORMATS)}")
+        sys.exit(1)
+    if flush_interval <= 0:
+        print("Error: flush_interval must be positive")
+        sys.exit(1)
+
+    # Validate history length
+    if history_size is not None and history_size < 1:
+        print("Error: history_size must be at least 1")
+        sys.exit(1)
+
+    # Validate worst-N size
+    if view.get('worst') is not None and view['worst'] < 1:
+        print("Error: worst must be at least 1")
+        sys.exit(1)
+
+    recorder = None
+    if record.get('path'):
+        # hour_retention_days: null keeps hourly rollups forever
+        hour_days = record.get('hour_retention_days', 730)
+        try:
+            recorder = MetricsRecorder(
+                record['path'],
+                raw_retention=record.get('raw_retention_days', 2) * DAY,
+                minute_retention=record.get('minute_retention_days', 30) * DAY,
+                hour_retention=hour_days * DAY if hour_days is not None else None,
+                flush_interval=record.get('flush_interval', 5))
+        except sqlite3.Error as e:
+            print(f"Error: Cannot open recorder database: {e}")
+            sys.exit(1)
+
+    latency_stats = LatencyStats() if timings else None
+
+    metrics_server = None
+    if metrics.get('port') is not None:
+        try:
+            metrics_server = MetricsServer(PrometheusExporter(miner_ips, latency_stats),
+                                           metrics.get('host', '0.0.0.0'), metrics['port'])
+        except OSError as e:
+            print(f"Error: Cannot listen for metrics on port {metrics['port']}: {e}")
+            sys.exit(1)
+
+    writer = None
+    if output in OUTPUT_FORMATS:
+        try:
+            writer = open_writer(output, output_file)
+        except OSError as e:
+            print(f"Error: Cannot open output file: {e}")
+            sys.exit(1)
+
     # Start monitoring
-    monitor = FleetMonitor(miner_ips, interval, port)
+    try:
+        monitor = FleetMonitor(miner_ips, interval, port, concurrency,
+                               failure_threshold, max_backoff,
+                               timeout_floor=timeout_floor, timeout_ceiling=timeout_ceiling,
+                               cycle_deadline=cycle_deadline, slow_interval=slow_interval,
+                               view=view, frame_rate=frame_rate,
+                               writer=writer, flush_interval=flush_interval,
+                               recorder=recorder, history_size=history_size,
+                               metrics_server=metrics_server, headless=output != 'table',
+                               latency_stats=latency_stats)
+    except (TypeError, ValueError) as e:
+        print(f"Error: Invalid view settings: {e}")
+        sys.exit(1)
     monitor.run()
 
 
@@ -11,14 +11,27 @@ SPDX-License-Identifier: Apache-2.0
 
 import sys
 import json
-import socket
 import argparse
 import ipaddress
-from datetime import datetime
-from typing import Dict, Any, Optional
-
-
-class AvalonMinerAPI:
+from typing import Dict, Any
+
+from avalon_core import (
+    STATUS_COMMANDS,
+    AvalonMinerClient,
+    first_entry,
+    parse_mm_id0,
+    parse_estats_field,
+    parse_int_array,
+    ChipTelemetry,
+    get_work_mode_name,
+    format_hashrate,
+    format_difficulty,
+    format_uptime,
+    format_timestamp,
+)
+
+
+class AvalonMinerAPI(AvalonMinerClient):
     """Handle communication with Avalon Miner API"""
 
     def __init__(self, ip: str, port: int = 4028, timeout: int = 5):
@@ -30,9 +43,8 @@ class AvalonMinerAPI:
             port: API port (default: 4028)
             timeout: Socket timeout in seconds (default: 5)
         """
+        super().__init__(ip, port, timeout)
         self.ip = ip
-        self.port = port
-        self.timeout = timeout
         self._validate_ip()
 
     def _validate_ip(self):
@@ -44,124 +56,6 @@ class AvalonMinerAPI:
         except ValueError as e:
             raise ValueError(f"Invalid IP address: {e}")
 
-    def send_command(self, command: str, params: str = '') -> Dict[str, Any]:
-        """
-        Send a command to the miner API
-
-        Args:
-            command: API command name
-            params: Optional command parameters
-
-        Returns:
-            Dictionary containing the JSON response
-        """
-        # Build JSON command
-        if params:
-            json_cmd = json.dumps({
-                "command": command,
-                "parameter": params
-            }, separators=(',', ':'))
-        else:
-            json_cmd = json.dumps({
-                "command": command
-            }, separators=(',', ':'))
-
-        try:
-            # Create socket connection
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(self.timeout)
-            sock.connect((self.ip, self.port))
-
-            # Send command
-            sock.sendall(json_cmd.encode('utf-8'))
-
-            # Small delay to ensure command is processed
-            import time
-            time.sleep(0.1)
-
-            # Receive response
-            response = b''
-            while True:
-                try:
-                    chunk = sock.recv(4096)
-                    if not chunk:
-                        break
-                    response += chunk
-                except socket.timeout:
-                    break
-
-            sock.close()
-
-            # Parse JSON response (strip null bytes and whitespace)
-            response_str = response.decode('utf-8').rstrip('\x00').strip()
-            return json.loads(response_str)
-
-        except socket.timeout:
-            raise ConnectionError(f"Connection timeout to {self.ip}:{self.port}")
-        except socket.error as e:
-            raise ConnectionError(f"Socket error: {e}")
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON response: {e}")
-        except Exception as e:
-            raise Exception(f"Error communicating with miner: {e}")
-
-
-def format_hashrate(mhs: float, from_mhs: bool = True) -> str:
-    """Format hash rate in human-readable format"""
-    if from_mhs:
-        ths = mhs / 1_000_000
-    else:
-        ths = mhs / 1_000
-    return f"{ths:.2f} TH/s"
-
-
-def format_difficulty(diff: float) -> str:
-    """Format difficulty with appropriate unit"""
-    if diff >= 1e15:
-        return f"{diff / 1e15:.2f} P"
-    elif diff >= 1e12:
-        return f"{diff / 1e12:.2f} T"
-    elif diff >= 1e9:
-        return f"{diff / 1e9:.2f} G"
-    elif diff >= 1e6:
-        return f"{diff / 1e6:.2f} M"
-    elif diff >= 1e3:
-        return f"{diff / 1e3:.2f} K"
-    else:
-        return f"{diff:.2f}"
-
-
-def format_uptime(seconds: int) -> str:
-    """Format uptime in human-readable format"""
-    days = seconds // 86400
-    hours = (seconds % 86400) // 3600
-    minutes = (seconds % 3600) // 60
-    secs = seconds % 60
-    return f"{days}d {hours}h {minutes}m {secs}s"
-
-
-def format_timestamp(unix_time: int) -> str:
-    """Convert unix timestamp to readable format"""
-    return datetime.fromtimestamp(unix_time).strftime('%Y-%m-%d %H:%M:%S')
-
-
-def parse_estats_field(mm_id0: str, field_name: str) -> str:
-    """Parse a field from the MM ID0 string in ESTATS response"""
-    import re
-    pattern = rf'{field_name}\[([^\]]+)\]'
-    match = re.search(pattern, mm_id0)
-    return match.group(1) if match else None
-
-
-def get_work_mode_name(mode_value: str) -> str:
-    """Convert work mode number to name"""
-    mode_map = {
-        '0': 'Eco',
-        '1': 'Standard',
-        '2': 'Super'
-    }
-    return mode_map.get(mode_value, f'Unknown ({mode_value})')
-
 
 def check_status(response: Dict[str, Any]) -> bool:
     """Check if API response indicates success"""
@@ -201,10 +95,11 @@ def cmd_version(api: AvalonMinerAPI, args) -> None:
 
 def cmd_summary(api: AvalonMinerAPI, args) -> None:
     """Get miner summary statistics"""
-    response = api.send_command('summary')
+    # Summary plus ESTATS (work mode, power, uptime) and LCD (difficulty) in one request
+    sections = api.fetch_sections(('summary', 'estats', 'lcd'))
+    response = sections.get('summary', {})
 
-    # Get ESTATS for work mode, power, and uptime info
-    estats_response = api.send_command('estats')
+    estats_response = sections.get('estats', {})
     work_mode = None
     power = None
     uptime = None
@@ -212,10 +107,11 @@ def cmd_summary(api: AvalonMinerAPI, args) -> None:
         stats = estats_response['STATS'][0] if isinstance(estats_response['STATS'], list) else estats_response['STATS']
         mm_id0 = stats.get('MM ID0', '')
         if mm_id0:
-            work_mode_val = parse_estats_field(mm_id0, 'WORKMODE')
+            fields = parse_mm_id0(mm_id0)
+            work_mode_val = fields.get('WORKMODE')
             if work_mode_val:
                 work_mode = get_work_mode_name(work_mode_val)
-            power_val = parse_estats_field(mm_id0, 'MPO')
+            power_val = fields.get('MPO')
             if power_val:
                 power = f"{power_val}W"
 
@@ -223,8 +119,8 @@ def cmd_summary(api: AvalonMinerAPI, args) -> None:
         if elapsed:
             uptime = format_uptime(elapsed)
 
-    # Get LCD for difficulty info
-    lcd_response = api.send_command('lcd')
+    # LCD for difficulty info
+    lcd_response = sections.get('lcd', {})
     current_diff = None
     best_diff = None
     if 'LCD' in lcd_response and len(lcd_response['LCD']) > 0:
@@ -281,11 +177,12 @@ def cmd_estats(api: AvalonMinerAPI, args) -> None:
             print(f"Uptime           : {format_uptime(stats.get('Elapsed', 0))}")
 
             if mm_id0:
+                fields = parse_mm_id0(mm_id0)
                 # Firmware/Version info
-                ver = parse_estats_field(mm_id0, 'Ver')
-                lver = parse_estats_field(mm_id0, 'LVer')
-                dna = parse_estats_field(mm_id0, 'DNA')
-                core = parse_estats_field(mm_id0, 'Core')
+                ver = fields.get('Ver')
+                lver = fields.get('LVer')
+                dna = fields.get('DNA')
+                core = fields.get('Core')
 
                 print(f"\n--- Firmware & Hardware ---")
                 if ver:
@@ -298,12 +195,12 @@ def cmd_estats(api: AvalonMinerAPI, args) -> None:
                     print(f"Core Type        : {core}")
 
                 # Work mode and performance
-                work_mode_val = parse_estats_field(mm_id0, 'WORKMODE')
-                freq = parse_estats_field(mm_id0, 'Freq')
-                ghs_avg = parse_estats_field(mm_id0, 'GHSavg')
-                ghs_spd = parse_estats_field(mm_id0, 'GHSspd')
-                wu = parse_estats_field(mm_id0, 'WU')
-                mpo = parse_estats_field(mm_id0, 'MPO')
+                work_mode_val = fields.get('WORKMODE')
+                freq = fields.get('Freq')
+                ghs_avg = fields.get('GHSavg')
+                ghs_spd = fields.get('GHSspd')
+                wu = fields.get('WU')
+                mpo = fields.get('MPO')
 
                 print(f"\n--- Performance ---")
                 if work_mode_val:
@@ -320,11 +217,12 @@ def cmd_estats(api: AvalonMinerAPI, args) -> None:
                     print(f"Power Output     : {mpo}W")
 
                 # Temperature
-                tmax = parse_estats_field(mm_id0, 'TMax')
-                tavg = parse_estats_field(mm_id0, 'TAvg')
-                tart = parse_estats_field(mm_id0, 'TarT')
-                otemp = parse_estats_field(mm_id0, 'OTemp')
-                itemp = parse_estats_field(mm_id0, 'ITemp')
+                tmax = fields.get('TMax')
+                tavg = fields.get('TAvg')
+                tart = fields.get('TarT')
+                # HBOTemp on current firmware
+                otemp = fields.get('OTemp') or fields.get('HBOTemp')
+                itemp = fields.get('ITemp')
 
                 print(f"\n--- Temperature ---")
                 if tmax:
@@ -339,8 +237,8 @@ def cmd_estats(api: AvalonMinerAPI, args) -> None:
                     print(f"Inlet Temp       : {itemp}°C")
 
                 # Fan
-                fan1 = parse_estats_field(mm_id0, 'Fan1')
-                fanr = parse_estats_field(mm_id0, 'FanR')
+                fan1 = fields.get('Fan1')
+                fanr = fields.get('FanR')
 
                 print(f"\n--- Cooling ---")
                 if fan1:
@@ -349,10 +247,9 @@ def cmd_estats(api: AvalonMinerAPI, args) -> None:
                     print(f"Fan Speed (%)    : {fanr}")
 
                 # Power supply
-                ps = parse_estats_field(mm_id0, 'PS')
+                ps = fields.get('PS')
                 if ps:
-                    import re
-                    ps_values = re.findall(r'-?\d+', ps)
+                    ps_values = parse_int_array(ps)
                     if len(ps_values) >= 7:
                         print(f"\n--- Power Supply ---")
                         print(f"Error Code       : {ps_values[0]}")
@@ -362,10 +259,10 @@ def cmd_estats(api: AvalonMinerAPI, args) -> None:
                         print(f"Output Power     : {ps_values[6]} (raw)")
 
                 # Hash/Error statistics
-                hw = parse_estats_field(mm_id0, 'HW')
-                dh = parse_estats_field(mm_id0, 'DH')
-                dhspd = parse_estats_field(mm_id0, 'DHspd')
-                lw = parse_estats_field(mm_id0, 'LW')
+                hw = fields.get('HW')
+                dh = fields.get('DH')
+                dhspd = fields.get('DHspd')
+                lw = fields.get('LW')
 
                 print(f"\n--- Statistics ---")
                 if lw:
@@ -378,9 +275,9 @@ def cmd_estats(api: AvalonMinerAPI, args) -> None:
                     print(f"DH Speed         : {dhspd}")
 
                 # System status
-                sys_status = parse_estats_field(mm_id0, 'SYSTEMSTATU')
-                memfree = parse_estats_field(mm_id0, 'MEMFREE')
-                ping = parse_estats_field(mm_id0, 'PING')
+                sys_status = fields.get('SYSTEMSTATU')
+                memfree = fields.get('MEMFREE')
+                ping = fields.get('PING')
 
                 print(f"\n--- System ---")
                 if sys_status:
@@ -391,15 +288,20 @@ def cmd_estats(api: AvalonMinerAPI, args) -> None:
                     print(f"Ping             : {ping} ms")
 
                 # Chip info (PLL frequencies and Temps)
-                pll0 = parse_estats_field(mm_id0, 'PLL0')
-                pvt_t0 = parse_estats_field(mm_id0, 'PVT_T0')
+                chips = ChipTelemetry.from_fields(fields)
 
-                if pll0 or pvt_t0:
+                if chips.pll or chips.temps:
                     print(f"\n--- Chip Details ---")
-                    if pll0:
-                        print(f"PLL Frequencies  : {pll0}")
-                    if pvt_t0:
-                        print(f"Chip Temps       : {pvt_t0}")
+                    if chips.pll:
+                        print(f"PLL Frequencies  : {' '.join(map(str, chips.pll))}")
+                    if chips.temps:
+                        temps = chips.temp_stats()
+                        print(f"Chip Temps       : {temps.count} chips, min {temps.minimum:.0f}°C, "
+                              f"avg {temps.mean:.1f}°C, max {temps.maximum:.0f}°C, "
+                              f"stddev {temps.stddev:.1f}°C")
+                        if temps.outliers:
+                            outliers = ', '.join(f"#{i} ({chips.temps[i]}°C)" for i in temps.outliers)
+                            print(f"Outlier Chips    : {outliers}")
 
             print()
         else:
@@ -486,22 +388,20 @@ def cmd_info(api: AvalonMinerAPI, args) -> None:
     """Get comprehensive miner information (combines multiple API calls)"""
     print("\nGathering miner information...")
 
-    # Get version info
-    ver_response = api.send_command('version')
-    ver = ver_response.get('VERSION', [{}])[0]
+    # Version, LCD, summary and ESTATS in a single request
+    sections = api.fetch_sections(STATUS_COMMANDS)
+
+    # Version info
+    ver = first_entry(sections.get('version'), 'VERSION')
 
-    # Get LCD info
-    lcd_response = api.send_command('lcd')
-    lcd_list = lcd_response.get('LCD', [])
-    lcd = lcd_list[0] if isinstance(lcd_list, list) and len(lcd_list) > 0 else {}
+    # LCD info
+    lcd = first_entry(sections.get('lcd'), 'LCD')
 
-    # Get summary
-    sum_response = api.send_command('summary')
-    summary_list = sum_response.get('SUMMARY', [])
-    summary = summary_list[0] if isinstance(summary_list, list) and len(summary_list) > 0 else {}
+    # Summary
+    summary = first_entry(sections.get('summary'), 'SUMMARY')
 
-    # Get ESTATS for additional details
-    estats_response = api.send_command('estats')
+    # ESTATS for additional details
+    estats_response = sections.get('estats', {})
     work_mode = None
     power = None
     temp_max = None
@@ -515,31 +415,32 @@ def cmd_info(api: AvalonMinerAPI, args) -> None:
         stats = estats_response['STATS'][0] if isinstance(estats_response['STATS'], list) else estats_response['STATS']
         mm_id0 = stats.get('MM ID0', '')
         if mm_id0:
-            work_mode_val = parse_estats_field(mm_id0, 'WORKMODE')
+            fields = parse_mm_id0(mm_id0)
+            work_mode_val = fields.get('WORKMODE')
             if work_mode_val:
                 work_mode = get_work_mode_name(work_mode_val)
 
-            power_val = parse_estats_field(mm_id0, 'MPO')
+            power_val = fields.get('MPO')
             if power_val:
                 power = f"{power_val}W"
 
-            temp_max_val = parse_estats_field(mm_id0, 'TMax')
+            temp_max_val = fields.get('TMax')
             if temp_max_val:
                 temp_max = f"{temp_max_val}°C"
 
-            temp_avg_val = parse_estats_field(mm_id0, 'TAvg')
+            temp_avg_val = fields.get('TAvg')
             if temp_avg_val:
                 temp_avg = f"{temp_avg_val}°C"
 
-            temp_target_val = parse_estats_field(mm_id0, 'TarT')
+            temp_target_val = fields.get('TarT')
             if temp_target_val:
                 temp_target = f"{temp_target_val}°C"
 
-            fan_rpm_val = parse_estats_field(mm_id0, 'Fan1')
+            fan_rpm_val = fields.get('Fan1')
             if fan_rpm_val:
                 fan_rpm = f"{fan_rpm_val} RPM"
 
-            fan_percent_val = parse_estats_field(mm_id0, 'FanR')
+            fan_percent_val = fields.get('FanR')
             if fan_percent_val:
                 fan_percent = fan_percent_val.replace('%', '') + '%'
 
@@ -684,8 +585,7 @@ def cmd_get_voltage(api: AvalonMinerAPI, args) -> None:
             print(f"Raw String       : {voltage_str}")
 
             # Try to parse the values
-            import re
-            matches = re.findall(r'-?\d+', voltage_str)
+            matches = parse_int_array(voltage_str)
             if len(matches) >= 7:
                 print(f"\nError Code       : {matches[0]}")
                 print(f"Reserved 1       : {matches[1]}")
@@ -712,8 +612,9 @@ def cmd_get_fan(api: AvalonMinerAPI, args) -> None:
         mm_id0 = stats.get('MM ID0', '')
 
         if mm_id0:
-            fan_rpm = parse_estats_field(mm_id0, 'Fan1')
-            fan_percent = parse_estats_field(mm_id0, 'FanR')
+            fields = parse_mm_id0(mm_id0)
+            fan_rpm = fields.get('Fan1')
+            fan_percent = fields.get('FanR')
 
             print("\n=== Fan Speed ===")
             if fan_rpm:
@@ -762,9 +663,10 @@ def cmd_get_target_temp(api: AvalonMinerAPI, args) -> None:
         mm_id0 = stats.get('MM ID0', '')
 
         if mm_id0:
-            target_temp = parse_estats_field(mm_id0, 'TarT')
-            temp_max = parse_estats_field(mm_id0, 'TMax')
-            temp_avg = parse_estats_field(mm_id0, 'TAvg')
+            fields = parse_mm_id0(mm_id0)
+            target_temp = fields.get('TarT')
+            temp_max = fields.get('TMax')
+            temp_avg = fields.get('TAvg')
 
             print("\n=== Temperature Settings ===")
             if target_temp:
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Avalon API Proxy
+
+Local caching proxy for the Avalon miner API. Every proxied miner gets its
+own local port that speaks the same JSON API as port 4028, so the Home
+Assistant integration, the fleet monitor and scripts can share one
+connection budget to each miner instead of all hitting it directly.
+
+Copyright (c) 2025
+SPDX-License-Identifier: Apache-2.0
+"""
+
+import sys
+import asyncio
+import argparse
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from avalon_core import (
+    DEFAULT_PORT,
+    DEFAULT_TIMEOUT,
+    AvalonConfigError,
+    MinerProxy,
+    load_config_file,
+    parse_ip_range,
+    validate_ip,
+)
+from avalon_core.proxy import DEFAULT_TTLS
+
+
+def parse_miners(entries: List[Any], listen_host: str,
+                 base_port: int) -> List[Tuple[str, str, int]]:
+    """
+    Expand config/CLI miner entries into (miner IP, listen host, listen port)
+
+    Plain entries (IPs or ranges) get consecutive ports from ``base_port``;
+    objects ``{"ip": ..., "listen_host": ..., "listen_port": ...}`` choose
+    their own.
+    """
+    miners = []
+    next_port = base_port
+    for entry in entries:
+        if isinstance(entry, dict):
+            ip = entry.get('ip', '')
+            port = entry.get('listen_port', next_port)
+            miners.append((ip, entry.get('listen_host', listen_host), port))
+            next_port = max(next_port, port + 1)
+            continue
+        for ip in parse_ip_range(entry):
+            miners.append((ip, listen_host, next_port))
+            next_port += 1
+    return miners
+
+
+class ProxyServer:
+    """Run one :class:`MinerProxy` per miner, each on its own local port"""
+
+    def __init__(self, miners: List[Tuple[str, str, int]], port: int = DEFAULT_PORT,
+                 ttls: Dict[str, float] = DEFAULT_TTLS, timeout: float = DEFAULT_TIMEOUT,
+                 stats_interval: float = 60):
+        self.miners = miners
+        self.stats_interval = stats_interval
+        self.proxies = {ip: MinerProxy(ip, port, ttls=ttls, timeout=timeout)
+                        for ip, _, _ in miners}
+
+    async def serve(self):
+        """Listen on every local port and serve until cancelled"""
+        servers = []
+        try:
+            for ip, host, port in self.miners:
+                servers.append(await asyncio.start_server(self.proxies[ip].handle, host, port))
+            for ip, host, port in self.miners:
+                print(f"{host}:{port} -> {ip}:{self.proxies[ip].port}", flush=True)
+
+            while True:
+                if self.stats_interval:
+                    await asyncio.sleep(self.stats_interval)
+                    self.print_stats()
+                else:
+                    await asyncio.Event().wait()
+        finally:
+            for server in servers:
+                server.close()
+
+    def print_stats(self):
+        """Log request, cache and upstream counters of every miner"""
+        stamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for ip, proxy in self.proxies.items():
+            print(f"[{stamp}] {ip}: {proxy.requests} requests, {proxy.hits} cached, "
+                  f"{proxy.coalesced} coalesced, {proxy.upstream_requests} upstream, "
+                  f"{proxy.passthrough} forwarded, {proxy.errors} errors", file=sys.stderr, flush=True)
+
+    def run(self):
+        print(f"Starting Avalon API Proxy for {len(self.miners)} miners...", flush=True)
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            print("\nShutting down API Proxy...")
+        except OSError as e:
+            print(f"Error: Cannot listen: {e}")
+            sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Avalon API Proxy - caching, coalescing proxy for the Avalon miner API',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Proxy three miners on local ports 14028, 14029 and 14030
+  %(prog)s --ips 192.168.1.100-102
+
+  # Then point any tool at the local port instead of the miner
+  avalon_miner_cli.py 127.0.0.1 --port 14028 summary
+
+  # Proxy from a config file
+  %(prog)s --config proxy.json
+
+Config file format (proxy.json):
+  {
+    "miners": [
+      "192.168.1.100-110",
+      {"ip": "192.168.1.120", "listen_host": "127.0.1.120", "listen_port": 4028}
+    ],
+    "listen_host": "127.0.0.1",
+    "base_port": 14028,
+    "port": 4028,
+    "ttl": {"summary": 2, "estats": 5, "lcd": 5, "pools": 5, "version": 60},
+    "timeout": 5,
+    "stats_interval": 60
+  }
+        """
+    )
+
+    parser.add_argument('--ips', nargs='+', metavar='IP',
+                       help='IP addresses of miners (can use ranges like 192.168.1.100-110)')
+    parser.add_argument('--config', '-c', metavar='FILE',
+                       help='Load configuration from JSON file')
+    parser.add_argument('--listen-host', metavar='HOST',
+                       help='Local address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--base-port', type=int, metavar='PORT',
+                       help='Local port of the first miner; the next ones count up (default: 14028)')
+    parser.add_argument('--port', '-p', type=int, metavar='PORT',
+                       help=f'API port of the miners (default: {DEFAULT_PORT})')
+    parser.add_argument('--ttl', type=float, metavar='SECONDS',
+                       help='Cache lifetime of summary, estats, lcd and pools '
+                            '(default: 2 for summary, 5 for the others; version: 60)')
+    parser.add_argument('--timeout', type=float, metavar='SECONDS',
+                       help=f'Timeout of a request to a miner (default: {DEFAULT_TIMEOUT})')
+    parser.add_argument('--stats-interval', type=float, metavar='SECONDS',
+                       help='Seconds between stats lines on stderr, 0 to disable (default: 60)')
+
+    args = parser.parse_args()
+
+    entries = []
+    listen_host = '127.0.0.1'
+    base_port = 14028
+    port = DEFAULT_PORT
+    ttls = dict(DEFAULT_TTLS)
+    timeout = DEFAULT_TIMEOUT
+    stats_interval = 60
+
+    if args.config:
+        try:
+            config = load_config_file(args.config)
+        except AvalonConfigError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if 'miners' not in config:
+            print("Error: Configuration file must contain 'miners' array")
+            sys.exit(1)
+        entries = list(config['miners'])
+        listen_host = config.get('listen_host', listen_host)
+        base_port = config.get('base_port', base_port)
+        port = config.get('port', port)
+        ttls.update(config.get('ttl', {}))
+        timeout = config.get('timeout', timeout)
+        stats_interval = config.get('stats_interval', stats_interval)
+    elif args.ips:
+        entries = list(args.ips)
+    else:
+        print("Error: Must specify either --ips or --config")
+        parser.print_help()
+        sys.exit(1)
+
+    # Command line overrides the config file
+    if args.listen_host is not None:
+        listen_host = args.listen_host
+    if args.base_port is not None:
+        base_port = args.base_port
+    if args.port is not None:
+        port = args.port
+    if args.ttl is not None:
+        for command in ttls:
+            if command != 'version':
+                ttls[command] = args.ttl
+    if args.timeout is not None:
+        timeout = args.timeout
+    if args.stats_interval is not None:
+        stats_interval = args.stats_interval
+
+    miners = parse_miners(entries, listen_host, base_port)
+    if not miners:
+        print("Error: No valid miner IP addresses specified")
+        sys.exit(1)
+
+    invalid_ips = [ip for ip, _, _ in miners if not validate_ip(ip)]
+    if invalid_ips:
+        print(f"Error: Invalid IP addresses: {', '.join(invalid_ips)}")
+        sys.exit(1)
+
+    if len({ip for ip, _, _ in miners}) != len(miners):
+        print("Error: A miner is listed more than once")
+        sys.exit(1)
+
+    listeners = [(host, listen_port) for _, host, listen_port in miners]
+    if len(set(listeners)) != len(listeners):
+        print("Error: Two miners share a listen address")
+        sys.exit(1)
+
+    if any(not 0 < listen_port < 65536 for _, listen_port in listeners):
+        print("Error: Listen ports must be between 1 and 65535")
+        sys.exit(1)
+
+    unknown = set(ttls) - set(DEFAULT_TTLS)
+    if unknown:
+        print(f"Error: ttl only applies to {', '.join(DEFAULT_TTLS)} (got {', '.join(sorted(unknown))})")
+        sys.exit(1)
+    if any(ttl < 0 for ttl in ttls.values()):
+        print("Error: ttl must not be negative")
+        sys.exit(1)
+
+    if timeout <= 0:
+        print("Error: timeout must be positive")
+        sys.exit(1)
+
+    ProxyServer(miners, port, ttls, timeout, stats_interval).run()
+
+
+if __name__ == '__main__':
+    main()
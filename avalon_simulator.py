@@ -0,0 +1,739 @@
+#!/usr/bin/env python3
+"""
+Avalon API Simulator
+
+Asyncio TCP server that emulates many Avalon miners at once, for load and
+regression testing of the tools without real hardware. Every simulated
+miner listens on its own address and answers ``version``, ``summary``,
+``estats``, ``lcd``, ``pools`` (alone or ``+``-joined) and ``ascset``
+with Nano 3S or Avalon Q payloads shaped like the real firmware's,
+including the ``MM ID0`` custom data string and the trailing null byte.
+
+Hash rate and temperatures drift around their nominal values, share and
+hardware error counters grow at the rate the hash rate implies, and
+faults can be injected per miner: slow replies, hangs, truncated JSON,
+connection resets and reboots (the miner stops listening, so connections
+are refused, then comes back with its counters and uptime reset).
+
+Copyright (c) 2025
+SPDX-License-Identifier: Apache-2.0
+"""
+
+import sys
+import json
+import math
+import time
+import random
+import socket
+import struct
+import asyncio
+import argparse
+import ipaddress
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+from avalon_core import DEFAULT_PORT
+from avalon_core.rates import HASHES_PER_DIFF1
+
+
+# Static identity and nominal operating point of each model (Standard mode)
+MODEL_PROFILES: Dict[str, Dict[str, Any]] = {
+    'nano3s': {
+        'model': 'Nano3s', 'prod': 'Avalon Nano3s', 'hwtype': 'N_MM1v1_X1', 'swtype': 'MM319',
+        'firmware': '25021401_56abae7', 'mm_key': 'MM ID0', 'colon': False,
+        'ghs': 6564.72, 'power': 140, 'fans': 1, 'fan_rpm': 2340, 'chips': 10,
+        'targets': (80, 85, 90), 'spread': 8, 'hbi': 52, 'hbo': 71, 'itemp': -273,
+        'voltage': 300, 'sf': (500, 525, 550, 575), 'pool_diff': 40000.0, 'net': 'eth',
+    },
+    'q': {
+        'model': 'Q', 'prod': 'Avalon Q', 'hwtype': 'Q_MM1v1_X1', 'swtype': 'MM319',
+        'firmware': '25052801_7a1c8e1', 'mm_key': 'MM ID0:Summary', 'colon': True,
+        'ghs': 88970.12, 'power': 1674, 'fans': 2, 'fan_rpm': 3100, 'chips': 160,
+        'targets': (65, 80, 85), 'spread': 8, 'hbi': 41, 'hbo': 63, 'itemp': 24,
+        'voltage': 294, 'sf': (500, 525, 550, 575), 'pool_diff': 500000.0, 'net': 'wifi',
+    },
+}
+
+# Hash rate and power relative to Standard, per work mode (Eco, Standard, Super)
+WORK_MODE_SCALE = ((0.8, 0.7), (1.0, 1.0), (1.15, 1.3))
+
+# Cores per chip counted in PLL0, and their share at each SF0 frequency
+# level in a steady state (about what an Avalon Q reports)
+CORES_PER_CHIP = 24
+PLL_SHARES = (0.18, 0.52, 0.08, 0.22)
+
+POOL_URLS = (
+    'stratum+tcp://fr1.letsmine.it:3339',
+    'stratum+tcp://de1.letsmine.it:3339',
+    'stratum+tcp://solo.ckpool.org:3333',
+)
+
+CGMINER = 'cgminer 4.11.1'
+
+
+@dataclass
+class MinerOptions:
+    """Behaviour of a group of simulated miners"""
+    model: str = 'nano3s'
+    # Reply delay in seconds, and random extra delay up to jitter
+    latency: float = 0.005
+    jitter: float = 0.005
+    # Relative hash rate wander (0.03 = +/-3 %) and temperature wander in °C
+    hashrate_drift: float = 0.03
+    temp_drift: float = 2.0
+    # Entries in the per-chip arrays of MM ID0 (None: the model's own);
+    # the main lever on estats size
+    chips: Optional[int] = None
+    # Whether "cmd1+cmd2" requests are accepted
+    batch: bool = True
+    # Start in standby (SoftOFF)
+    standby: bool = False
+    # Fault injection: probability per request of a hang, a truncated
+    # reply or a reset connection (accepted, then closed with an RST; a
+    # real refusal only happens while rebooting), and mean reboots per
+    # miner per hour
+    hang_rate: float = 0.0
+    truncate_rate: float = 0.0
+    reset_rate: float = 0.0
+    reboots_per_hour: float = 0.0
+    # Seconds a hung request is held open, and a reboot stays offline
+    hang_time: float = 30.0
+    reboot_time: float = 20.0
+
+
+def _status(code: int, msg: str, ok: bool = True) -> List[Dict[str, Any]]:
+    return [{'STATUS': 'S' if ok else 'E', 'When': int(time.time()), 'Code': code,
+             'Msg': msg, 'Description': CGMINER}]
+
+
+def _ou_step(x: float, dt: float, sigma: float, theta: float = 1 / 300) -> float:
+    """Mean-reverting random walk (Ornstein-Uhlenbeck) around 0"""
+    decay = math.exp(-theta * dt)
+    return x * decay + sigma * math.sqrt(1 - decay * decay) * random.gauss(0, 1)
+
+
+class SimulatedMiner:
+    """One emulated miner: state that evolves over time, and its API server"""
+
+    def __init__(self, index: int, host: str, port: int, options: MinerOptions):
+        self.index = index
+        self.host = host
+        self.port = port
+        self.options = options
+        self.profile = MODEL_PROFILES[options.model]
+        self.chips = options.chips if options.chips is not None else self.profile['chips']
+        self.dna = f"0201{index:08x}{random.getrandbits(16):04x}"
+        self.mac = f"e0e1a9{random.getrandbits(24):06x}"
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.online = False
+
+        self.work_mode = 1
+        self.target_temp = self.profile['targets'][1]
+        self.fan_pct = -1  # Auto
+        self.soft_off = options.standby
+        self.pool = 0
+        # Requests served and faults injected
+        self.requests = 0
+        self.faults = 0
+        self.reboots = 0
+
+        # Pick up as if the miner had been running for a while
+        self._boot(elapsed=random.uniform(3600, 10 * 86400))
+
+    # State
+
+    def _boot(self, elapsed: float = 0.0):
+        now = time.time()
+        self.boot_time = now - elapsed
+        self.last_advance = now
+        self.hash_offset = 0.0
+        self.temp_offset = 0.0
+        self.hashes = self.nominal_hashrate() * elapsed
+        shares = self.share_rate() * elapsed
+        self.accepted = int(shares)
+        self.rejected = int(shares * 0.001)
+        self.hardware_errors = int(elapsed / 3600 * random.uniform(0, 2))
+        self.difficulty_accepted = self.accepted * self.profile['pool_diff']
+        self.difficulty_rejected = self.rejected * self.profile['pool_diff']
+        self.best_share = int(self.profile['pool_diff'] * random.uniform(10, 10000)) if elapsed else 0
+        self.last_share_time = int(now)
+        self._share_credit = 0.0
+
+    def nominal_hashrate(self) -> float:
+        """Hash rate in H/s for the current work mode, before drift"""
+        if self.soft_off:
+            return 0.0
+        return self.profile['ghs'] * 1e9 * WORK_MODE_SCALE[self.work_mode][0]
+
+    def share_rate(self) -> float:
+        """Accepted shares per second at the nominal hash rate"""
+        return self.nominal_hashrate() / (self.profile['pool_diff'] * HASHES_PER_DIFF1)
+
+    def advance(self, now: Optional[float] = None):
+        """Move the drift, counters and uptime forward to ``now``"""
+        now = time.time() if now is None else now
+        dt = now - self.last_advance
+        if dt <= 0:
+            return
+        self.last_advance = now
+        self.hash_offset = _ou_step(self.hash_offset, dt, self.options.hashrate_drift)
+        self.temp_offset = _ou_step(self.temp_offset, dt, self.options.temp_drift)
+        self.hashes += self.hashrate() * dt
+
+        # Shares arrive at the rate the hash rate implies
+        self._share_credit += self.hashrate() / (self.profile['pool_diff'] * HASHES_PER_DIFF1) * dt
+        shares = int(self._share_credit)
+        if shares:
+            self._share_credit -= shares
+            rejected = sum(1 for _ in range(shares) if random.random() < 0.001)
+            self.accepted += shares - rejected
+            self.rejected += rejected
+            self.difficulty_accepted += (shares - rejected) * self.profile['pool_diff']
+            self.difficulty_rejected += rejected * self.profile['pool_diff']
+            self.last_share_time = int(now)
+            self.best_share = max(self.best_share, int(self.profile['pool_diff'] / random.random()))
+        if random.random() < dt / 3600:
+            self.hardware_errors += 1
+
+    def hashrate(self) -> float:
+        return max(0.0, self.nominal_hashrate() * (1 + self.hash_offset))
+
+    def elapsed(self) -> int:
+        return int(time.time() - self.boot_time)
+
+    def temps(self) -> Tuple[int, int]:
+        """Max and average ASIC temperature"""
+        if self.soft_off:
+            return 35, 33
+        t_max = self.target_temp + 1 + self.temp_offset
+        return round(t_max), round(t_max - self.profile['spread'])
+
+    def power(self) -> int:
+        if self.soft_off:
+            return 5
+        return round(self.profile['power'] * WORK_MODE_SCALE[self.work_mode][1] * (1 + self.hash_offset / 4))
+
+    def clocks(self) -> Tuple[List[int], List[int], float]:
+        """SF0 frequency levels (MHz), PLL0 cores at each level and their mean frequency"""
+        scale = WORK_MODE_SCALE[self.work_mode][0]
+        levels = [round(f * scale) for f in self.profile['sf']]
+        if self.soft_off:
+            return levels, [0] * len(levels), 0.0
+        cores = self.chips * CORES_PER_CHIP
+        # Hash rate drift moves cores between the lowest and highest level
+        shift = max(-PLL_SHARES[-1], min(PLL_SHARES[0], self.hash_offset))
+        shares = list(PLL_SHARES)
+        shares[0] -= shift
+        shares[-1] += shift
+        counts = [round(cores * share) for share in shares]
+        counts[1] += cores - sum(counts)  # Rounding
+        mean = sum(level * count for level, count in zip(levels, counts)) / cores
+        return levels, counts, round(mean, 2)
+
+    # Payloads
+
+    def version(self) -> Dict[str, Any]:
+        p = self.profile
+        return {'STATUS': _status(22, 'CGMiner versions'), 'VERSION': [{
+            'CGMiner': '4.11.1', 'API': '3.7', 'PROD': p['prod'], 'MODEL': p['model'],
+            'HWTYPE': p['hwtype'], 'SWTYPE': p['swtype'], 'LVERSION': p['firmware'],
+            'BVERSION': p['firmware'], 'CGVERSION': p['firmware'], 'DNA': self.dna,
+            'MAC': self.mac, 'UPAPI': '2'}], 'id': 1}
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = max(1, self.elapsed())
+        mhs = self.hashrate() / 1e6
+        shares = self.accepted + self.rejected
+        diff_total = self.difficulty_accepted + self.difficulty_rejected
+        return {'STATUS': _status(11, 'Summary'), 'SUMMARY': [{
+            'Elapsed': elapsed,
+            'MHS av': round(self.hashes / elapsed / 1e6, 2),
+            'MHS 5s': round(mhs * random.uniform(0.85, 1.15), 2),
+            'MHS 1m': round(mhs * random.uniform(0.95, 1.05), 2),
+            'MHS 5m': round(mhs * random.uniform(0.98, 1.02), 2),
+            'MHS 15m': round(mhs * random.uniform(0.99, 1.01), 2),
+            'Found Blocks': 0,
+            'Accepted': self.accepted,
+            'Rejected': self.rejected,
+            'Hardware Errors': self.hardware_errors,
+            'Utility': round(self.accepted / (elapsed / 60), 2),
+            'Stale': self.rejected // 4,
+            'Best Share': self.best_share,
+            'Device Rejected%': round(self.rejected / shares * 100, 4) if shares else 0.0,
+            'Pool Rejected%': round(self.difficulty_rejected / diff_total * 100, 4) if diff_total else 0.0,
+            'Pool Stale%': 0.0,
+            'Difficulty Accepted': self.difficulty_accepted,
+            'Difficulty Rejected': self.difficulty_rejected,
+            'Last getwork': int(time.time()),
+        }], 'id': 1}
+
+    def mm_id0(self) -> str:
+        """The custom data string, in the model's Key[value] or Key:[value] form"""
+        p = self.profile
+        t_max, t_avg = self.temps()
+        ghs = self.hashrate() / 1e9
+        elapsed = max(1, self.elapsed())
+        fan_rpm = round(p['fan_rpm'] * (1 + self.temp_offset / 20)) if not self.soft_off else 0
+        fan_pct = self.fan_pct if self.fan_pct >= 0 else min(100, max(25, round(47 + self.temp_offset * 3)))
+        chip_temps = ' '.join(str(round(t_avg + random.uniform(-6, 6))) for _ in range(self.chips))
+        chip_volts = ' '.join(str(p['voltage'] + random.randint(-8, 8)) for _ in range(self.chips))
+        chip_work = ' '.join(str(random.randint(20000, 24000)) for _ in range(self.chips))
+        levels, plls, freq = self.clocks()
+        values = (
+            ('Ver', f"{p['model']}-{p['firmware']}"), ('LVer', p['firmware']),
+            ('BVer', p['firmware']), ('HVer', p['hwtype']), ('DNA', self.dna), ('STATE', 0),
+            ('MEMFREE', 1180928), ('NETFAIL', '0 0 0 0 0 0 0 0'), ('SSID', ''), ('RSSI', 0),
+            ('NET_DEVICE', p['net']), ('SYSTEMSTATU', 'Work: In Work, Hash Board: 1 '),
+            ('Elapsed', elapsed), ('BOOTBY', '0x04.00000000'), ('LW', int(self.hashes / 2 ** 32 / 1000)),
+            ('MH', 0), ('DHW', 0), ('HW', self.hardware_errors), ('DH', '1.328%'),
+            ('ITemp', p['itemp']), ('HBITemp', round(p['hbi'] + self.temp_offset)),
+            ('HBOTemp', round(p['hbo'] + self.temp_offset)), ('TMax', t_max), ('TAvg', t_avg),
+            ('TarT', self.target_temp),
+            ('Fan1', fan_rpm), ('Fan2', fan_rpm if p['fans'] > 1 else 0),
+            ('Fan3', fan_rpm if p['fans'] > 2 else 0), ('Fan4', fan_rpm if p['fans'] > 3 else 0),
+            ('FanR', f'{fan_pct}%'), ('SoftOFF', 1 if self.soft_off else 0), ('ECHU', 0), ('ECMM', 0),
+            ('PLL0', ' '.join(map(str, plls))), ('SF0', ' '.join(map(str, levels))), ('PVT_T0', chip_temps),
+            ('PVT_V0', chip_volts), ('MW0', chip_work), ('CRC', 0), ('COMCRC', 0), ('LIP', 0),
+            ('MTmax', t_max), ('MTavg', t_avg), ('TA', self.chips), ('Core', 'A3197S'), ('PING', 18),
+            ('WORKMODE', self.work_mode), ('WORKLEVEL', 0), ('MPO', self.power()), ('CALIALL', 7),
+            ('ADJ', 1), ('Nonce Mask', 25), ('GHSspd', round(ghs * random.uniform(0.97, 1.03), 2)),
+            ('DHspd', '1.328%'), ('GHSmm', round(ghs * 1.01, 2)),
+            ('GHSavg', round(self.hashes / elapsed / 1e9, 2)), ('WU', round(ghs * 14, 2)),
+            ('Freq', freq), ('MGHS', round(ghs, 2)), ('PS', self.ps()),
+        )
+        form = '{}:[{}]' if p['colon'] else '{}[{}]'
+        return ' '.join(form.format(key, value) for key, value in values)
+
+    def ps(self) -> str:
+        """PSU status array: error, reserved, voltage, current, reserved, commanded, power"""
+        power = self.power()
+        return f"0 1210 2214 {power * 100 // 2214} 1395 2214 {power}"
+
+    def estats(self) -> Dict[str, Any]:
+        elapsed = max(1, self.elapsed())
+        return {'STATUS': _status(70, 'CGMiner stats'), 'STATS': [{
+            'STATS': 0, 'ID': 'AVALON0', 'Elapsed': elapsed, 'Calls': 0, 'Wait': 0.0,
+            'Max': 0.0, 'Min': 99999999.0, self.profile['mm_key']: self.mm_id0(),
+            'MM Count': 1, 'Smart Speed': 1, 'Connecter': 'AUC', 'AUC VER': 'AUC-20151208',
+            'Nonce Mask': 25,
+        }, {
+            'STATS': 1, 'ID': 'POOL0', 'Elapsed': elapsed, 'Calls': 0, 'Wait': 0.0,
+            'Max': 0.0, 'Min': 99999999.0, 'Work Diff': self.profile['pool_diff'],
+            'Min Diff': 1.0, 'Max Diff': self.profile['pool_diff'],
+            'Times Sent': self.accepted + self.rejected + 20,
+        }], 'id': 1}
+
+    def lcd(self) -> Dict[str, Any]:
+        ghs = self.hashrate() / 1e9
+        elapsed = max(1, self.elapsed())
+        return {'STATUS': _status(125, 'LCD'), 'LCD': [{
+            'Elapsed': elapsed, 'GHS av': round(self.hashes / elapsed / 1e9, 2),
+            'GHS 5m': round(ghs, 2), 'GHS 5s': round(ghs * random.uniform(0.9, 1.1), 2),
+            'Temperature': 0.0, 'Last Share Difficulty': self.profile['pool_diff'],
+            'Last Share Time': self.last_share_time, 'Best Share': self.best_share,
+            'Last Valid Work': self.last_share_time, 'Found Blocks': 0,
+            'Current Pool': POOL_URLS[self.pool],
+            'User': f"sim.{self.profile['model']}-{self.index:05d}",
+        }], 'id': 1}
+
+    def pools(self) -> Dict[str, Any]:
+        entries = []
+        for i, url in enumerate(POOL_URLS):
+            active = i == self.pool
+            entries.append({
+                'POOL': i, 'URL': url, 'Status': 'Alive', 'Priority': 0 if active else i + 1,
+                'Quota': 1, 'Long Poll': 'N', 'Getworks': self.accepted // 3 if active else 0,
+                'Accepted': self.accepted if active else 0, 'Rejected': self.rejected if active else 0,
+                'Works': self.accepted * 4 if active else 0, 'Discarded': 0, 'Stale': 0,
+                'Get Failures': 0, 'Remote Failures': 0,
+                'User': f"sim.{self.profile['model']}-{self.index:05d}",
+                'Last Share Time': self.last_share_time if active else 0,
+                'Diff1 Shares': 0, 'Proxy Type': '', 'Proxy': '',
+                'Difficulty Accepted': self.difficulty_accepted if active else 0.0,
+                'Difficulty Rejected': self.difficulty_rejected if active else 0.0,
+                'Difficulty Stale': 0.0, 'Last Share Difficulty': self.profile['pool_diff'] if active else 0.0,
+                'Work Difficulty': self.profile['pool_diff'], 'Has Stratum': True,
+                'Stratum Active': active, 'Stratum URL': url.split('://')[-1].split(':')[0] if active else '',
+                'Stratum Difficulty': self.profile['pool_diff'], 'Has Vmask': True, 'Has GBT': False,
+                'Best Share': self.best_share if active else 0, 'Pool Rejected%': 0.0,
+                'Pool Stale%': 0.0, 'Bad Work': 0, 'Current Block Height': 925000,
+                'Current Block Version': 536870912,
+            })
+        return {'STATUS': _status(7, f'{len(entries)} Pool(s)'), 'POOLS': entries, 'id': 1}
+
+    def ascset(self, parameter: str) -> Dict[str, Any]:
+        """Apply a setting; the reply mimics cgminer's ASC set messages"""
+        parts = parameter.split(',')
+        option = parts[1] if len(parts) > 1 else ''
+        values = parts[2:]
+        try:
+            if option == 'fan-spd' and values:
+                self.fan_pct = -1 if values[0] == '-1' else int(values[0].split('..')[-1])
+            elif option == 'workmode' and len(values) >= 2 and values[0] == 'set':
+                mode = int(values[1])
+                if mode not in (0, 1, 2):
+                    raise ValueError(mode)
+                self.work_mode = mode
+                self.target_temp = self.profile['targets'][mode]
+            elif option == 'target-temp' and values:
+                self.target_temp = int(values[0])
+            elif option == 'voltage' and not values:
+                return {'STATUS': _status(119, f'ASC 0 set info: PS[{self.ps()} 1150 1300]'), 'id': 1}
+            elif option == 'voltage':
+                int(values[0])
+            elif option == 'reboot':
+                delay = int(values[0]) if values else 0
+                asyncio.get_running_loop().call_later(delay, self.reboot)
+            elif option == 'filter-clean':
+                pass
+            else:
+                return {'STATUS': _status(120, f'ASC 0 set failed: unknown option {option}', ok=False),
+                        'id': 1}
+        except ValueError:
+            return {'STATUS': _status(120, 'ASC 0 set failed: invalid value', ok=False), 'id': 1}
+        return {'STATUS': _status(119, 'ASC 0 set OK'), 'id': 1}
+
+    def switch_pool(self, parameter: str) -> Dict[str, Any]:
+        try:
+            pool = int(parameter)
+        except ValueError:
+            pool = -1
+        if not 0 <= pool < len(POOL_URLS):
+            return {'STATUS': _status(53, f'Invalid pool id {parameter}', ok=False), 'id': 1}
+        self.pool = pool
+        return {'STATUS': _status(27, f'Switching to pool {pool}:\'{POOL_URLS[pool]}\''), 'id': 1}
+
+    def reply(self, command: str, parameter: str = '') -> Dict[str, Any]:
+        """Response to one request, as the firmware would build it"""
+        self.advance()
+        readers = {'version': self.version, 'summary': self.summary, 'estats': self.estats,
+                   'lcd': self.lcd, 'pools': self.pools}
+        if '+' in command:
+            commands = command.split('+')
+            if not self.options.batch or not all(c in readers for c in commands):
+                return {'STATUS': _status(14, 'Invalid command', ok=False), 'id': 1}
+            response: Dict[str, Any] = {c: [readers[c]()] for c in commands}
+            response['id'] = 1
+            return response
+        if command in readers:
+            return readers[command]()
+        if command == 'ascset':
+            return self.ascset(parameter)
+        if command == 'switchpool':
+            return self.switch_pool(parameter)
+        if command in ('setpool', 'enablepool', 'disablepool', 'poolpriority'):
+            return {'STATUS': _status(48, f'{command} OK'), 'id': 1}
+        return {'STATUS': _status(14, 'Invalid command', ok=False), 'id': 1}
+
+    # Server
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.online = True
+
+    def reboot(self):
+        """Stop answering (connections are refused), come back reset after reboot_time"""
+        if not self.online:
+            return
+        self.reboots += 1
+        self.online = False
+        if self.server is not None:
+            self.server.close()
+        asyncio.ensure_future(self._come_back())
+
+    async def _come_back(self):
+        await asyncio.sleep(self.options.reboot_time)
+        self._boot()
+        try:
+            await self.start()
+        except OSError:
+            pass
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        options = self.options
+        self.requests += 1
+        try:
+            if random.random() < options.reset_rate:
+                # Reset the connection before reading anything: zero linger
+                # makes the close an RST, so the client sees ECONNRESET
+                self.faults += 1
+                sock = writer.get_extra_info('socket')
+                if sock is not None:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+                writer.transport.abort()
+                return
+
+            data = await asyncio.wait_for(reader.read(4096), timeout=5)
+            try:
+                request = json.loads(data.decode('utf-8').rstrip('\x00').strip())
+                command = str(request.get('command', ''))
+                parameter = str(request.get('parameter', ''))
+            except (ValueError, UnicodeDecodeError, AttributeError):
+                command, parameter = '', ''
+            payload = json.dumps(self.reply(command, parameter)).encode('utf-8') + b'\x00'
+
+            if random.random() < options.hang_rate:
+                # Accept the request and never answer
+                self.faults += 1
+                await asyncio.sleep(options.hang_time)
+                return
+
+            await asyncio.sleep(options.latency + random.random() * options.jitter)
+            if random.random() < options.truncate_rate:
+                # Cut the JSON short and close without a terminator
+                self.faults += 1
+                writer.write(payload[:len(payload) // 2])
+            else:
+                writer.write(payload)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class Simulator:
+    """Many simulated miners on one event loop"""
+
+    def __init__(self, miners: List[SimulatedMiner]):
+        self.miners = miners
+
+    async def start(self):
+        for miner in self.miners:
+            await miner.start()
+
+    async def random_reboots(self):
+        """Reboot miners at random at their configured mean rate"""
+        while True:
+            await asyncio.sleep(1)
+            for miner in self.miners:
+                rate = miner.options.reboots_per_hour
+                if rate and miner.online and random.random() < rate / 3600:
+                    miner.reboot()
+
+    async def run(self, stats_interval: float = 0):
+        await self.start()
+        print(f"ready: {len(self.miners)} miners", flush=True)
+        reboots = asyncio.ensure_future(self.random_reboots())
+        try:
+            while True:
+                await asyncio.sleep(stats_interval or 3600)
+                if stats_interval:
+                    self.print_stats()
+        finally:
+            reboots.cancel()
+
+    def print_stats(self):
+        requests = sum(m.requests for m in self.miners)
+        faults = sum(m.faults for m in self.miners)
+        reboots = sum(m.reboots for m in self.miners)
+        offline = sum(1 for m in self.miners if not m.online)
+        print(f"{requests} requests, {faults} faults injected, {reboots} reboots, "
+              f"{offline} offline", file=sys.stderr, flush=True)
+
+
+def addresses(count: int, host: str, port: int, layout: str) -> List[Tuple[str, int]]:
+    """
+    Listen addresses of ``count`` miners
+
+    ``ports``: one host, consecutive ports. ``aliases``: consecutive
+    addresses from ``host`` (e.g. 127.1.0.1, 127.1.0.2, ...) on one port,
+    which is what the fleet monitor expects. Every 127.x.x.x address is
+    local on Linux; other systems need the aliases configured.
+    """
+    if layout == 'ports':
+        return [(host, port + i) for i in range(count)]
+    start = ipaddress.ip_address(host)
+    return [(str(start + i), port) for i in range(count)]
+
+
+def build_miners(groups: List[Dict[str, Any]], host: str, port: int,
+                 layout: str) -> List[SimulatedMiner]:
+    """Create the miners of every group, numbered across groups"""
+    known = {f.name for f in fields(MinerOptions)}
+    specs = []
+    for group in groups:
+        unknown = set(group) - known - {'count'}
+        if unknown:
+            raise ValueError(f"Unknown miner option(s): {', '.join(sorted(unknown))}")
+        options = MinerOptions(**{k: v for k, v in group.items() if k != 'count'})
+        if options.model not in MODEL_PROFILES:
+            raise ValueError(f"Unknown model '{options.model}' "
+                             f"(expected one of {', '.join(MODEL_PROFILES)})")
+        specs.extend([options] * int(group.get('count', 1)))
+
+    return [SimulatedMiner(i, h, p, options)
+            for i, ((h, p), options) in enumerate(zip(addresses(len(specs), host, port, layout), specs))]
+
+
+def raise_fd_limit(needed: int):
+    """Raise the open file limit towards ``needed`` (one socket per miner plus clients)"""
+    try:
+        import resource
+    except ImportError:
+        return  # Windows
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+
+
+def fleet_ip_ranges(miners: List[SimulatedMiner]) -> List[str]:
+    """Compact 'a.b.c.x-y' ranges for a fleet config (aliases layout)"""
+    ranges: List[str] = []
+    run: List[str] = []
+    for miner in miners:
+        if run and (miner.host.rsplit('.', 1)[0] != run[0].rsplit('.', 1)[0]
+                    or int(miner.host.rsplit('.', 1)[1]) != int(run[-1].rsplit('.', 1)[1]) + 1):
+            ranges.append(run[0] if len(run) == 1 else f"{run[0]}-{run[-1].rsplit('.', 1)[1]}")
+            run = []
+        run.append(miner.host)
+    if run:
+        ranges.append(run[0] if len(run) == 1 else f"{run[0]}-{run[-1].rsplit('.', 1)[1]}")
+    return ranges
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Avalon API Simulator - emulate many Avalon miners for load and regression testing',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # 1000 Nano 3S on 127.1.0.1 .. 127.1.3.232, port 4028
+  %(prog)s --count 1000
+
+  # ... and write a fleet monitor config for them
+  %(prog)s --count 1000 --fleet-config sim_fleet.json
+  avalon_fleet.py --config sim_fleet.json
+
+  # 200 Avalon Q on consecutive ports with faults
+  %(prog)s --count 200 --model q --layout ports --host 127.0.0.1 --port 14028 \\
+      --hang-rate 0.01 --truncate-rate 0.01 --reset-rate 0.01 --reboots-per-hour 0.5
+
+Config file format (groups of miners; every MinerOptions field can be set):
+  {
+    "layout": "aliases", "host": "127.1.0.1", "port": 4028, "seed": 1,
+    "groups": [
+      {"count": 4000, "model": "nano3s"},
+      {"count": 900, "model": "q", "latency": 0.05, "jitter": 0.1},
+      {"count": 100, "model": "q", "hang_rate": 0.05, "batch": false}
+    ]
+  }
+        """
+    )
+    parser.add_argument('--config', '-c', metavar='FILE',
+                        help='Load miner groups from a JSON file')
+    parser.add_argument('--count', '-n', type=int, default=100,
+                        help='Number of miners (default: 100)')
+    parser.add_argument('--model', choices=tuple(MODEL_PROFILES), default='nano3s',
+                        help='Model to emulate (default: nano3s)')
+    parser.add_argument('--layout', choices=('aliases', 'ports'),
+                        help='One address per miner on one port, or one port per miner (default: aliases)')
+    parser.add_argument('--host', metavar='IP',
+                        help='First address (aliases) or the address (ports) (default: 127.1.0.1)')
+    parser.add_argument('--port', '-p', type=int, metavar='PORT',
+                        help=f'Port (aliases) or first port (ports) (default: {DEFAULT_PORT})')
+    parser.add_argument('--latency', type=float, default=0.005, metavar='SECONDS',
+                        help='Reply delay (default: 0.005)')
+    parser.add_argument('--jitter', type=float, default=0.005, metavar='SECONDS',
+                        help='Random extra reply delay up to this (default: 0.005)')
+    parser.add_argument('--chips', type=int, metavar='N',
+                        help='Entries in the per-chip arrays, i.e. estats size (default: per model)')
+    parser.add_argument('--hashrate-drift', type=float, default=0.03, metavar='FRACTION',
+                        help='Relative hash rate wander (default: 0.03)')
+    parser.add_argument('--temp-drift', type=float, default=2.0, metavar='DEGREES',
+                        help='Temperature wander in °C (default: 2)')
+    parser.add_argument('--no-batch', action='store_true',
+                        help='Reject "cmd1+cmd2" requests like older firmware')
+    parser.add_argument('--standby', action='store_true',
+                        help='Start the miners in standby')
+    parser.add_argument('--hang-rate', type=float, default=0.0, metavar='P',
+                        help='Probability that a request is never answered')
+    parser.add_argument('--truncate-rate', type=float, default=0.0, metavar='P',
+                        help='Probability that a reply is cut short')
+    parser.add_argument('--reset-rate', type=float, default=0.0, metavar='P',
+                        help='Probability that a connection is accepted, then reset at once')
+    parser.add_argument('--reboots-per-hour', type=float, default=0.0, metavar='RATE',
+                        help='Mean random reboots per miner per hour')
+    parser.add_argument('--reboot-time', type=float, default=20.0, metavar='SECONDS',
+                        help='How long a rebooting miner refuses connections (default: 20)')
+    parser.add_argument('--seed', type=int,
+                        help='Random seed for reproducible runs')
+    parser.add_argument('--fleet-config', metavar='FILE',
+                        help='Write a fleet monitor config for the simulated miners (aliases layout)')
+    parser.add_argument('--stats-interval', type=float, default=0, metavar='SECONDS',
+                        help='Print request and fault counts to stderr this often (default: off)')
+
+    args = parser.parse_args()
+
+    layout, host, port, seed = 'aliases', None, DEFAULT_PORT, None
+    if args.config:
+        try:
+            with open(args.config, 'r') as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error: Cannot load configuration file: {e}")
+            sys.exit(1)
+        groups = config.get('groups', [])
+        layout = config.get('layout', layout)
+        host = config.get('host', host)
+        port = config.get('port', port)
+        seed = config.get('seed', seed)
+    else:
+        groups = [{
+            'count': args.count, 'model': args.model, 'latency': args.latency,
+            'jitter': args.jitter, 'chips': args.chips, 'hashrate_drift': args.hashrate_drift,
+            'temp_drift': args.temp_drift, 'batch': not args.no_batch, 'standby': args.standby,
+            'hang_rate': args.hang_rate, 'truncate_rate': args.truncate_rate,
+            'reset_rate': args.reset_rate, 'reboots_per_hour': args.reboots_per_hour,
+            'reboot_time': args.reboot_time,
+        }]
+
+    # Command line overrides the config file
+    if args.layout is not None:
+        layout = args.layout
+    if args.host is not None:
+        host = args.host
+    if args.port is not None:
+        port = args.port
+    if args.seed is not None:
+        seed = args.seed
+    if host is None:
+        host = '127.1.0.1' if layout == 'aliases' else '127.0.0.1'
+
+    if layout not in ('aliases', 'ports'):
+        print("Error: layout must be 'aliases' or 'ports'")
+        sys.exit(1)
+
+    random.seed(seed)
+    try:
+        miners = build_miners(groups, host, port, layout)
+    except (TypeError, ValueError) as e:
+        print(f"Error: Invalid miner settings: {e}")
+        sys.exit(1)
+    if not miners:
+        print("Error: No miners to simulate")
+        sys.exit(1)
+
+    if args.fleet_config:
+        if layout != 'aliases':
+            print("Error: --fleet-config needs the aliases layout (the fleet monitor uses one port)")
+            sys.exit(1)
+        with open(args.fleet_config, 'w') as f:
+            json.dump({'miners': fleet_ip_ranges(miners), 'port': port}, f, indent=2)
+
+    raise_fd_limit(len(miners) * 2 + 256)
+    first, last = miners[0], miners[-1]
+    print(f"Simulating {len(miners)} miners on {first.host}:{first.port} .. {last.host}:{last.port}",
+          flush=True)
+    try:
+        asyncio.run(Simulator(miners).run(args.stats_interval))
+    except KeyboardInterrupt:
+        print("\nShutting down simulator...")
+    except OSError as e:
+        print(f"Error: Cannot listen: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
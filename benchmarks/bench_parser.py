@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+MM ID0 Parser Micro-benchmark
+
+Compares the per-field regex lookup the tools used to do (one freshly
+built pattern and one scan of the whole string per field) with the
+single-pass tokenizer in avalon_core, on the estats payloads in
+benchmarks/payloads/.
+
+The bundled payloads are reconstructed from the fields and layouts each
+model reports, not captured from a miner. Capture a real reply with
+--capture (it is saved next to them as <label>_estats.json) and rerun
+to measure on it.
+
+Usage:
+    python3 benchmarks/bench_parser.py [--number N]
+    python3 benchmarks/bench_parser.py --capture 192.168.1.100 --label nano3s
+
+Copyright (c) 2025
+SPDX-License-Identifier: Apache-2.0
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from avalon_core import get_mm_id0, parse_mm_id0, parse_custom_data, send_command, DEFAULT_PORT  # noqa: E402
+
+
+PAYLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'payloads')
+
+# Fields read by the CLI estats command
+CLI_FIELDS = (
+    'Ver', 'LVer', 'DNA', 'Core', 'WORKMODE', 'Freq', 'GHSavg', 'GHSspd', 'WU',
+    'MPO', 'TMax', 'TAvg', 'TarT', 'OTemp', 'ITemp', 'Fan1', 'FanR', 'PS', 'HW',
+    'DH', 'DHspd', 'LW', 'SYSTEMSTATU', 'MEMFREE', 'PING', 'PLL0', 'PVT_T0',
+)
+
+
+def legacy_field(mm_id0: str, field_name: str):
+    """Per-field lookup as previously implemented"""
+    match = re.search(rf'{field_name}\[([^\]]+)\]', mm_id0)
+    return match.group(1) if match else None
+
+
+def tokenized_fields(mm_id0: str):
+    """Tokenize once, then look every field up in the dict"""
+    fields = parse_mm_id0(mm_id0)
+    return [fields.get(field) for field in CLI_FIELDS]
+
+
+def legacy_custom_data(estats_response):
+    """parse_custom_data as previously implemented"""
+    custom_data = {}
+    mm_id0 = get_mm_id0(estats_response)
+    if mm_id0:
+        for key, value in re.findall(r'(\w+)\[([^\]]+)\]', mm_id0):
+            try:
+                custom_data[key] = float(value) if '.' in value else int(value)
+            except ValueError:
+                custom_data[key] = value
+    return custom_data
+
+
+def bench(func, number: int) -> float:
+    """Best of five runs, in microseconds per call"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def capture(host: str, port: int, label: str) -> str:
+    """Save a miner's estats reply as a payload; returns the file written"""
+    path = os.path.join(PAYLOAD_DIR, f'{label}_estats.json')
+    with open(path, 'w') as f:
+        json.dump(send_command(host, port, 'estats'), f, indent=2)
+        f.write('\n')
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark MM ID0 parsing')
+    parser.add_argument('--number', '-n', type=int, default=5000,
+                        help='Calls per timing run (default: 5000)')
+    parser.add_argument('--capture', metavar='HOST',
+                        help='Save the estats reply of this miner as a payload, then benchmark')
+    parser.add_argument('--port', '-p', type=int, default=DEFAULT_PORT,
+                        help=f'API port for --capture (default: {DEFAULT_PORT})')
+    parser.add_argument('--label', default='captured',
+                        help='Payload name for --capture (default: captured)')
+    args = parser.parse_args()
+
+    if args.capture:
+        print(f"Saved {capture(args.capture, args.port, args.label)}")
+
+    print(f"{'Payload':<22} {'Case':<28} {'Before':>10} {'After':>10} {'Speedup':>8}")
+    print("-" * 82)
+
+    for name in sorted(os.listdir(PAYLOAD_DIR)):
+        if not name.endswith('.json'):
+            continue
+        with open(os.path.join(PAYLOAD_DIR, name), 'r') as f:
+            estats = json.load(f)
+        mm_id0 = get_mm_id0(estats)
+
+        cases = (
+            (f'{len(CLI_FIELDS)} CLI fields',
+             lambda: [legacy_field(mm_id0, field) for field in CLI_FIELDS],
+             lambda: tokenized_fields(mm_id0)),
+            ('parse_custom_data',
+             lambda: legacy_custom_data(estats),
+             lambda: parse_custom_data(estats)),
+        )
+
+        for label, before, after in cases:
+            t_before = bench(before, args.number)
+            t_after = bench(after, args.number)
+            print(f"{name[:-5]:<22} {label:<28} {t_before:>8.1f}us {t_after:>8.1f}us "
+                  f"{t_before / t_after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
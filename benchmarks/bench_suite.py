@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Fleet Monitor Benchmark Suite
+
+Measures, against simulated miners on loopback aliases
+(avalon_simulator.py, started in separate processes):
+
+- Polling: time of one full FleetMonitor cycle and miners/s, for the
+  first cycle (every section) and the following ones (summary only), at
+  each fleet size
+- Parsing: parse_custom_data and parse_estats_field calls/s on the
+  sample payloads in benchmarks/payloads/
+- Rendering: cost of one dashboard frame on a 50-row terminal (changed
+  rows only, and a full redraw) and of the full table written when the
+  output is not a terminal
+
+Results are written as JSON, one named metric per line of the report, so
+two runs (e.g. two versions) can be compared with --compare.
+
+Usage:
+    python3 benchmarks/bench_suite.py [--sizes 10 100 1000 10000] [--output FILE]
+    python3 benchmarks/bench_suite.py --compare OLD.json [--threshold 10]
+
+Copyright (c) 2025
+SPDX-License-Identifier: Apache-2.0
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import timeit
+import asyncio
+import argparse
+import platform
+import ipaddress
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from avalon_core import FrameRenderer, get_mm_id0, parse_custom_data, parse_estats_field  # noqa: E402
+from avalon_fleet import FleetMonitor  # noqa: E402
+
+
+PAYLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'payloads')
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+SIMULATOR = os.path.join(ROOT, 'avalon_simulator.py')
+
+# Bumped when metric names or units change, so old results are not compared
+FORMAT_VERSION = 1
+
+# Terminal height used for the interactive frame cases
+TERMINAL_LINES = 50
+
+
+class TerminalBuffer(io.StringIO):
+    """In-memory stream that passes for a terminal, so frames are differential"""
+
+    def isatty(self) -> bool:
+        return True
+
+
+def metric(name: str, value: float, unit: str, better: str, **extra: Any) -> Dict[str, Any]:
+    """One result; ``better`` is 'higher' or 'lower'"""
+    result = {'name': name, 'value': round(value, 6), 'unit': unit, 'better': better}
+    result.update(extra)
+    return result
+
+
+def per_call(func: Callable[[], Any], repeat: int = 5) -> float:
+    """Best of ``repeat`` runs, in seconds per call (run count sized like timeit's CLI)"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+# Simulated miners
+
+def start_simulators(count: int, host: str, port: int, processes: int,
+                     latency: float, timeout: float = 120) -> List[subprocess.Popen]:
+    """Start ``count`` simulated miners from ``host`` upwards, split over processes"""
+    first = ipaddress.ip_address(host)
+    processes = max(1, min(processes, count))
+    procs: List[subprocess.Popen] = []
+    offset = 0
+    try:
+        for i in range(processes):
+            chunk = count // processes + (1 if i < count % processes else 0)
+            procs.append(subprocess.Popen(
+                [sys.executable, SIMULATOR, '--count', str(chunk), '--host', str(first + offset),
+                 '--port', str(port), '--latency', str(latency), '--jitter', '0',
+                 '--seed', str(i + 1)],
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True))
+            offset += chunk
+
+        deadline = time.monotonic() + timeout
+        for proc in procs:
+            for line in proc.stdout:
+                if line.startswith('ready:'):
+                    break
+                if line.startswith('Error') or time.monotonic() > deadline:
+                    raise RuntimeError(f"Simulator did not start: {line.strip()}")
+            else:
+                raise RuntimeError("Simulator exited before it was ready")
+    except BaseException:
+        stop_simulators(procs)
+        raise
+    return procs
+
+
+def stop_simulators(procs: List[subprocess.Popen]):
+    for proc in procs:
+        proc.terminate()
+    for proc in procs:
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+# Cases
+
+async def poll_cycles(monitor: FleetMonitor, cycles: int) -> List[float]:
+    """Run full poll cycles back to back through the worker pool; seconds per cycle
+
+    Each cycle queues every miner the way the scheduler does and waits
+    until the workers have drained the queue.
+    """
+    times = []
+    monitor.start_workers()
+    try:
+        for _ in range(cycles):
+            start = time.perf_counter()
+            now = time.monotonic()
+            for ip in monitor.miner_ips:
+                monitor.enqueue(ip, now)
+            await monitor.idle.wait()
+            times.append(time.perf_counter() - start)
+    finally:
+        for worker in monitor.workers:
+            worker.cancel()
+    return times
+
+
+def bench_polling(size: int, args) -> Tuple[List[Dict[str, Any]], FleetMonitor]:
+    first = ipaddress.ip_address(args.host)
+    ips = [str(first + i) for i in range(size)]
+    procs = start_simulators(size, args.host, args.port, args.sim_processes, args.latency)
+    try:
+        monitor = FleetMonitor(ips, interval=10, port=args.port, concurrency=args.concurrency)
+        times = asyncio.run(poll_cycles(monitor, args.cycles))
+    finally:
+        stop_simulators(procs)
+
+    errors = sum(1 for m in monitor.miner_data.values() if m.status != 'Active')
+    cold = times[0]
+    warm = statistics.median(times[1:]) if len(times) > 1 else cold
+    results = [
+        metric(f'poll.cold.cycle_s.{size}', cold, 's', 'lower', errors=errors),
+        metric(f'poll.cold.miners_per_s.{size}', size / cold, 'miners/s', 'higher'),
+        metric(f'poll.warm.cycle_s.{size}', warm, 's', 'lower'),
+        metric(f'poll.warm.miners_per_s.{size}', size / warm, 'miners/s', 'higher'),
+    ]
+    return results, monitor
+
+
+def bench_rendering(size: int, monitor: FleetMonitor) -> List[Dict[str, Any]]:
+    """Frame costs on the state left by the polling case"""
+    results = []
+
+    terminal = TerminalBuffer()
+    monitor.renderer = FrameRenderer(terminal)
+    monitor.draw_table()  # First frame is always full
+
+    def frame():
+        terminal.seek(0)
+        terminal.truncate()
+        monitor.draw_table()
+
+    seconds = per_call(frame)
+    results.append(metric(f'render.frame_ms.{size}', seconds * 1e3, 'ms', 'lower',
+                          bytes=len(terminal.getvalue())))
+
+    def full_frame():
+        monitor.renderer.invalidate()
+        frame()
+
+    seconds = per_call(full_frame)
+    results.append(metric(f'render.full_frame_ms.{size}', seconds * 1e3, 'ms', 'lower',
+                          bytes=len(terminal.getvalue())))
+
+    # Redirected output: every matching miner, plain full frames
+    plain = io.StringIO()
+    monitor.renderer = FrameRenderer(plain)
+
+    def table():
+        plain.seek(0)
+        plain.truncate()
+        monitor.draw_table()
+
+    seconds = per_call(table, repeat=3)
+    results.append(metric(f'render.table_ms.{size}', seconds * 1e3, 'ms', 'lower',
+                          bytes=len(plain.getvalue())))
+    return results
+
+
+def bench_parsing() -> List[Dict[str, Any]]:
+    results = []
+    for name in sorted(os.listdir(PAYLOAD_DIR)):
+        if not name.endswith('.json'):
+            continue
+        with open(os.path.join(PAYLOAD_DIR, name), 'r') as f:
+            estats = json.load(f)
+        mm_id0 = get_mm_id0(estats)
+        payload = name[:-5]
+
+        seconds = per_call(lambda: parse_custom_data(estats))
+        results.append(metric(f'parse.custom_data.{payload}', 1 / seconds, 'calls/s', 'higher'))
+        seconds = per_call(lambda: parse_estats_field(mm_id0, 'TMax'))
+        results.append(metric(f'parse.estats_field.{payload}', 1 / seconds, 'calls/s', 'higher'))
+    return results
+
+
+# Reporting
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: List[Dict[str, Any]]):
+    print(f"{'Metric':<42} {'Value':>14}  Unit")
+    print("-" * 66)
+    for r in results:
+        print(f"{r['name']:<42} {r['value']:>14.6g}  {r['unit']}")
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> int:
+    """Print the change of every metric against a previous run; number of regressions"""
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get('format') != FORMAT_VERSION:
+        print(f"Error: {baseline_path} has result format {baseline.get('format')}, "
+              f"expected {FORMAT_VERSION}")
+        return 1
+    before = {r['name']: r for r in baseline['results']}
+
+    print(f"\nAgainst {baseline_path} (commit {baseline.get('commit') or 'unknown'}):")
+    print(f"{'Metric':<42} {'Before':>12} {'After':>12} {'Change':>9}")
+    print("-" * 78)
+    regressions = 0
+    for r in results:
+        old = before.get(r['name'])
+        if old is None or not old['value']:
+            continue
+        change = (r['value'] - old['value']) / old['value'] * 100
+        # Positive 'worse' is a slowdown whichever way the metric runs
+        worse = -change if r['better'] == 'higher' else change
+        flag = ''
+        if worse > threshold:
+            regressions += 1
+            flag = '  REGRESSION'
+        print(f"{r['name']:<42} {old['value']:>12.6g} {r['value']:>12.6g} {change:>+8.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark polling, parsing and rendering')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000],
+                        help='Fleet sizes to poll and render (default: 10 100 1000 10000)')
+    parser.add_argument('--cycles', type=int, default=5,
+                        help='Poll cycles per size; the first fetches every section (default: 5)')
+    parser.add_argument('--concurrency', type=int, default=256,
+                        help='Fleet monitor worker count (default: 256)')
+    parser.add_argument('--host', default='127.2.0.1',
+                        help='First loopback address of the simulated miners (default: 127.2.0.1)')
+    parser.add_argument('--port', type=int, default=14028,
+                        help='API port of the simulated miners (default: 14028)')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Simulated miner reply delay in seconds (default: 0)')
+    parser.add_argument('--sim-processes', type=int, default=max(1, min(4, (os.cpu_count() or 2) // 2)),
+                        help='Processes the simulated miners are spread over (default: half the CPUs, up to 4)')
+    parser.add_argument('--skip', nargs='+', choices=('poll', 'parse', 'render'), default=[],
+                        help='Groups of cases to leave out')
+    parser.add_argument('--output', '-o', metavar='FILE',
+                        help='Results file (default: benchmarks/results/bench-<time>.json)')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='Compare with an earlier results file; exit status 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Slowdown in percent counted as a regression (default: 10)')
+    args = parser.parse_args()
+
+    # Fixed terminal height for the interactive frame cases
+    os.environ['LINES'] = str(TERMINAL_LINES)
+    os.environ.setdefault('COLUMNS', '240')
+
+    started = datetime.now(timezone.utc)
+    results: List[Dict[str, Any]] = []
+
+    if 'parse' not in args.skip:
+        print("Parsing...", file=sys.stderr, flush=True)
+        results.extend(bench_parsing())
+
+    if 'poll' not in args.skip or 'render' not in args.skip:
+        for size in args.sizes:
+            print(f"{size} miners...", file=sys.stderr, flush=True)
+            try:
+                poll_results, monitor = bench_polling(size, args)
+            except (OSError, RuntimeError) as e:
+                print(f"Error: {size} miners: {e}")
+                sys.exit(1)
+            if 'poll' not in args.skip:
+                results.extend(poll_results)
+            if 'render' not in args.skip:
+                results.extend(bench_rendering(size, monitor))
+
+    report = {
+        'format': FORMAT_VERSION,
+        'timestamp': started.isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'settings': {key: getattr(args, key) for key in
+                     ('sizes', 'cycles', 'concurrency', 'latency', 'sim_processes')},
+        'results': results,
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"bench-{started.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+
+    print_results(results)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{regressions} metric(s) slower by more than {args.threshold:g}%")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
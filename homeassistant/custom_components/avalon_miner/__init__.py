@@ -9,6 +9,7 @@ from homeassistant.const import CONF_HOST, Platform
 from homeassistant.loader import async_get_loaded_integration
 
 from .api import AvalonMinerApiClient
+from .avalon_core import DEFAULT_TIMEOUT, LatencyEstimator
 from .const import CONF_POLLING_INTERVAL, CONF_PORT, DEFAULT_PORT, DOMAIN, LOGGER
 from .coordinator import AvalonMinerDataUpdateCoordinator
 from .data import AvalonMinerData
@@ -43,6 +44,7 @@ async def async_setup_entry(
         client=AvalonMinerApiClient(
             host=entry.data[CONF_HOST],
             port=entry.data.get(CONF_PORT, DEFAULT_PORT),
+            latency=LatencyEstimator(floor=1.0, ceiling=DEFAULT_TIMEOUT),
         ),
         integration=async_get_loaded_integration(hass, entry.domain),
         coordinator=coordinator,
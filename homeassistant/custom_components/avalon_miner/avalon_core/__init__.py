@@ -0,0 +1,50 @@
+"""
+Avalon Core (vendored)
+
+Client side of the shared avalon_core package for the Home Assistant
+integration: transport, client, parser, models and formatters. Generated by
+scripts/vendor_core.py from the top-level package; do not edit.
+
+Copyright (c) 2025
+SPDX-License-Identifier: Apache-2.0
+"""
+
+from .exceptions import AvalonMinerApiError, AvalonMinerApiCommunicationError
+from .transport import DEFAULT_PORT, DEFAULT_TIMEOUT, async_probe
+from .breaker import CircuitBreaker
+from .latency import LatencyEstimator
+from .client import STATUS_COMMANDS, AvalonMinerClient, AsyncAvalonMinerClient
+from .models import MinerVersion, MinerSummary, MinerEstats, MinerLcd
+from .formatting import (
+    WORK_MODE_NAMES,
+    get_work_mode_name,
+    to_ths,
+    format_hashrate,
+    format_difficulty,
+    format_uptime,
+    format_timestamp,
+)
+
+__all__ = [
+    "AvalonMinerApiError",
+    "AvalonMinerApiCommunicationError",
+    "DEFAULT_PORT",
+    "DEFAULT_TIMEOUT",
+    "async_probe",
+    "CircuitBreaker",
+    "LatencyEstimator",
+    "STATUS_COMMANDS",
+    "AvalonMinerClient",
+    "AsyncAvalonMinerClient",
+    "MinerVersion",
+    "MinerSummary",
+    "MinerEstats",
+    "MinerLcd",
+    "WORK_MODE_NAMES",
+    "get_work_mode_name",
+    "to_ths",
+    "format_hashrate",
+    "format_difficulty",
+    "format_uptime",
+    "format_timestamp",
+]
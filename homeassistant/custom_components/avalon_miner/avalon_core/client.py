@@ -0,0 +1,267 @@
+"""Sync and async clients bound to a single miner."""
+
+import time
+import socket
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence
+
+from .exceptions import AvalonMinerApiError
+from .latency import LatencyEstimator
+from .parser import batch_sections, is_invalid_command
+from .timing import RequestTimer
+from .transport import DEFAULT_PORT, DEFAULT_TIMEOUT, send_command, async_send_command
+
+
+# Read-only sections fetched together by the monitoring front ends
+STATUS_COMMANDS = ('version', 'summary', 'estats', 'lcd')
+
+# Joined requests in a row that may come back without any section before
+# batching is given up on (an "Invalid command" reply gives up at once)
+BATCH_FAILURE_LIMIT = 3
+
+
+def _is_timeout(exc: AvalonMinerApiError) -> bool:
+    """True if a transport error was caused by a connect or read timeout"""
+    return isinstance(exc.__cause__, (socket.timeout, asyncio.TimeoutError))
+
+
+class BatchSupport:
+    """Whether a miner accepts ``cmd1+cmd2`` requests, learned from its replies"""
+
+    def __init__(self, failure_limit: int = BATCH_FAILURE_LIMIT):
+        # None until the first joined reply
+        self.supported: Optional[bool] = None
+        self.failures = 0
+        self.failure_limit = failure_limit
+
+    @property
+    def usable(self) -> bool:
+        """True unless batching has been given up on"""
+        return self.supported is not False
+
+    def split(self, response: Optional[Dict[str, Any]],
+              commands: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Split a joined reply and learn from it
+
+        A reply with at least one section proves joins work, even if other
+        sections are missing (the caller fetches those on their own). An
+        "Invalid command" reply disables batching for good, any other reply
+        without sections only after ``failure_limit`` of them in a row.
+        """
+        sections = batch_sections(response, commands)
+        if sections:
+            self.supported = True
+            self.failures = 0
+        elif is_invalid_command(response):
+            self.supported = False
+        else:
+            self.failures += 1
+            if self.failures >= self.failure_limit:
+                self.supported = False
+        return sections
+
+
+class AvalonMinerClient:
+    """Blocking API client for a single miner"""
+
+    def __init__(self, host: str, port: int = DEFAULT_PORT, timeout: float = DEFAULT_TIMEOUT,
+                 latency: Optional[LatencyEstimator] = None, instrument: bool = False):
+        """
+        Initialize API connection parameters
+
+        Args:
+            host: Miner IP address
+            port: API port (default: 4028)
+            timeout: Socket timeout in seconds (default: 5)
+            latency: Optional estimator; when given, its adaptive deadline
+                replaces ``timeout`` and every request feeds it a sample
+            instrument: Time the phases of every request (collected with
+                :meth:`pop_timers`)
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.latency = latency
+        # Whether the firmware accepts "cmd1+cmd2" batches
+        self.batch = BatchSupport()
+        self.instrument = instrument
+        self.timers: List[RequestTimer] = []
+
+    def _timer(self, command: str) -> Optional[RequestTimer]:
+        if not self.instrument:
+            return None
+        timer = RequestTimer(command)
+        self.timers.append(timer)
+        return timer
+
+    def pop_timers(self) -> List[RequestTimer]:
+        """Timers of the requests made since the last call"""
+        timers, self.timers = self.timers, []
+        return timers
+
+    def send_command(self, command: str, params: str = '') -> Dict[str, Any]:
+        """Send a command to the miner API and return the JSON response"""
+        timer = self._timer(command)
+        if self.latency is None:
+            return send_command(self.host, self.port, command, params, self.timeout, timer)
+
+        start = time.monotonic()
+        try:
+            response = send_command(self.host, self.port, command, params,
+                                    self.latency.timeout, timer)
+        except AvalonMinerApiError as exc:
+            if _is_timeout(exc):
+                self.latency.record_timeout()
+            raise
+        self.latency.observe(time.monotonic() - start)
+        return response
+
+    def fetch_sections(self, commands: Sequence[str] = STATUS_COMMANDS,
+                       errors: Optional[Dict[str, AvalonMinerApiError]] = None
+                       ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch several read-only commands, in one round trip where supported
+
+        The commands are joined with ``+`` into a single request, and any
+        section missing from the joined reply is fetched on its own. If the
+        firmware rejects the joined form (see :class:`BatchSupport`), the
+        client remembers that and sends one request per command.
+
+        Args:
+            commands: Command names to fetch
+            errors: Optional dict that receives the error of every command
+                that failed when fetched on its own
+
+        Returns:
+            Mapping of command name to its response. A command that fails
+            on its own is left out of the mapping.
+
+        Raises:
+            AvalonMinerApiError: If the miner could not be reached at all
+        """
+        sections: Dict[str, Dict[str, Any]] = {}
+        if len(commands) > 1 and self.batch.usable:
+            response = self.send_command('+'.join(commands))
+            sections = self.batch.split(response, commands)
+            commands = [command for command in commands if command not in sections]
+
+        error = None
+        for command in commands:
+            try:
+                sections[command] = self.send_command(command)
+            except AvalonMinerApiError as exc:
+                error = exc
+                if errors is not None:
+                    errors[command] = exc
+        if not sections and error is not None:
+            raise error
+        return sections
+
+    def get_version(self) -> Dict[str, Any]:
+        """Get miner version information"""
+        return self.send_command('version')
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Get miner summary statistics"""
+        return self.send_command('summary')
+
+    def get_estats(self) -> Dict[str, Any]:
+        """Get extended miner statistics"""
+        return self.send_command('estats')
+
+    def get_lcd(self) -> Dict[str, Any]:
+        """Get LCD/active pool information"""
+        return self.send_command('lcd')
+
+    def get_pools(self) -> Dict[str, Any]:
+        """Get pool information"""
+        return self.send_command('pools')
+
+
+class AsyncAvalonMinerClient:
+    """Asyncio API client for a single miner"""
+
+    def __init__(self, host: str, port: int = DEFAULT_PORT, timeout: float = DEFAULT_TIMEOUT,
+                 latency: Optional[LatencyEstimator] = None, instrument: bool = False):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.latency = latency
+        self.batch = BatchSupport()
+        self.instrument = instrument
+        self.timers: List[RequestTimer] = []
+
+    def _timer(self, command: str) -> Optional[RequestTimer]:
+        if not self.instrument:
+            return None
+        timer = RequestTimer(command)
+        self.timers.append(timer)
+        return timer
+
+    def pop_timers(self) -> List[RequestTimer]:
+        """Timers of the requests made since the last call"""
+        timers, self.timers = self.timers, []
+        return timers
+
+    async def async_send_command(self, command: str, params: str = '') -> Dict[str, Any]:
+        """Send a command to the miner API and return the JSON response"""
+        timer = self._timer(command)
+        if self.latency is None:
+            return await async_send_command(self.host, self.port, command, params,
+                                            self.timeout, timer)
+
+        start = time.monotonic()
+        try:
+            response = await async_send_command(
+                self.host, self.port, command, params, self.latency.timeout, timer)
+        except AvalonMinerApiError as exc:
+            if _is_timeout(exc):
+                self.latency.record_timeout()
+            raise
+        self.latency.observe(time.monotonic() - start)
+        return response
+
+    async def async_fetch_sections(
+            self, commands: Sequence[str] = STATUS_COMMANDS,
+            errors: Optional[Dict[str, AvalonMinerApiError]] = None) -> Dict[str, Dict[str, Any]]:
+        """Fetch several read-only commands; see :meth:`AvalonMinerClient.fetch_sections`"""
+        sections: Dict[str, Dict[str, Any]] = {}
+        if len(commands) > 1 and self.batch.usable:
+            response = await self.async_send_command('+'.join(commands))
+            sections = self.batch.split(response, commands)
+            commands = [command for command in commands if command not in sections]
+
+        # The rest one command at a time, to avoid piling connections onto
+        # the miner's small controller
+        error = None
+        for command in commands:
+            try:
+                sections[command] = await self.async_send_command(command)
+            except AvalonMinerApiError as exc:
+                error = exc
+                if errors is not None:
+                    errors[command] = exc
+        if not sections and error is not None:
+            raise error
+        return sections
+
+    async def async_get_version(self) -> Dict[str, Any]:
+        """Get miner version information"""
+        return await self.async_send_command('version')
+
+    async def async_get_summary(self) -> Dict[str, Any]:
+        """Get miner summary statistics"""
+        return await self.async_send_command('summary')
+
+    async def async_get_estats(self) -> Dict[str, Any]:
+        """Get extended miner statistics"""
+        return await self.async_send_command('estats')
+
+    async def async_get_lcd(self) -> Dict[str, Any]:
+        """Get LCD/active pool information"""
+        return await self.async_send_command('lcd')
+
+    async def async_get_pools(self) -> Dict[str, Any]:
+        """Get pool information"""
+        return await self.async_send_command('pools')
@@ -0,0 +1,13 @@
+"""Exceptions raised by the Avalon core package."""
+
+
+class AvalonMinerApiError(Exception):
+    """Exception to indicate a general API error."""
+
+
+class AvalonMinerApiCommunicationError(AvalonMinerApiError, ConnectionError):
+    """Exception to indicate a communication error."""
+
+
+class AvalonConfigError(Exception):
+    """Exception to indicate an unusable configuration file."""
@@ -0,0 +1,122 @@
+"""Display formatters shared by the CLI, the Fleet Monitor and Home Assistant."""
+
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+
+WORK_MODE_NAMES = {
+    '0': 'Eco',
+    '1': 'Standard',
+    '2': 'Super',
+}
+
+
+def get_work_mode_name(mode_value: Any) -> str:
+    """Convert work mode number to name"""
+    return WORK_MODE_NAMES.get(str(mode_value), f'Unknown ({mode_value})')
+
+
+def to_ths(value: Any, from_mhs: bool = True) -> Optional[float]:
+    """Convert a hash rate in MH/s (or GH/s) to TH/s, None if not numeric"""
+    try:
+        value = float(value)
+    except (ValueError, TypeError):
+        return None
+    return value / 1_000_000 if from_mhs else value / 1_000
+
+
+def format_hashrate(value: Any, from_mhs: bool = True, unit: bool = True) -> str:
+    """Format hash rate in TH/s (``unit=False`` omits the ``TH/s`` suffix)"""
+    ths = to_ths(value, from_mhs)
+    if ths is None:
+        return "N/A"
+    return f"{ths:.2f} TH/s" if unit else f"{ths:.2f}"
+
+
+def format_difficulty(diff: Any, compact: bool = False) -> str:
+    """
+    Format difficulty with appropriate unit
+
+    ``compact`` drops the space before the unit and the decimals below 1K
+    (``224.20M`` instead of ``224.20 M``) for table layouts.
+    """
+    try:
+        diff = float(diff)
+    except (ValueError, TypeError):
+        return "N/A"
+
+    sep = '' if compact else ' '
+    for scale, suffix in ((1e15, 'P'), (1e12, 'T'), (1e9, 'G'), (1e6, 'M'), (1e3, 'K')):
+        if diff >= scale:
+            return f"{diff / scale:.2f}{sep}{suffix}"
+    return f"{diff:.0f}" if compact else f"{diff:.2f}"
+
+
+def format_uptime(seconds: Any, style: str = 'full') -> str:
+    """
+    Format uptime in human-readable format
+
+    Styles:
+        full:    ``1d 2h 3m 4s`` (CLI detail views)
+        short:   ``1d 2h 3m`` / ``2h 3m`` / ``3m`` (Home Assistant)
+        compact: ``1d02h`` / ``2h03m`` / ``3m`` (fleet table)
+    """
+    try:
+        seconds = int(seconds)
+    except (ValueError, TypeError):
+        return "N/A"
+
+    days = seconds // 86400
+    hours = (seconds % 86400) // 3600
+    minutes = (seconds % 3600) // 60
+    secs = seconds % 60
+
+    if style == 'compact':
+        if days > 0:
+            return f"{days}d{hours:02d}h"
+        if hours > 0:
+            return f"{hours}h{minutes:02d}m"
+        return f"{minutes}m"
+    if style == 'short':
+        if days > 0:
+            return f"{days}d {hours}h {minutes}m"
+        if hours > 0:
+            return f"{hours}h {minutes}m"
+        return f"{minutes}m"
+    return f"{days}d {hours}h {minutes}m {secs}s"
+
+
+def format_timestamp(unix_time: int) -> str:
+    """Convert unix timestamp to readable format"""
+    return datetime.fromtimestamp(unix_time).strftime('%Y-%m-%d %H:%M:%S')
+
+
+SPARK_CHARS = '▁▂▃▄▅▆▇█'
+
+
+def format_sparkline(values: Sequence[float], min_span: float = 0.0) -> str:
+    """
+    One block character per value, scaled between the series' min and max
+
+    ``min_span`` is the smallest range drawn full height, so noise on a
+    steady series stays a flat line instead of filling the scale.
+    """
+    if not values:
+        return ''
+    low = min(values)
+    span = max(max(values) - low, min_span)
+    if span <= 0:
+        return SPARK_CHARS[0] * len(values)
+    top = len(SPARK_CHARS) - 1
+    return ''.join(SPARK_CHARS[min(top, int((v - low) / span * top + 0.5))] for v in values)
+
+
+def format_trend(recent: Optional[float], baseline: Optional[float], threshold: float) -> str:
+    """Arrow comparing a short-term mean with a longer one (``threshold``: dead band)"""
+    if recent is None or baseline is None:
+        return ' '
+    if recent > baseline + threshold:
+        return '↑'
+    if recent < baseline - threshold:
+        return '↓'
+    return '→'
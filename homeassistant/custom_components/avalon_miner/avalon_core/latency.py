@@ -0,0 +1,71 @@
+"""
+Adaptive request deadlines from observed miner latency.
+
+Each miner gets its own estimator that keeps a smoothed round-trip time and
+its mean deviation (the same EWMA pair TCP uses for its retransmission
+timer). The deadline is ``srtt + k * rttvar`` clamped to a floor and a
+ceiling, so a miner that normally answers in 40 ms is given up on quickly
+when it hangs, while a slow unit on a congested link keeps enough headroom
+not to be reported as an error.
+"""
+
+from typing import Optional
+
+
+class LatencyEstimator:
+    """EWMA round-trip estimate and derived timeout for one miner"""
+
+    def __init__(self, floor: float = 0.5, ceiling: float = 5.0,
+                 alpha: float = 0.125, beta: float = 0.25, k: float = 4.0):
+        """
+        Args:
+            floor: Smallest deadline ever returned, in seconds
+            ceiling: Largest deadline, and the deadline used before the
+                first sample has been observed
+            alpha: Smoothing factor for the round-trip average
+            beta: Smoothing factor for the round-trip deviation
+            k: Number of deviations added on top of the average
+        """
+        if floor <= 0 or ceiling < floor:
+            raise ValueError("Timeout floor must be positive and not above the ceiling")
+        self.floor = floor
+        self.ceiling = ceiling
+        self.alpha = alpha
+        self.beta = beta
+        self.k = k
+
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self.samples = 0
+        # Doubled after each timeout, reset by the next successful sample
+        self._backoff = 1.0
+
+    @property
+    def timeout(self) -> float:
+        """Current deadline in seconds, applied to connect and to read"""
+        if self.srtt is None:
+            return self.ceiling
+        value = (self.srtt + self.k * self.rttvar) * self._backoff
+        return min(max(value, self.floor), self.ceiling)
+
+    def observe(self, rtt: float) -> None:
+        """Feed the duration of a request that completed successfully"""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar += self.beta * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += self.alpha * (rtt - self.srtt)
+        self.samples += 1
+        self._backoff = 1.0
+
+    def record_timeout(self) -> None:
+        """
+        Widen the deadline after a request timed out
+
+        A timed-out request gives no usable sample, so instead the next
+        deadline is doubled (up to the ceiling). A miner that merely got
+        slower therefore recovers within a few polls.
+        """
+        if self.srtt is not None and self.timeout < self.ceiling:
+            self._backoff *= 2
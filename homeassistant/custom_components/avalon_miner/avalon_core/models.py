@@ -0,0 +1,130 @@
+"""Typed models for the read-only API responses."""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from .parser import first_entry, get_mm_id0, parse_mm_id0
+
+
+@dataclass
+class MinerVersion:
+    """Hardware and firmware identity from the ``version`` command"""
+    model: str = ''
+    dna: str = ''
+    prod: str = ''
+    mac: str = ''
+    firmware: str = ''
+    cgminer: str = ''
+    api: str = ''
+    hwtype: str = ''
+    swtype: str = ''
+
+    @classmethod
+    def from_response(cls, response: Optional[Dict[str, Any]]) -> 'MinerVersion':
+        ver = first_entry(response, 'VERSION')
+        return cls(
+            model=ver.get('MODEL', ''),
+            dna=ver.get('DNA', ''),
+            prod=ver.get('PROD', ''),
+            mac=ver.get('MAC', ''),
+            firmware=ver.get('LVERSION', ver.get('BVERSION', ver.get('CGVERSION', ''))),
+            cgminer=ver.get('CGMiner', ''),
+            api=ver.get('API', ''),
+            hwtype=ver.get('HWTYPE', ''),
+            swtype=ver.get('SWTYPE', ''),
+        )
+
+
+@dataclass
+class MinerSummary:
+    """Hash rates and share counters from the ``summary`` command
+
+    Hash rates are in MH/s. Fields missing from the response are ``None``.
+    """
+    elapsed: Optional[int] = None
+    mhs_av: Optional[float] = None
+    mhs_5s: Optional[float] = None
+    mhs_1m: Optional[float] = None
+    mhs_5m: Optional[float] = None
+    mhs_15m: Optional[float] = None
+    accepted: Optional[int] = None
+    rejected: Optional[int] = None
+    hardware_errors: Optional[int] = None
+    best_share: Optional[float] = None
+    found_blocks: Optional[int] = None
+    pool_rejected_pct: Optional[float] = None
+    pool_stale_pct: Optional[float] = None
+    # Share difficulty sums (diff-1 units)
+    difficulty_accepted: Optional[float] = None
+    difficulty_rejected: Optional[float] = None
+
+    @classmethod
+    def from_response(cls, response: Optional[Dict[str, Any]]) -> 'MinerSummary':
+        summary = first_entry(response, 'SUMMARY')
+        return cls(
+            elapsed=summary.get('Elapsed'),
+            mhs_av=summary.get('MHS av'),
+            mhs_5s=summary.get('MHS 5s'),
+            mhs_1m=summary.get('MHS 1m'),
+            mhs_5m=summary.get('MHS 5m'),
+            mhs_15m=summary.get('MHS 15m'),
+            accepted=summary.get('Accepted'),
+            rejected=summary.get('Rejected'),
+            hardware_errors=summary.get('Hardware Errors'),
+            best_share=summary.get('Best Share'),
+            found_blocks=summary.get('Found Blocks'),
+            pool_rejected_pct=summary.get('Pool Rejected%'),
+            pool_stale_pct=summary.get('Pool Stale%'),
+            difficulty_accepted=summary.get('Difficulty Accepted'),
+            difficulty_rejected=summary.get('Difficulty Rejected'),
+        )
+
+
+@dataclass
+class MinerEstats:
+    """Extended statistics from the ``estats`` command
+
+    ``mm_id0`` holds the raw Avalon custom data string; individual values
+    are looked up with :meth:`field` and returned as raw strings. The
+    string is tokenized once, on first lookup.
+    """
+    elapsed: Optional[int] = None
+    mm_id0: str = ''
+    fields: Dict[str, str] = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def from_response(cls, response: Optional[Dict[str, Any]]) -> 'MinerEstats':
+        stats = first_entry(response, 'STATS')
+        return cls(
+            elapsed=stats.get('Elapsed'),
+            mm_id0=get_mm_id0(response),
+        )
+
+    def field(self, name: str) -> Optional[str]:
+        """Return a raw custom data value, or None if absent"""
+        if not self.fields and self.mm_id0:
+            self.fields = parse_mm_id0(self.mm_id0)
+        return self.fields.get(name)
+
+
+@dataclass
+class MinerLcd:
+    """Active pool information from the ``lcd`` command"""
+    current_pool: Optional[str] = None
+    user: Optional[str] = None
+    last_valid_work: Optional[int] = None
+    last_share_difficulty: Optional[float] = None
+    best_share: Optional[float] = None
+    found_blocks: Optional[int] = None
+
+    @classmethod
+    def from_response(cls, response: Optional[Dict[str, Any]]) -> 'MinerLcd':
+        lcd = first_entry(response, 'LCD')
+        return cls(
+            current_pool=lcd.get('Current Pool'),
+            user=lcd.get('User'),
+            last_valid_work=lcd.get('Last Valid Work'),
+            last_share_difficulty=lcd.get('Last Share Difficulty'),
+            best_share=lcd.get('Best Share'),
+            found_blocks=lcd.get('Found Blocks'),
+        )
@@ -0,0 +1,160 @@
+"""Parsing helpers for API responses and the Avalon ``MM ID0`` custom data."""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+
+# One ``Key[Value]`` (Nano 3S) or ``Key:[Value]`` (Avalon Q) token
+_MM_TOKEN = re.compile(r'([A-Za-z_]\w*):?\[([^\]]+)\]')
+
+
+def first_entry(response: Optional[Dict[str, Any]], key: str) -> Dict[str, Any]:
+    """
+    Return the first object of a response section
+
+    Most sections (VERSION, SUMMARY, LCD, STATS, STATUS) are single-element
+    arrays, but some firmware returns a bare object. Missing or empty
+    sections yield an empty dict.
+    """
+    if not response:
+        return {}
+    section = response.get(key)
+    if isinstance(section, list):
+        return section[0] if section and isinstance(section[0], dict) else {}
+    if isinstance(section, dict):
+        return section
+    return {}
+
+
+def split_batch_response(response: Optional[Dict[str, Any]],
+                         commands: Sequence[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Split the reply to a ``+``-joined request into per-command responses
+
+    CGMiner answers ``summary+estats`` with ``{"summary": [{...}],
+    "estats": [{...}], "id": 1}`` where each entry is the full response of
+    that command. Returns None unless every command is in that shape (e.g.
+    the firmware rejected the joined command with a single error STATUS);
+    :func:`batch_sections` keeps the sections that are.
+    """
+    sections = batch_sections(response, commands)
+    return sections if len(sections) == len(commands) else None
+
+
+def batch_sections(response: Optional[Dict[str, Any]],
+                   commands: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """Per-command responses of a joined reply, leaving out missing or malformed ones"""
+    sections = {}
+    for command in commands:
+        entry = response.get(command) if response else None
+        if isinstance(entry, list) and entry and isinstance(entry[0], dict):
+            sections[command] = entry[0]
+    return sections
+
+
+def is_invalid_command(response: Optional[Dict[str, Any]]) -> bool:
+    """True if the reply is CGMiner's "Invalid command" error (code 14)"""
+    status = first_entry(response, 'STATUS')
+    return status.get('STATUS') == 'E' and (
+        status.get('Code') == 14 or status.get('Msg') == 'Invalid command')
+
+
+def _stats_entries(estats_response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return the STATS section of an estats response as a list of dicts"""
+    stats = estats_response.get('STATS', [])
+    if isinstance(stats, dict):
+        return [stats]
+    if isinstance(stats, list):
+        return [s for s in stats if isinstance(s, dict)]
+    return []
+
+
+def _raw_mm_id0(estats_response: Optional[Dict[str, Any]]) -> str:
+    """Return the custom data string as sent, in either layout"""
+    if not estats_response:
+        return ''
+
+    entries = _stats_entries(estats_response)
+
+    # Pattern 1: Avalon Nano 3S
+    for stat in entries:
+        if stat.get('MM ID0'):
+            return stat['MM ID0']
+
+    # Pattern 2: Avalon Q
+    for stat in entries:
+        if stat.get('MM ID0:Summary'):
+            return stat['MM ID0:Summary']
+
+    return ''
+
+
+def get_mm_id0(estats_response: Optional[Dict[str, Any]]) -> str:
+    """
+    Extract the ``MM ID0`` custom data string from an estats response
+
+    Handles both the Avalon Nano 3S layout (``MM ID0`` with ``Key[Value]``
+    pairs) and the Avalon Q layout (``MM ID0:Summary`` with ``Key:[Value]``
+    pairs, normalised to ``Key[Value]``). Returns an empty string if neither
+    is present.
+    """
+    mm_id0 = _raw_mm_id0(estats_response)
+    if ':[' in mm_id0:
+        return _MM_TOKEN.sub(r'\1[\2]', mm_id0)
+    return mm_id0
+
+
+def parse_mm_id0(mm_id0: str) -> Dict[str, str]:
+    """
+    Split a custom data string into raw ``{key: value}`` strings in one pass
+
+    Accepts both the ``Key[Value]`` and ``Key:[Value]`` layouts. Keys are
+    matched as whole words, so ``OTemp`` is never confused with
+    ``HBOTemp``. If a key repeats, the first value wins.
+    """
+    fields: Dict[str, str] = {}
+    for key, value in _MM_TOKEN.findall(mm_id0):
+        if key not in fields:
+            fields[key] = value
+    return fields
+
+
+@lru_cache(maxsize=256)
+def _field_pattern(field_name: str):
+    return re.compile(rf'(?<!\w){re.escape(field_name)}:?\[([^\]]+)\]')
+
+
+def parse_estats_field(mm_id0: str, field_name: str) -> Optional[str]:
+    """
+    Parse a single field from the MM ID0 string in ESTATS response
+
+    For more than a couple of fields, tokenize once with
+    :func:`parse_mm_id0` and look values up in the returned dict instead.
+    """
+    match = _field_pattern(field_name).search(mm_id0)
+    return match.group(1) if match else None
+
+
+def convert_value(value: str) -> Union[int, float, str]:
+    """Convert a raw custom data value to int or float where possible"""
+    try:
+        if '.' in value:
+            return float(value)
+        return int(value)
+    except ValueError:
+        return value
+
+
+def parse_custom_data(estats_response: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Parse all custom data pairs into a typed dict in a single pass
+
+    Both layouts are tokenized directly, without normalising the Avalon Q
+    string first.
+    """
+    custom_data: Dict[str, Any] = {}
+    for key, value in _MM_TOKEN.findall(_raw_mm_id0(estats_response)):
+        if key not in custom_data:
+            custom_data[key] = convert_value(value)
+    return custom_data
@@ -0,0 +1,181 @@
+"""
+Per-phase timing and error classes of API requests.
+
+When instrumentation is on, the transport marks the end of each phase of
+a request on a :class:`RequestTimer`:
+
+- ``connect``: TCP connection established
+- ``send``: request written
+- ``first_byte``: first byte of the reply received (the miner's own
+  processing time)
+- ``complete``: rest of the reply read
+- ``parse``: JSON decoded
+
+A failed request also gets an error class: ``refused``, ``timeout``,
+``reset`` (closed early or without a reply), ``bad_json`` or ``other``.
+:class:`LatencyStats` adds the phase durations of every request to
+fixed-bucket histograms per command and counts errors per command and
+class. Joined requests (``summary+estats+lcd``) all count under one
+``batch`` label, so the series stay put as the tier mix changes; the mix
+itself is counted separately. The dashboard footer, the output records and the Prometheus
+endpoint all read from it. With instrumentation off the transport takes
+no timestamps at all.
+"""
+
+import time
+import socket
+import asyncio
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+
+PHASES = ('connect', 'send', 'first_byte', 'complete', 'parse')
+ERROR_CLASSES = ('refused', 'timeout', 'reset', 'bad_json', 'other')
+
+# Upper bounds of the histogram buckets in seconds (plus an implicit +Inf)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Histogram of the whole request, next to the phases
+TOTAL = 'total'
+
+# Label of every joined ("cmd1+cmd2") request
+BATCH = 'batch'
+
+
+def classify_error(exc: BaseException) -> str:
+    """Error class of an exception raised while talking to a miner"""
+    if isinstance(exc, (socket.timeout, asyncio.TimeoutError)):
+        return 'timeout'
+    if isinstance(exc, ConnectionRefusedError):
+        return 'refused'
+    if isinstance(exc, (ConnectionResetError, ConnectionAbortedError, BrokenPipeError,
+                        asyncio.IncompleteReadError)):
+        return 'reset'
+    if isinstance(exc, ValueError):  # Includes UnicodeDecodeError
+        return 'bad_json'
+    return 'other'
+
+
+class RequestTimer:
+    """Phase end times of one request, filled in by the transport"""
+
+    __slots__ = ('command', 'started', 'marks', 'error')
+
+    def __init__(self, command: str):
+        self.command = command
+        self.started = time.perf_counter()
+        # End time of each phase reached so far, in PHASES order
+        self.marks: List[float] = []
+        self.error: Optional[str] = None
+
+    def mark(self) -> None:
+        """The next phase has ended"""
+        self.marks.append(time.perf_counter())
+
+    def fail(self, error_class: str) -> None:
+        self.error = error_class
+
+    def durations(self) -> List[float]:
+        """Seconds spent in each phase that ended"""
+        result = []
+        previous = self.started
+        for mark in self.marks:
+            result.append(mark - previous)
+            previous = mark
+        return result
+
+    @property
+    def complete(self) -> bool:
+        return self.error is None and len(self.marks) == len(PHASES)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram over :data:`BUCKETS`"""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        # Per bucket (not cumulative); the last one is +Inf
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other: 'Histogram') -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile by linear interpolation inside its bucket (as
+        Prometheus' ``histogram_quantile`` does); None when empty
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(BUCKETS):
+                    return BUCKETS[-1]  # Beyond the last bound
+                lower = BUCKETS[i - 1] if i else 0.0
+                return lower + (BUCKETS[i] - lower) * (rank - seen) / count
+            seen += count
+        return BUCKETS[-1]
+
+
+class LatencyStats:
+    """Phase histograms and error counts of every request, per command"""
+
+    def __init__(self):
+        # Keyed by command, or BATCH for joined requests
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self.requests: Dict[str, int] = {}
+        # Joined requests per command mix, e.g. 'summary+estats+lcd'
+        self.batches: Dict[str, int] = {}
+        # Bumped on every record, for consumers that cache rendered output
+        self.version = 0
+
+    def _histogram(self, command: str, phase: str) -> Histogram:
+        histogram = self.histograms.get((command, phase))
+        if histogram is None:
+            histogram = self.histograms[(command, phase)] = Histogram()
+        return histogram
+
+    def record(self, timer: RequestTimer) -> None:
+        """Add one finished (or failed) request"""
+        command = timer.command
+        if '+' in command:
+            self.batches[command] = self.batches.get(command, 0) + 1
+            command = BATCH
+        self.requests[command] = self.requests.get(command, 0) + 1
+        for phase, duration in zip(PHASES, timer.durations()):
+            self._histogram(command, phase).observe(duration)
+        if timer.error is not None:
+            key = (command, timer.error)
+            self.errors[key] = self.errors.get(key, 0) + 1
+        elif timer.complete:
+            self._histogram(command, TOTAL).observe(timer.marks[-1] - timer.started)
+        self.version += 1
+
+    def merged(self, phase: str) -> Histogram:
+        """One phase's histogram across all commands"""
+        result = Histogram()
+        for (_, name), histogram in self.histograms.items():
+            if name == phase:
+                result.merge(histogram)
+        return result
+
+    def error_counts(self) -> Dict[str, int]:
+        """Errors per class across all commands"""
+        counts = dict.fromkeys(ERROR_CLASSES, 0)
+        for (_, error_class), count in self.errors.items():
+            counts[error_class] += count
+        return counts
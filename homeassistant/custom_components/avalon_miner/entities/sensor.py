@@ -15,6 +15,7 @@ from homeassistant.const import (
     UnitOfTemperature,
 )
 
+from ..avalon_core import format_uptime
 from ..const import DOMAIN, WORK_MODE_MAP
 from ..entity import AvalonMinerEntity
 
@@ -236,18 +237,6 @@ ENTITY_DESCRIPTIONS = (
 )
 
 
-def _format_uptime(seconds: int) -> str:
-    """Format uptime in human-readable format."""
-    days = seconds // 86400
-    hours = (seconds % 86400) // 3600
-    minutes = (seconds % 3600) // 60
-    if days > 0:
-        return f"{days}d {hours}h {minutes}m"
-    if hours > 0:
-        return f"{hours}h {minutes}m"
-    return f"{minutes}m"
-
-
 def _safe_float(value: str | None) -> float | None:
     """Safely convert a string to float."""
     if value is None:
@@ -344,7 +333,7 @@ class AvalonMinerSensor(AvalonMinerEntity, SensorEntity):
         # Uptime
         if key == "uptime":
             elapsed = data.get("elapsed", 0)
-            return _format_uptime(elapsed) if elapsed else None
+            return format_uptime(elapsed, style="short") if elapsed else None
 
         # Work mode display
         if key == "work_mode_display":
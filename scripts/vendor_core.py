@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Vendor avalon_core into the Home Assistant integration
+
+Home Assistant loads a custom component from its own folder only, so the
+integration ships a copy of the shared package in
+homeassistant/custom_components/avalon_miner/avalon_core. Only the client
+side is vendored (transport, parser, models, formatting and what they
+import); the terminal renderer, the metrics server, the recorder and the
+other Fleet Monitor modules stay out, and the copy gets its own __init__
+that imports nothing else. This script refreshes that copy from the
+top-level avalon_core, or with --check reports whether it is out of date
+(exit status 1), which the test suite runs so the two cannot drift apart.
+
+Usage:
+    python3 scripts/vendor_core.py          # Refresh the copy
+    python3 scripts/vendor_core.py --check  # Verify it
+
+Copyright (c) 2025
+SPDX-License-Identifier: Apache-2.0
+"""
+
+import os
+import sys
+import argparse
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE = os.path.join(ROOT, 'avalon_core')
+TARGET = os.path.join(ROOT, 'homeassistant', 'custom_components', 'avalon_miner', 'avalon_core')
+
+# Modules the integration needs, with everything they import
+MODULES = (
+    'breaker.py',
+    'client.py',
+    'exceptions.py',
+    'formatting.py',
+    'latency.py',
+    'models.py',
+    'parser.py',
+    'timing.py',
+    'transport.py',
+)
+
+# The vendored package's __init__, limited to MODULES
+INIT = '''"""
+Avalon Core (vendored)
+
+Client side of the shared avalon_core package for the Home Assistant
+integration: transport, client, parser, models and formatters. Generated by
+scripts/vendor_core.py from the top-level package; do not edit.
+
+Copyright (c) 2025
+SPDX-License-Identifier: Apache-2.0
+"""
+
+from .exceptions import AvalonMinerApiError, AvalonMinerApiCommunicationError
+from .transport import DEFAULT_PORT, DEFAULT_TIMEOUT, async_probe
+from .breaker import CircuitBreaker
+from .latency import LatencyEstimator
+from .client import STATUS_COMMANDS, AvalonMinerClient, AsyncAvalonMinerClient
+from .models import MinerVersion, MinerSummary, MinerEstats, MinerLcd
+from .formatting import (
+    WORK_MODE_NAMES,
+    get_work_mode_name,
+    to_ths,
+    format_hashrate,
+    format_difficulty,
+    format_uptime,
+    format_timestamp,
+)
+
+__all__ = [
+    "AvalonMinerApiError",
+    "AvalonMinerApiCommunicationError",
+    "DEFAULT_PORT",
+    "DEFAULT_TIMEOUT",
+    "async_probe",
+    "CircuitBreaker",
+    "LatencyEstimator",
+    "STATUS_COMMANDS",
+    "AvalonMinerClient",
+    "AsyncAvalonMinerClient",
+    "MinerVersion",
+    "MinerSummary",
+    "MinerEstats",
+    "MinerLcd",
+    "WORK_MODE_NAMES",
+    "get_work_mode_name",
+    "to_ths",
+    "format_hashrate",
+    "format_difficulty",
+    "format_uptime",
+    "format_timestamp",
+]
+'''
+
+
+def _modules(path: str) -> List[str]:
+    if not os.path.isdir(path):
+        return []
+    return sorted(name for name in os.listdir(path) if name.endswith('.py'))
+
+
+def _read(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _expected(source: str, name: str) -> bytes:
+    if name == '__init__.py':
+        return INIT.encode()
+    return _read(os.path.join(source, name))
+
+
+def differences(source: str = SOURCE, target: str = TARGET) -> List[str]:
+    """Module names that are missing, extra or different in the vendored copy"""
+    if os.path.islink(target):
+        return ['avalon_core (symlink)']
+    wanted = sorted(('__init__.py',) + MODULES)
+    target_modules = _modules(target)
+    changed = [name for name in wanted
+               if name not in target_modules
+               or _expected(source, name) != _read(os.path.join(target, name))]
+    extra = [name for name in target_modules if name not in wanted]
+    return changed + extra
+
+
+def vendor(source: str = SOURCE, target: str = TARGET) -> List[str]:
+    """Make the vendored copy match the source; returns the modules written or removed"""
+    if os.path.islink(target):
+        os.remove(target)
+    os.makedirs(target, exist_ok=True)
+    updated = differences(source, target)
+    for name in updated:
+        if name == '__init__.py' or name in MODULES:
+            with open(os.path.join(target, name), 'wb') as f:
+                f.write(_expected(source, name))
+        else:
+            os.remove(os.path.join(target, name))
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vendor avalon_core into the Home Assistant integration')
+    parser.add_argument('--check', action='store_true',
+                        help='Only report whether the vendored copy is up to date')
+    args = parser.parse_args()
+
+    if args.check:
+        stale = differences()
+        if stale:
+            print(f"Vendored avalon_core is out of date: {', '.join(stale)}")
+            print("Run: python3 scripts/vendor_core.py")
+            sys.exit(1)
+        print("Vendored avalon_core is up to date")
+        return
+
+    updated = vendor()
+    if updated:
+        print(f"Updated {', '.join(updated)}")
+    else:
+        print("Vendored avalon_core is already up to date")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Tests for the per-miner circuit breaker."""
+
+import unittest
+
+from avalon_core import CircuitBreaker
+from avalon_core.breaker import CLOSED, HALF_OPEN, OPEN
+
+
+def breaker(**kwargs):
+    # No jitter, so probe times are exact
+    options = dict(failure_threshold=3, base_backoff=10, max_backoff=40, jitter=0)
+    options.update(kwargs)
+    return CircuitBreaker(**options)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def test_stays_closed_below_threshold(self):
+        b = breaker()
+        b.record_failure(now=100)
+        b.record_failure(now=101)
+        self.assertEqual(b.state, CLOSED)
+        self.assertFalse(b.is_open)
+        self.assertTrue(b.allow_request(now=102))
+
+    def test_success_resets_the_count(self):
+        b = breaker()
+        b.record_failure(now=100)
+        b.record_failure(now=101)
+        b.record_success()
+        b.record_failure(now=102)
+        b.record_failure(now=103)
+        self.assertEqual(b.state, CLOSED)
+
+    def test_opens_at_threshold(self):
+        b = breaker()
+        for t in (100, 101, 102):
+            b.record_failure(now=t)
+        self.assertEqual(b.state, OPEN)
+        self.assertTrue(b.is_open)
+        self.assertEqual(b.offline_since, 102)
+        self.assertEqual(b.next_probe_at, 112)
+        self.assertFalse(b.allow_request(now=111.9))
+
+    def test_half_open_after_backoff(self):
+        b = breaker(failure_threshold=1)
+        b.record_failure(now=100)
+        self.assertTrue(b.allow_request(now=110))
+        self.assertEqual(b.state, HALF_OPEN)
+        self.assertTrue(b.is_open)
+
+    def test_failed_probe_doubles_backoff_up_to_max(self):
+        b = breaker(failure_threshold=1)
+        b.record_failure(now=0)
+        probes = []
+        now = 0
+        for _ in range(4):
+            now = b.next_probe_at
+            self.assertTrue(b.allow_request(now=now))
+            b.record_failure(now=now)
+            self.assertEqual(b.state, OPEN)
+            probes.append(b.next_probe_at - now)
+        self.assertEqual(probes, [20, 40, 40, 40])
+        # Still offline since the first failure
+        self.assertEqual(b.offline_since, 0)
+
+    def test_successful_probe_closes(self):
+        b = breaker(failure_threshold=1)
+        b.record_failure(now=0)
+        b.allow_request(now=10)
+        b.record_failure(now=10)
+        b.allow_request(now=30)
+        b.record_success()
+        self.assertEqual(b.state, CLOSED)
+        self.assertIsNone(b.offline_since)
+        self.assertEqual(b.backoff, 10)
+        self.assertTrue(b.allow_request(now=31))
+
+    def test_jitter_delays_probe(self):
+        b = CircuitBreaker(failure_threshold=1, base_backoff=10, jitter=0.5)
+        b.record_failure(now=0)
+        self.assertGreaterEqual(b.next_probe_at, 10)
+        self.assertLessEqual(b.next_probe_at, 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+"""Tests for the response parser and the ``MM ID0`` tokenizer."""
+
+import os
+import json
+import unittest
+
+from avalon_core import (
+    BatchSupport,
+    batch_sections,
+    convert_value,
+    first_entry,
+    get_mm_id0,
+    is_invalid_command,
+    parse_custom_data,
+    parse_estats_field,
+    parse_mm_id0,
+    split_batch_response,
+)
+
+PAYLOADS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        'benchmarks', 'payloads')
+
+
+def load_payload(name):
+    with open(os.path.join(PAYLOADS, name)) as f:
+        return json.load(f)
+
+
+class ParseMmId0Test(unittest.TestCase):
+
+    def test_nano_layout(self):
+        fields = parse_mm_id0('Ver[Nano3s-1] TMax[86] PS[0 1210 2214]')
+        self.assertEqual(fields, {'Ver': 'Nano3s-1', 'TMax': '86', 'PS': '0 1210 2214'})
+
+    def test_q_layout(self):
+        fields = parse_mm_id0('Ver:[Q-1] TMax:[78] FanR:[47%]')
+        self.assertEqual(fields, {'Ver': 'Q-1', 'TMax': '78', 'FanR': '47%'})
+
+    def test_first_value_wins(self):
+        self.assertEqual(parse_mm_id0('Fan1[100] Fan1[200]'), {'Fan1': '100'})
+
+    def test_empty(self):
+        self.assertEqual(parse_mm_id0(''), {})
+
+
+class ParseEstatsFieldTest(unittest.TestCase):
+
+    def test_whole_word_match(self):
+        mm_id0 = 'HBOTemp[71] OTemp[40]'
+        self.assertEqual(parse_estats_field(mm_id0, 'OTemp'), '40')
+        self.assertEqual(parse_estats_field(mm_id0, 'HBOTemp'), '71')
+        self.assertIsNone(parse_estats_field('HBOTemp[71]', 'OTemp'))
+
+    def test_q_layout(self):
+        self.assertEqual(parse_estats_field('TAvg:[70] TMax:[78]', 'TMax'), '78')
+
+    def test_missing(self):
+        self.assertIsNone(parse_estats_field('TAvg[70]', 'TMax'))
+        self.assertIsNone(parse_estats_field('', 'TMax'))
+
+
+class ConvertValueTest(unittest.TestCase):
+
+    def test_numbers(self):
+        self.assertEqual(convert_value('86'), 86)
+        self.assertIsInstance(convert_value('86'), int)
+        self.assertEqual(convert_value('490.63'), 490.63)
+        self.assertEqual(convert_value('-273'), -273)
+
+    def test_strings_stay_strings(self):
+        self.assertEqual(convert_value('1.328%'), '1.328%')
+        self.assertEqual(convert_value('0 1210 2214'), '0 1210 2214')
+        self.assertEqual(convert_value('N_MM1v1_X1'), 'N_MM1v1_X1')
+
+
+class CustomDataTest(unittest.TestCase):
+
+    def test_nano_payload(self):
+        response = load_payload('nano3s_estats.json')
+        data = parse_custom_data(response)
+        self.assertEqual(data['TMax'], 86)
+        self.assertEqual(data['WORKMODE'], 1)
+        self.assertEqual(data['SoftOFF'], 0)
+        self.assertEqual(data['MPO'], 140)
+        self.assertEqual(data['Freq'], 490.63)
+        self.assertEqual(data['PS'], '0 1210 2214 63 1395 2214 1433')
+        self.assertNotIn('OTemp', data)
+        self.assertTrue(get_mm_id0(response).startswith('Ver[Nano3s-'))
+
+    def test_q_payload(self):
+        response = load_payload('avalon_q_estats.json')
+        data = parse_custom_data(response)
+        self.assertEqual(data['TMax'], 78)
+        self.assertEqual(data['WORKMODE'], 2)
+        self.assertEqual(data['Fan1'], 3120)
+        self.assertEqual(data['PLL0'], '663 1941 308 808')
+
+        # Normalised to the Key[Value] layout
+        mm_id0 = get_mm_id0(response)
+        self.assertTrue(mm_id0.startswith('Ver[Q-'))
+        self.assertNotIn(':[', mm_id0)
+        self.assertEqual(parse_estats_field(mm_id0, 'TMax'), '78')
+        self.assertEqual({k: convert_value(v) for k, v in parse_mm_id0(mm_id0).items()}, data)
+
+    def test_missing_response(self):
+        self.assertEqual(parse_custom_data(None), {})
+        self.assertEqual(parse_custom_data({'STATS': []}), {})
+        self.assertEqual(get_mm_id0(None), '')
+
+
+class FirstEntryTest(unittest.TestCase):
+
+    def test_shapes(self):
+        self.assertEqual(first_entry({'SUMMARY': [{'Elapsed': 5}]}, 'SUMMARY'), {'Elapsed': 5})
+        self.assertEqual(first_entry({'SUMMARY': {'Elapsed': 5}}, 'SUMMARY'), {'Elapsed': 5})
+        self.assertEqual(first_entry({'SUMMARY': []}, 'SUMMARY'), {})
+        self.assertEqual(first_entry({}, 'SUMMARY'), {})
+        self.assertEqual(first_entry(None, 'SUMMARY'), {})
+
+
+class SplitBatchResponseTest(unittest.TestCase):
+
+    def test_split(self):
+        summary = {'STATUS': [{'STATUS': 'S'}], 'SUMMARY': [{'Elapsed': 5}]}
+        lcd = {'STATUS': [{'STATUS': 'S'}], 'LCD': [{'Current Pool': 'pool'}]}
+        response = {'summary': [summary], 'lcd': [lcd], 'id': 1}
+        self.assertEqual(split_batch_response(response, ('summary', 'lcd')),
+                         {'summary': summary, 'lcd': lcd})
+
+    def test_subset(self):
+        response = {'summary': [{'SUMMARY': []}], 'lcd': [{'LCD': []}], 'id': 1}
+        self.assertEqual(split_batch_response(response, ('lcd',)), {'lcd': {'LCD': []}})
+
+    def test_rejected_batch(self):
+        # Firmware without batch support answers with a single error STATUS
+        response = {'STATUS': [{'STATUS': 'E', 'Msg': 'Invalid command'}], 'id': 1}
+        self.assertIsNone(split_batch_response(response, ('summary', 'lcd')))
+
+    def test_missing_or_malformed_section(self):
+        self.assertIsNone(split_batch_response({'summary': [{}]}, ('summary', 'lcd')))
+        self.assertIsNone(split_batch_response({'summary': []}, ('summary',)))
+        self.assertIsNone(split_batch_response({'summary': {'SUMMARY': []}}, ('summary',)))
+        self.assertIsNone(split_batch_response({'summary': ['text']}, ('summary',)))
+
+    def test_empty(self):
+        self.assertIsNone(split_batch_response(None, ('summary',)))
+        self.assertIsNone(split_batch_response({}, ('summary',)))
+
+    def test_partial_sections(self):
+        response = {'summary': [{'SUMMARY': []}], 'estats': [], 'id': 1}
+        self.assertEqual(batch_sections(response, ('summary', 'estats', 'lcd')),
+                         {'summary': {'SUMMARY': []}})
+        self.assertEqual(batch_sections(None, ('summary',)), {})
+
+    def test_invalid_command(self):
+        self.assertTrue(is_invalid_command(
+            {'STATUS': [{'STATUS': 'E', 'Code': 14, 'Msg': 'Invalid command'}], 'id': 1}))
+        self.assertFalse(is_invalid_command({'STATUS': [{'STATUS': 'E', 'Code': 45}]}))
+        self.assertFalse(is_invalid_command({'summary': [{'SUMMARY': []}]}))
+        self.assertFalse(is_invalid_command(None))
+
+
+class BatchSupportTest(unittest.TestCase):
+
+    COMMANDS = ('summary', 'lcd')
+
+    def test_partial_reply_keeps_batching(self):
+        batch = BatchSupport()
+        self.assertEqual(batch.split({'summary': [{'SUMMARY': []}]}, self.COMMANDS),
+                         {'summary': {'SUMMARY': []}})
+        self.assertTrue(batch.supported)
+
+    def test_invalid_command_disables_at_once(self):
+        batch = BatchSupport()
+        batch.split({'STATUS': [{'STATUS': 'E', 'Code': 14, 'Msg': 'Invalid command'}]}, self.COMMANDS)
+        self.assertFalse(batch.usable)
+
+    def test_repeated_failures_disable(self):
+        batch = BatchSupport(failure_limit=3)
+        batch.split({}, self.COMMANDS)
+        batch.split({}, self.COMMANDS)
+        self.assertTrue(batch.usable)
+        # A good reply resets the count
+        batch.split({'lcd': [{'LCD': []}]}, self.COMMANDS)
+        for _ in range(2):
+            batch.split({}, self.COMMANDS)
+        self.assertTrue(batch.usable)
+        batch.split({}, self.COMMANDS)
+        self.assertFalse(batch.usable)
+
+
+if __name__ == '__main__':
+    unittest.main()
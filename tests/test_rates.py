@@ -0,0 +1,79 @@
+"""Tests for the counter-reset-aware rate engine."""
+
+import math
+import unittest
+
+from avalon_core import COUNTERS, RateEngine
+
+
+def reading(accepted=None, rejected=None, hw_errors=None, diff_accepted=None, diff_rejected=None):
+    return [accepted, rejected, hw_errors, diff_accepted, diff_rejected]
+
+
+class RateEngineTest(unittest.TestCase):
+
+    def test_counter_order(self):
+        self.assertEqual(COUNTERS, ('accepted', 'rejected', 'hardware_errors',
+                                    'difficulty_accepted', 'difficulty_rejected'))
+
+    def test_first_reading_has_no_rate(self):
+        engine = RateEngine(1)
+        self.assertIsNone(engine.update(0, 1000, 500, reading(100, 1, 0, 1e6, 1e4)))
+
+    def test_steady_rate(self):
+        engine = RateEngine(1, tau=300)
+        engine.update(0, 1000, 500, reading(100, 1, 0, 1e6, 0))
+        rates = engine.update(0, 1060, 560, reading(160, 1, 0, 1.6e6, 0))
+        self.assertAlmostEqual(rates[0], 1.0)
+        self.assertAlmostEqual(rates[1], 0.0)
+        self.assertAlmostEqual(rates[3], 1e4)
+        rates = engine.update(0, 1120, 620, reading(220, 1, 0, 2.2e6, 0))
+        self.assertAlmostEqual(rates[0], 1.0)
+
+    def test_smoothing(self):
+        engine = RateEngine(1, tau=300)
+        engine.update(0, 0, 0, reading(0))
+        engine.update(0, 60, 60, reading(60))
+        rate = engine.update(0, 120, 120, reading(180))[0]
+        # Between the old (1/s) and the new (2/s) rate, weighted to the newer one
+        decay = math.exp(-60 / 300)
+        self.assertAlmostEqual(rate, (60 * decay + 120) / (60 * decay + 60))
+        self.assertTrue(1.0 < rate < 2.0)
+
+    def test_unreported_counter(self):
+        engine = RateEngine(1)
+        engine.update(0, 0, 0, reading(0, 0))
+        rates = engine.update(0, 60, 60, reading(60, 0))
+        self.assertEqual(rates[2:], [None, None, None])
+
+    def test_restart_by_elapsed(self):
+        engine = RateEngine(1)
+        engine.update(0, 1000, 5000, reading(1000))
+        # Rebooted 30 s ago and found 30 shares since
+        rates = engine.update(0, 1060, 30, reading(30))
+        self.assertAlmostEqual(rates[0], 1.0)
+        self.assertEqual(engine.resets[0], 1)
+
+    def test_restart_by_counter(self):
+        engine = RateEngine(1)
+        engine.update(0, 1000, None, reading(1000))
+        rates = engine.update(0, 1060, None, reading(60))
+        self.assertGreaterEqual(rates[0], 0)
+        self.assertAlmostEqual(rates[0], 1.0)
+        self.assertEqual(engine.resets[0], 1)
+
+    def test_clock_step_back(self):
+        engine = RateEngine(1)
+        engine.update(0, 1000, 100, reading(10))
+        self.assertIsNone(engine.update(0, 990, 110, reading(20)))
+
+    def test_slots_are_independent(self):
+        engine = RateEngine(2)
+        engine.update(0, 0, 0, reading(0))
+        engine.update(1, 0, 0, reading(0))
+        self.assertAlmostEqual(engine.update(0, 60, 60, reading(60))[0], 1.0)
+        self.assertAlmostEqual(engine.update(1, 60, 60, reading(120))[0], 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+"""The Home Assistant integration's vendored avalon_core must match the package."""
+
+import os
+import sys
+import unittest
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class VendoredCoreTest(unittest.TestCase):
+
+    def test_vendored_copy_is_current(self):
+        result = subprocess.run(
+            [sys.executable, os.path.join(ROOT, 'scripts', 'vendor_core.py'), '--check'],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+        self.assertEqual(result.returncode, 0, result.stdout)
+
+    def test_vendored_init_imports_client_side_only(self):
+        # Imported under another name so the top-level package cannot stand in
+        vendored = os.path.join(ROOT, 'homeassistant', 'custom_components', 'avalon_miner', 'avalon_core')
+        code = (
+            "import sys, importlib.util\n"
+            "spec = importlib.util.spec_from_file_location(\n"
+            "    'vendored', sys.argv[1] + '/__init__.py', submodule_search_locations=[sys.argv[1]])\n"
+            "module = importlib.util.module_from_spec(spec)\n"
+            "sys.modules['vendored'] = module\n"
+            "spec.loader.exec_module(module)\n"
+            "print(' '.join(sorted(name for name in sys.modules if name.startswith('vendored.'))))\n"
+            "print(' '.join(name for name in ('termios', 'tty', 'sqlite3', 'http.server') if name in sys.modules))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code, vendored], cwd=ROOT,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+        self.assertEqual(result.returncode, 0, result.stdout)
+        modules, heavy = (result.stdout.splitlines() + ['', ''])[:2]
+        self.assertEqual(modules.split(), [
+            'vendored.breaker', 'vendored.client', 'vendored.exceptions', 'vendored.formatting',
+            'vendored.latency', 'vendored.models', 'vendored.parser', 'vendored.timing',
+            'vendored.transport'])
+        self.assertEqual(heavy, '')
+
+
+if __name__ == '__main__':
+    unittest.main()